@@ -10,7 +10,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from src.test_data.test_runner import TestRunner
+from src.test_data.test_runner import build_arg_parser, run_from_args
 
 
 def main():
@@ -19,8 +19,7 @@ def main():
     print("BANK APPLICATION TEST SUITE")
     print("=" * 80)
 
-    runner = TestRunner()
-    summary = runner.run_all_tests()
+    summary = run_from_args(build_arg_parser().parse_args())
 
     # Exit with appropriate code
     if summary["failed"] > 0:
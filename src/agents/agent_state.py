@@ -17,3 +17,5 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
     next: str
     result: dict
+    # Account the bank agent operates on (defaults to the demo account)
+    account_id: str
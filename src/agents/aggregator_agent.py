@@ -44,3 +44,8 @@ def aggregator_agent(state: AgentState):
         ],
         "next": "END",
     }
+
+
+async def aaggregator_agent(state: AgentState):
+    """Async version of aggregator_agent (no I/O, so it runs inline)."""
+    return aggregator_agent(state)
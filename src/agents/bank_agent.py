@@ -2,6 +2,7 @@
 Bank operations agent for the bank application.
 """
 
+import asyncio
 import json
 import re
 
@@ -13,6 +14,7 @@ from src.database.bank_db import get_bank_db
 from src.enums.agents_enum import AgentsEnum
 from src.enums.bank_operations_enum import BankOperationsEnum
 from src.models.user_query_model import UserQueryModel
+from src.utils.metrics import timed_span
 
 load_dotenv()
 
@@ -31,6 +33,8 @@ def bank_agent(state: AgentState):
     Agent for bank operations - executes deposits, withdrawals, and balance checks.
     """
     messages = state["messages"]
+    # Sessions served by src/server.py carry their own account
+    account_id = state.get("account_id") or DEFAULT_ACCOUNT
 
     # Get the user query (could be a sub-query in multi-query scenarios)
     user_query = None
@@ -145,7 +149,8 @@ def bank_agent(state: AgentState):
     if BankOperationsEnum.DEPOSIT.value in classification.category:
         amount = classification.amount
         if amount > 0:
-            result = db.deposit(DEFAULT_ACCOUNT, amount, "User deposit")
+            with timed_span("db.deposit"):
+                result = db.deposit(account_id, amount, "User deposit")
             if result["success"]:
                 response_text = f"${amount:.2f} successfully deposited."
             else:
@@ -157,7 +162,8 @@ def bank_agent(state: AgentState):
     elif BankOperationsEnum.WITHDRAWAL.value in classification.category:
         amount = classification.amount
         if amount > 0:
-            result = db.withdraw(DEFAULT_ACCOUNT, amount, "User withdrawal")
+            with timed_span("db.withdraw"):
+                result = db.withdraw(account_id, amount, "User withdrawal")
             if result["success"]:
                 response_text = f"${amount:.2f} successfully withdrawn."
             else:
@@ -166,14 +172,16 @@ def bank_agent(state: AgentState):
             response_text = "Please specify the amount to withdraw."
 
     elif BankOperationsEnum.BALANCE.value in classification.category:
-        result = db.get_balance(DEFAULT_ACCOUNT)
+        with timed_span("db.get_balance"):
+            result = db.get_balance(account_id)
         if result is not None:
             response_text = f"Your current account balance is ${result:.2f}."
         else:
             response_text = "Sorry, I couldn't retrieve your balance at the moment."
 
     elif BankOperationsEnum.ACCOUNT_DETAILS.value in classification.category:
-        result = db.get_account_details(DEFAULT_ACCOUNT)
+        with timed_span("db.get_account_details"):
+            result = db.get_account_details(account_id)
         if result:
             response_text = f"Account ID: {result['account_id']}\nAccount Type: {result['account_type']}\nCurrent Balance: ${result['balance']:.2f}"
         else:
@@ -193,7 +201,8 @@ def bank_agent(state: AgentState):
         if limit_match:
             limit = min(int(limit_match.group(1)), 50)  # Cap at 50 transactions
 
-        transactions = db.get_transaction_history(DEFAULT_ACCOUNT, limit)
+        with timed_span("db.get_transaction_history"):
+            transactions = db.get_transaction_history(account_id, limit)
 
         if transactions:
             response_text = f"Here are your last {len(transactions)} transactions:\n\n"
@@ -232,3 +241,12 @@ def bank_agent(state: AgentState):
             "messages": [AIMessage(content=response_text)],
             "next": AgentsEnum.END.value,
         }
+
+
+async def abank_agent(state: AgentState):
+    """
+    Async version of bank_agent.
+
+    The SQLite calls are blocking, so the sync agent runs on a worker thread.
+    """
+    return await asyncio.to_thread(bank_agent, state)
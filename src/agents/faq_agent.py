@@ -2,7 +2,12 @@
 FAQ agent for the bank application.
 """
 
-from src.utils.rag_agent_factory import create_rag_agent
+from src.utils.rag_agent_factory import create_async_rag_agent, create_rag_agent
 
 # Create FAQ agent using the factory
-faq_agent = create_rag_agent(vector_store_name="faq", prompt_file="faq.txt")
+faq_agent = create_rag_agent(
+    vector_store_name="faq", prompt_file="faq.txt", direct_answers=True
+)
+afaq_agent = create_async_rag_agent(
+    vector_store_name="faq", prompt_file="faq.txt", direct_answers=True
+)
@@ -2,9 +2,12 @@
 Investment agent for the bank application.
 """
 
-from src.utils.rag_agent_factory import create_rag_agent
+from src.utils.rag_agent_factory import create_async_rag_agent, create_rag_agent
 
 # Create investment agent using the factory
 investment_agent = create_rag_agent(
     vector_store_name="investment", prompt_file="investment.txt"
 )
+ainvestment_agent = create_async_rag_agent(
+    vector_store_name="investment", prompt_file="investment.txt"
+)
@@ -2,19 +2,28 @@
 Orchestrator class that classifies user queries into agent categories.
 """
 
+import asyncio
+import logging
 import os
+import re
 import sys
 import json
+import threading
+from collections import OrderedDict
+from typing import Optional
 
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage
 
-from langchain_openai import ChatOpenAI
 from src.models.user_query_model import UserQueryModel
 from src.models.multi_query_model import MultiQueryModel
 from src.agents.agent_state import AgentState
 from src.utils.prompt_loader import load_prompt
+from src.utils.background import BackgroundTask
 from src.utils.langfuse_utils import get_langfuse_callbacks
+from src.utils.llm_backends import get_chat_model
+from src.utils.metrics import timed_span
+from src.utils.token_usage import enforce_token_budget, usage_callback
 
 # Add path for evaluator import
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -22,6 +31,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Speculative classifications keyed by normalized query (oldest dropped first)
+MAX_SPECULATIONS = 8
+_speculations: "OrderedDict[str, BackgroundTask]" = OrderedDict()
+_speculation_lock = threading.Lock()
+
 # Map categories to agent names
 category_mapping = {
     "deposit": "bank",
@@ -34,73 +50,129 @@ category_mapping = {
 }
 
 
+def _continue_multi_query(state: AgentState) -> Optional[dict]:
+    """
+    Route to the next sub-query of a multi-query, or to the aggregator when done.
+
+    Returns:
+        State update, or None when no multi-query is in progress
+    """
+    messages = state["messages"]
+    result = state.get("result", {})
+
+    # Check if we're continuing a multi-query
+    if not (result.get("is_multi_query") and "current_sub_query_index" in result):
+        return None
+
+    current_index = result["current_sub_query_index"]
+    sub_queries = result.get("sub_queries", [])
+
+    # Collect the latest agent response (last message)
+    if messages and isinstance(messages[-1], AIMessage):
+        responses = result.get("responses", [])
+        response_content = messages[-1].content
+        responses.append(response_content)
+        result["responses"] = responses
+
+    # Check if there are more sub-queries to process
+    if current_index + 1 < len(sub_queries):
+        # Route to next agent
+        next_sub_query = sub_queries[current_index + 1]
+        result["current_sub_query_index"] = current_index + 1
+
+        # Update the user query to the next sub-query
+        user_query = next_sub_query["query"]
+        next_agent = next_sub_query["agent"]
+
+        # Send only the current sub-query
+        return {
+            "messages": [HumanMessage(content=user_query)],
+            "next": next_agent,
+            "result": result,
+        }
+
+    # All sub-queries processed, route to aggregator
+    # Send original query and all collected responses
+    original_query = result.get("original_query", "")
+    aggregator_messages = [HumanMessage(content=original_query)]
+    for response in result.get("responses", []):
+        aggregator_messages.append(AIMessage(content=response))
+
+    return {
+        "messages": aggregator_messages,
+        "next": "aggregator",
+        "result": result,
+    }
+
+
+def _user_query(messages: list) -> str:
+    """The original user query (first HumanMessage)."""
+    for msg in messages:
+        if hasattr(msg, "content") and not isinstance(msg, AIMessage):
+            return msg.content
+    return messages[-1].content if messages else ""
+
+
 def orchestrator_agent(state: AgentState):
     """
     Orchestrator agent that classifies user queries into agent categories using LLM.
     Handles both single and multi-part queries.
     """
+    continued = _continue_multi_query(state)
+    if continued is not None:
+        return continued
+
     messages = state["messages"]
-    result = state.get("result", {})
+    if not messages:
+        return {
+            "messages": [AIMessage(content="Routing to: bank agent...")],
+            "next": "bank",
+        }
 
-    # Check if we're continuing a multi-query
-    if result.get("is_multi_query") and "current_sub_query_index" in result:
-        current_index = result["current_sub_query_index"]
-        sub_queries = result.get("sub_queries", [])
-
-        # Collect the latest agent response (last message)
-        if messages and isinstance(messages[-1], AIMessage):
-            responses = result.get("responses", [])
-            response_content = messages[-1].content
-            responses.append(response_content)
-            result["responses"] = responses
-
-        # Check if there are more sub-queries to process
-        if current_index + 1 < len(sub_queries):
-            # Route to next agent
-            next_sub_query = sub_queries[current_index + 1]
-            result["current_sub_query_index"] = current_index + 1
-
-            # Update the user query to the next sub-query
-            user_query = next_sub_query["query"]
-            next_agent = next_sub_query["agent"]
-
-            # Send only the current sub-query
-            return {
-                "messages": [HumanMessage(content=user_query)],
-                "next": next_agent,
-                "result": result,
-            }
-        else:
-            # All sub-queries processed, route to aggregator
-            # Send original query and all collected responses
-            original_query = result.get("original_query", "")
-            aggregator_messages = [HumanMessage(content=original_query)]
-            for response in result.get("responses", []):
-                aggregator_messages.append(AIMessage(content=response))
-
-            return {
-                "messages": aggregator_messages,
-                "next": "aggregator",
-                "result": result,
-            }
+    user_query = _user_query(messages)
+
+    speculative = _take_speculation(user_query)
+    if speculative is not None:
+        return speculative
+
+    return classify_query(user_query)
+
+
+async def aorchestrator_agent(state: AgentState):
+    """Async version of orchestrator_agent, for graphs run with ainvoke/astream."""
+    continued = _continue_multi_query(state)
+    if continued is not None:
+        return continued
 
+    messages = state["messages"]
     if not messages:
         return {
             "messages": [AIMessage(content="Routing to: bank agent...")],
             "next": "bank",
         }
 
-    # Get the original user query (first HumanMessage)
-    user_query = None
-    for msg in messages:
-        if hasattr(msg, "content") and not isinstance(msg, AIMessage):
-            user_query = msg.content
-            break
+    user_query = _user_query(messages)
 
-    if not user_query:
-        user_query = messages[-1].content if messages else ""
+    if _has_speculation(user_query):
+        speculative = await asyncio.to_thread(_take_speculation, user_query)
+        if speculative is not None:
+            return speculative
 
-    # First, check if this is a multi-part query
+    return await aclassify_query(user_query)
+
+
+def _strip_code_block(content: str) -> str:
+    """Remove markdown code block markers around a JSON answer."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:].strip()
+    return content
+
+
+def _multi_query_request(user_query: str):
+    """Chat model and messages that detect a multi-part query."""
     multi_query_prompt_template = load_prompt("orchestrator_multi.txt")
     multi_query_prompt = multi_query_prompt_template.format(query=user_query)
 
@@ -109,21 +181,25 @@ def orchestrator_agent(state: AgentState):
         trace_name="orchestrator_multi_query",
         metadata={"agent_type": "orchestrator", "operation": "multi_query_detection"},
     )
-    llm_multi = ChatOpenAI(
-        model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+    llm_multi = get_chat_model(
         temperature=0,
         max_tokens=500,
-        callbacks=callbacks_multi,
+        callbacks=callbacks_multi
+        + [usage_callback("orchestrator", "orchestrator_multi.txt")],
     )
 
-    multi_response = llm_multi.invoke([HumanMessage(content=multi_query_prompt)])
+    enforce_token_budget(multi_query_prompt, max_tokens=500)
+    return llm_multi, [HumanMessage(content=multi_query_prompt)]
+
 
-    # Parse multi-query response
-    multi_content = multi_response.content.strip()
-    if multi_content.startswith("```"):
-        multi_content = multi_content.split("```")[1]
-        if multi_content.startswith("json"):
-            multi_content = multi_content[4:].strip()
+def _multi_query_route(user_query: str, multi_response) -> Optional[dict]:
+    """
+    State update routing to the first sub-query.
+
+    Returns:
+        None when the query is not a multi-part query
+    """
+    multi_content = _strip_code_block(multi_response.content)
 
     try:
         multi_json = json.loads(multi_content)
@@ -133,32 +209,35 @@ def orchestrator_agent(state: AgentState):
             is_multi_query=False, sub_queries=[], original_query=user_query
         )
 
-    # If it's a multi-part query, handle it differently
-    if multi_query.is_multi_query and len(multi_query.sub_queries) > 1:
-        # Store sub-queries in state for processing
-        sub_queries_data = {
-            "is_multi_query": True,
-            "sub_queries": [
-                {"query": sq.query, "category": sq.category, "agent": sq.agent}
-                for sq in multi_query.sub_queries
-            ],
-            "current_sub_query_index": 0,
-            "responses": [],
-            "original_query": user_query,
-        }
+    if not (multi_query.is_multi_query and len(multi_query.sub_queries) > 1):
+        return None
+
+    # Store sub-queries in state for processing
+    sub_queries_data = {
+        "is_multi_query": True,
+        "sub_queries": [
+            {"query": sq.query, "category": sq.category, "agent": sq.agent}
+            for sq in multi_query.sub_queries
+        ],
+        "current_sub_query_index": 0,
+        "responses": [],
+        "original_query": user_query,
+    }
 
-        # Route to first agent with the first sub-query
-        first_sub_query = multi_query.sub_queries[0]
-        first_agent = first_sub_query.agent
+    # Route to first agent with the first sub-query
+    first_sub_query = multi_query.sub_queries[0]
+    first_agent = first_sub_query.agent
 
-        # Start with just the first sub-query (original query is stored in result)
-        return {
-            "messages": [HumanMessage(content=first_sub_query.query)],
-            "next": first_agent,
-            "result": sub_queries_data,
-        }
+    # Start with just the first sub-query (original query is stored in result)
+    return {
+        "messages": [HumanMessage(content=first_sub_query.query)],
+        "next": first_agent,
+        "result": sub_queries_data,
+    }
 
-    # Single query
+
+def _single_query_request(user_query: str):
+    """Chat model and messages that classify a single query."""
     prompt_template = load_prompt("orchestrator.txt")
     prompt = prompt_template.format(query=user_query)
 
@@ -170,21 +249,20 @@ def orchestrator_agent(state: AgentState):
             "operation": "single_query_classification",
         },
     )
-    llm_single = ChatOpenAI(
-        model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+    llm_single = get_chat_model(
         temperature=0,
         max_tokens=200,
-        callbacks=callbacks_single,
+        callbacks=callbacks_single
+        + [usage_callback("orchestrator", "orchestrator.txt")],
     )
-    response = llm_single.invoke([HumanMessage(content=prompt)])
+    enforce_token_budget(prompt, max_tokens=200)
+    return llm_single, [HumanMessage(content=prompt)]
+
 
+def _single_query_route(response) -> dict:
+    """State update routing a classified single query to its agent."""
     # Parse JSON response and strip markdown code blocks if present
-    content = response.content.strip()
-    if content.startswith("```"):
-        # Remove markdown code block markers
-        content = content.split("```")[1]
-        if content.startswith("json"):
-            content = content[4:].strip()
+    content = _strip_code_block(response.content)
 
     try:
         response_json = json.loads(content)
@@ -204,3 +282,92 @@ def orchestrator_agent(state: AgentState):
         "messages": [AIMessage(content=response.content)],
         "next": next_agent,
     }
+
+
+def classify_query(user_query: str) -> dict:
+    """
+    Classify a new user query with the LLM.
+
+    Args:
+        user_query: The user's query
+
+    Returns:
+        Orchestrator state update routing to the first agent (or END for a
+        followup question)
+    """
+    # First, check if this is a multi-part query
+    llm_multi, messages = _multi_query_request(user_query)
+    with timed_span("llm.orchestrator_multi"):
+        multi_response = llm_multi.invoke(messages)
+
+    # If it's a multi-part query, handle it differently
+    route = _multi_query_route(user_query, multi_response)
+    if route is not None:
+        return route
+
+    # Single query
+    llm_single, messages = _single_query_request(user_query)
+    with timed_span("llm.orchestrator"):
+        response = llm_single.invoke(messages)
+    return _single_query_route(response)
+
+
+async def aclassify_query(user_query: str) -> dict:
+    """Async version of classify_query."""
+    llm_multi, messages = _multi_query_request(user_query)
+    with timed_span("llm.orchestrator_multi"):
+        multi_response = await llm_multi.ainvoke(messages)
+
+    route = _multi_query_route(user_query, multi_response)
+    if route is not None:
+        return route
+
+    llm_single, messages = _single_query_request(user_query)
+    with timed_span("llm.orchestrator"):
+        response = await llm_single.ainvoke(messages)
+    return _single_query_route(response)
+
+
+def _speculation_key(query: str) -> str:
+    """Case- and punctuation-insensitive form of a query."""
+    return " ".join(re.sub(r"[^\w\s']", " ", query.lower()).split())
+
+
+def speculate(query: str):
+    """
+    Start classifying a query in the background, before it is final.
+
+    Used with partial voice transcripts: if the final query matches, the
+    orchestrator node takes the result instead of calling the LLM again.
+    """
+    key = _speculation_key(query)
+    if not key:
+        return
+    with _speculation_lock:
+        if key in _speculations:
+            return
+        _speculations[key] = BackgroundTask(
+            "orchestrator_speculation", classify_query, query
+        ).start()
+        while len(_speculations) > MAX_SPECULATIONS:
+            _speculations.popitem(last=False)
+
+
+def _has_speculation(query: str) -> bool:
+    """Whether a speculative classification of this query was started."""
+    with _speculation_lock:
+        return _speculation_key(query) in _speculations
+
+
+def _take_speculation(query: str) -> Optional[dict]:
+    """Result of a speculative classification of this query, if one was started."""
+    with _speculation_lock:
+        task = _speculations.pop(_speculation_key(query), None)
+    if task is None:
+        return None
+    try:
+        with timed_span("llm.orchestrator_speculative"):
+            return task.result()
+    except Exception as e:
+        logger.info("Speculative classification failed: %s", e)
+        return None
@@ -2,7 +2,10 @@
 Policy agent for the bank application.
 """
 
-from src.utils.rag_agent_factory import create_rag_agent
+from src.utils.rag_agent_factory import create_async_rag_agent, create_rag_agent
 
 # Create policy agent using the factory
 policy_agent = create_rag_agent(vector_store_name="policy", prompt_file="policy.txt")
+apolicy_agent = create_async_rag_agent(
+    vector_store_name="policy", prompt_file="policy.txt"
+)
@@ -0,0 +1,250 @@
+"""
+Throughput of the async graph (ainvoke on one event loop) against the
+thread-per-request sync graph (invoke on a thread pool).
+
+For each concurrency level, the same number of conversations are run through
+both graphs:
+- sync: a ThreadPoolExecutor with one worker per concurrent conversation,
+  each calling workflow.invoke
+- async: asyncio.gather on a single event loop, with a semaphore limiting the
+  conversations in flight, each awaiting workflow.ainvoke
+
+Reported per level and mode: throughput, p50/p95/p99 latency, errors, peak
+thread count and peak memory.
+
+The benchmark is meant to run offline against the fake LLM backend (see
+src/utils/llm_backends.py) with a realistic latency distribution, so it
+measures how well each mode overlaps LLM waits rather than API speed. Bank
+queries are read-only so the database is not changed.
+
+Usage:
+    python -m src.benchmarks.async_benchmark --offline
+    python -m src.benchmarks.async_benchmark --offline --concurrency 10,50,200 --requests 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmarks.load_test import DEFAULT_MIX, QUERIES, ResourceSampler, parse_mix
+from src.utils.metrics import Histogram
+
+DEFAULT_CONCURRENCY = "10,50,200"
+
+
+def build_queries(mix: dict, count: int, seed: int = 0) -> list:
+    """Draw the same list of queries for every mode."""
+    rng = random.Random(seed)
+    intents = list(mix)
+    weights = [mix[intent] for intent in intents]
+    return [
+        rng.choice(QUERIES[rng.choices(intents, weights)[0]]) for _ in range(count)
+    ]
+
+
+def _state(query: str):
+    from langchain_core.messages import HumanMessage
+
+    from src.agents.agent_state import AgentState
+
+    return AgentState(messages=[HumanMessage(content=query)])
+
+
+def run_sync(workflow, queries: list, concurrency: int) -> dict:
+    """
+    Answer the queries with workflow.invoke on a pool of `concurrency` threads.
+
+    Returns:
+        Results for report()
+    """
+    from src.utils.metrics import request_trace
+
+    latency = Histogram()
+    errors = []
+    lock = threading.Lock()
+
+    def send(query: str):
+        started = time.perf_counter()
+        try:
+            with request_trace(query):
+                workflow.invoke(_state(query))
+        except Exception as e:
+            with lock:
+                errors.append(type(e).__name__)
+            return
+        with lock:
+            latency.observe((time.perf_counter() - started) * 1000)
+
+    sampler = ResourceSampler(interval=0.1).start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sync") as pool:
+        list(pool.map(send, queries))
+    elapsed = time.perf_counter() - start
+    return report(latency, errors, elapsed, sampler.stop())
+
+
+def run_async(workflow, queries: list, concurrency: int) -> dict:
+    """
+    Answer the queries with workflow.ainvoke on one event loop, at most
+    `concurrency` at a time.
+
+    Returns:
+        Results for report()
+    """
+    from src.utils.metrics import request_trace
+
+    latency = Histogram()
+    errors = []
+
+    async def send(query: str, limit: asyncio.Semaphore):
+        async with limit:
+            started = time.perf_counter()
+            try:
+                with request_trace(query):
+                    await workflow.ainvoke(_state(query))
+            except Exception as e:
+                errors.append(type(e).__name__)
+                return
+            latency.observe((time.perf_counter() - started) * 1000)
+
+    async def run_all():
+        limit = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(send(query, limit) for query in queries))
+
+    sampler = ResourceSampler(interval=0.1).start()
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+    return report(latency, errors, elapsed, sampler.stop())
+
+
+def report(latency: Histogram, errors: list, elapsed: float, resources: dict) -> dict:
+    """Throughput, latency percentiles, errors and resource use of one run."""
+    completed = latency.summary()["count"]
+    return {
+        "elapsed_seconds": elapsed,
+        "completed": completed,
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "latency": latency.summary(),
+        **resources,
+    }
+
+
+def print_results(results: list):
+    """Print one row per concurrency level and mode."""
+    print(f"\n{'='*80}")
+    print("SYNC vs ASYNC GRAPH")
+    print(f"{'='*80}")
+    print(
+        f"{'Users':>6} {'Mode':<6}{'Req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'Errors':>8}{'Threads':>9}{'RSS MB':>8}"
+    )
+    for row in results:
+        latency = row["latency"]
+        print(
+            f"{row['concurrency']:>6} {row['mode']:<6}{row['throughput_rps']:>8.1f}"
+            f"{latency['p50_ms']:>9.0f}{latency['p95_ms']:>9.0f}{latency['p99_ms']:>9.0f}"
+            f"{row['errors']:>8}{row['peak_threads']:>9}{row['peak_rss_mb']:>8.0f}"
+        )
+    print(f"{'='*80}")
+    for row in results:
+        if row["error_types"]:
+            print(
+                f"  {row['mode']} x{row['concurrency']} errors: {', '.join(row['error_types'])}"
+            )
+
+
+def main():
+    """Parse arguments, run both modes at each concurrency level and print the results."""
+    parser = argparse.ArgumentParser(
+        description="Compare the async graph with the thread-per-request sync graph"
+    )
+    parser.add_argument(
+        "--concurrency",
+        default=DEFAULT_CONCURRENCY,
+        help=f"Comma-separated concurrent conversations (default {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=None,
+        help="Conversations per run (default 2x the concurrency)",
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Intent weights (default {DEFAULT_MIX})")
+    parser.add_argument(
+        "--modes", default="sync,async", help="Modes to run (default sync,async)"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use the fake LLM backend instead of the configured one",
+    )
+    parser.add_argument(
+        "--fake-latency",
+        default="lognormal:600:0.4",
+        help="LLM latency distribution with --offline (see LLM_FAKE_LATENCY_MS)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the query mix")
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(level) for level in args.concurrency.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    if set(modes) - {"sync", "async"}:
+        parser.error("--modes accepts sync and async")
+
+    if args.offline:
+        # Read when the agents build their chat models
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["LLM_FAKE_LATENCY_MS"] = args.fake_latency
+        os.environ.setdefault("LLM_FAKE_SEED", str(args.seed))
+
+    from src.main import create_multi_agent_system
+    from src.utils.warmup import start_warmup, wait_until_ready
+
+    print("Building the agent graphs...")
+    workflows = {
+        "sync": create_multi_agent_system(),
+        "async": create_multi_agent_system(use_async=True),
+    }
+    # Load models and indexes up front so the first run is not penalized
+    for name in start_warmup():
+        wait_until_ready(name)
+
+    runners = {"sync": run_sync, "async": run_async}
+    results = []
+    for concurrency in levels:
+        queries = build_queries(mix, args.requests or 2 * concurrency, args.seed)
+        for mode in modes:
+            print(f"Running {len(queries)} conversations, {concurrency} at a time ({mode})...")
+            row = runners[mode](workflows[mode], queries, concurrency)
+            row.update({"mode": mode, "concurrency": concurrency, "requests": len(queries)})
+            results.append(row)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"mix": mix, "offline": args.offline, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
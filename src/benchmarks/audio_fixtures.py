@@ -0,0 +1,119 @@
+"""
+Speech fixtures shared by the voice input benchmarks.
+
+Fixtures are mono WAV files in a directory, with their reference transcripts
+in transcripts.json ({"<file stem>": "<text>"}). Without any, they are
+generated: spoken by espeak when it is installed, otherwise synthetic
+speech-like audio (which has no transcript).
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.audio_pipeline import AudioClip, decode_wav, encode_wav, resample
+from src.utils.tts_backends import EspeakBackend
+
+RATE = 16000
+FIXTURE_DIR = Path(__file__).parent.parent / "test_data" / "audio"
+TRANSCRIPTS_FILE = "transcripts.json"
+# Silence before the user starts talking
+LEAD_SECONDS = 0.6
+NOISE_RMS = 0.003
+
+PHRASES = [
+    "What is my account balance?",
+    "Deposit two hundred dollars into my checking account.",
+    "How do I reset my online banking password?",
+    "What is the difference between a Roth IRA and a traditional IRA, and which one should I open?",
+]
+
+
+def synthetic_speech(seconds: float, rng) -> np.ndarray:
+    """Syllable-like harmonic bursts with short pauses between words."""
+    samples = []
+    total = 0
+    while total < seconds * RATE:
+        length = int(rng.uniform(0.12, 0.25) * RATE)
+        t = np.arange(length) / RATE
+        f0 = rng.uniform(100, 180)
+        voiced = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 6))
+        burst = 0.15 * voiced * np.hanning(length)
+        # Word gaps, and an occasional longer pause mid-sentence
+        gap = int(rng.choice([0.04, 0.12, 0.3], p=[0.6, 0.3, 0.1]) * RATE)
+        samples.extend([burst, np.zeros(gap)])
+        total += length + gap
+    return np.concatenate(samples).astype(np.float32)
+
+
+def generate_fixtures(rng) -> list:
+    """
+    Fixtures from espeak if installed, otherwise synthetic speech.
+
+    Returns:
+        List of {"name", "samples", "text"} (text is None for synthetic speech)
+    """
+    backend = EspeakBackend() if EspeakBackend.is_available() else None
+    fixtures = []
+    for index, phrase in enumerate(PHRASES):
+        if backend is not None:
+            clip = resample(decode_wav(backend.synthesize_bytes(phrase)), RATE)
+            speech, text = clip.samples, phrase
+            name = f"espeak_{index + 1}"
+        else:
+            speech, text = synthetic_speech(1.0 + 0.6 * index, rng), None
+            name = f"synthetic_{index + 1}"
+        lead = np.zeros(int(LEAD_SECONDS * RATE), np.float32)
+        audio = np.concatenate([lead, speech, np.zeros(int(0.2 * RATE), np.float32)])
+        audio = audio + rng.normal(0, NOISE_RMS, len(audio)).astype(np.float32)
+        fixtures.append({"name": name, "samples": audio.astype(np.float32), "text": text})
+    return fixtures
+
+
+def load_fixtures(directory: Path) -> list:
+    """Read every WAV file in a directory as 16 kHz mono, with its transcript if known."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    transcripts_path = directory / TRANSCRIPTS_FILE
+    transcripts = {}
+    if transcripts_path.exists():
+        transcripts = json.loads(transcripts_path.read_text(encoding="utf-8"))
+
+    fixtures = []
+    for path in sorted(directory.glob("*.wav")):
+        clip = resample(decode_wav(path.read_bytes()), RATE)
+        fixtures.append(
+            {"name": path.stem, "samples": clip.samples, "text": transcripts.get(path.stem)}
+        )
+    return fixtures
+
+
+def save_fixtures(fixtures: list, directory: Path):
+    """Write fixtures as WAV files plus transcripts.json."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    transcripts = {}
+    for fixture in fixtures:
+        path = directory / f"{fixture['name']}.wav"
+        path.write_bytes(encode_wav(AudioClip(fixture["samples"], RATE)))
+        if fixture.get("text"):
+            transcripts[fixture["name"]] = fixture["text"]
+    if transcripts:
+        (directory / TRANSCRIPTS_FILE).write_text(
+            json.dumps(transcripts, indent=2), encoding="utf-8"
+        )
+
+
+def fixtures_or_generated(directory: Path, save_to: str = None, rng=None) -> list:
+    """Fixtures from a directory, or generated ones (optionally saved for reuse)."""
+    fixtures = load_fixtures(directory)
+    if fixtures:
+        return fixtures
+    print(f"No WAV fixtures in {directory}; generating them.")
+    fixtures = generate_fixtures(rng if rng is not None else np.random.default_rng(0))
+    if save_to:
+        save_fixtures(fixtures, save_to)
+        print(f"Fixtures written to {save_to}")
+    return fixtures
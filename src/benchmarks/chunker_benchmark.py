@@ -0,0 +1,112 @@
+"""
+Chunker benchmark: index size, build time and retrieval hit rate per chunker.
+
+Usage:
+    python -m src.benchmarks.chunker_benchmark [--chunkers recursive qa section] [--k 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.build.chunkers import CHUNKERS, default_chunker_name
+from src.build.index import build_index
+from src.evaluator.retrieval_evaluator import evaluate_retriever, load_retrieval_golden
+from src.utils.retrieval import get_retriever
+from src.utils.vector_lib import get_embeddings
+
+DATA_DIR = project_root / "src" / "data"
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the files in a directory."""
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in os.listdir(path)
+        if os.path.isfile(os.path.join(path, name))
+    )
+
+
+def benchmark_chunker(store_name: str, chunker: str, questions: list, k: int, mode: str):
+    """Build one index into a temporary directory and measure it."""
+    document_path = str(DATA_DIR / f"{store_name}.txt")
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        start = time.perf_counter()
+        stats = build_index(document_path, index_dir=index_dir, chunker=chunker)
+        build_seconds = time.perf_counter() - start
+
+        retriever = get_retriever(store_name, mode=mode, k=k, index_dir=index_dir)
+        retrieval = evaluate_retriever(retriever, questions)
+
+        return {
+            "store": store_name,
+            "chunker": chunker,
+            "default": chunker == default_chunker_name(document_path),
+            "chunks": stats["chunks"],
+            "index_bytes": directory_size(index_dir),
+            "build_seconds": build_seconds,
+            "hit_rate": retrieval["hit_rate"],
+            "latency_ms_p50": retrieval["latency_ms_p50"],
+            "misses": retrieval["misses"],
+        }
+
+
+def main():
+    """Parse arguments, run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare chunkers per knowledge file")
+    parser.add_argument(
+        "--chunkers", nargs="+", default=sorted(CHUNKERS), choices=sorted(CHUNKERS)
+    )
+    parser.add_argument("--k", type=int, default=3, help="Documents per query")
+    parser.add_argument(
+        "--mode", default="hybrid", choices=["dense", "hybrid"], help="Retrieval mode"
+    )
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    golden = load_retrieval_golden()
+
+    # Load the embedding model once so build times compare chunking + embedding only
+    get_embeddings()
+
+    rows = []
+    for store_name, questions in golden.items():
+        for chunker in args.chunkers:
+            rows.append(
+                benchmark_chunker(store_name, chunker, questions, args.k, args.mode)
+            )
+
+    print(f"\n{'='*80}")
+    print(f"CHUNKER BENCHMARK (k={args.k}, mode={args.mode})")
+    print(f"{'='*80}")
+    print(
+        f"{'Store':<12}{'Chunker':<12}{'Chunks':>8}{'Size KB':>10}"
+        f"{'Build s':>10}{'Hit rate':>10}{'p50 ms':>10}"
+    )
+    for row in rows:
+        marker = "*" if row["default"] else " "
+        print(
+            f"{row['store']:<12}{row['chunker'] + marker:<12}{row['chunks']:>8}"
+            f"{row['index_bytes'] / 1024:>10.1f}{row['build_seconds']:>10.2f}"
+            f"{row['hit_rate']:>10.2%}{row['latency_ms_p50']:>10.2f}"
+        )
+    print(f"{'='*80}")
+    print("* default chunker for the document")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
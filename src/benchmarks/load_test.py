@@ -0,0 +1,420 @@
+"""
+Load test: many simultaneous conversations against the agent graph.
+
+Queries are drawn from a weighted mix of intents (bank, faq, policy,
+investment, multi-part) and sent either
+- at a target arrival rate (--rate, Poisson arrivals; latency is measured from
+  the scheduled arrival, so time spent queueing behind busy workers counts), or
+- by a fixed number of concurrent users (--concurrency), each sending its next
+  query as soon as the previous answer arrives.
+
+Reported: throughput, p50/p95/p99 latency and error rate per intent, CPU use,
+peak memory and peak thread count.
+
+With --url, queries go to a running server (src/server.py) over HTTP instead
+of an in-process graph; the resource figures are then those of the load
+generator, not the server.
+
+Bank queries are read-only (balance, details, history) so the database is not
+changed. --offline runs against the fake LLM backend (see
+src/utils/llm_backends.py), measuring graph, retrieval and database
+throughput without API calls or costs.
+
+Usage:
+    python -m src.benchmarks.load_test --offline --concurrency 20 --duration 30
+    python -m src.benchmarks.load_test --offline --rate 10 --requests 200 --mix bank=50,faq=50
+    python -m src.benchmarks.load_test --url http://127.0.0.1:8080 --concurrency 200 --duration 60
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.metrics import Histogram
+
+QUERIES = {
+    "bank": [
+        "What is my account balance?",
+        "Show me my account details",
+        "What are my recent transactions?",
+        "How much money do I have?",
+    ],
+    "faq": [
+        "How do I open a new account?",
+        "How do I reset my online banking password?",
+        "What are your fees for wire transfers?",
+        "Can I deposit a check using my phone?",
+    ],
+    "policy": [
+        "What are your withdrawal limits?",
+        "How many days can I take off in a year?",
+        "What is the work from home policy?",
+        "What are the daily transfer limits?",
+    ],
+    "investment": [
+        "What investment options do you have?",
+        "Tell me about your retirement accounts",
+        "Do you offer stocks and bonds?",
+        "What are the risks of mutual funds?",
+    ],
+    "multi": [
+        "What investment options do you have, and what is my account balance?",
+        "How do I check my balance and what are your deposit policies?",
+        "What is my balance, what investments are available, and what are your fees?",
+        "What are your withdrawal limits, and how do I open a new account?",
+    ],
+}
+
+DEFAULT_MIX = "bank=30,faq=25,policy=15,investment=15,multi=15"
+
+
+def parse_mix(spec: str) -> dict:
+    """Parse "bank=30,faq=25" into intent weights."""
+    mix = {}
+    for item in spec.split(","):
+        intent, _, weight = item.partition("=")
+        intent = intent.strip()
+        if intent not in QUERIES:
+            raise ValueError(f"Unknown intent '{intent}'. Available: {', '.join(QUERIES)}")
+        mix[intent] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The intent mix has no positive weight")
+    return mix
+
+
+class LocalTarget:
+    """Sends queries to an in-process agent graph."""
+
+    def __init__(self):
+        from src.main import create_multi_agent_system
+
+        self.workflow = create_multi_agent_system()
+
+    def send(self, query: str) -> str:
+        """Answer one query and return the final message."""
+        from langchain_core.messages import HumanMessage
+
+        from src.agents.agent_state import AgentState
+        from src.utils.metrics import request_trace
+
+        with request_trace(query):
+            result = self.workflow.invoke(AgentState(messages=[HumanMessage(content=query)]))
+        return result["messages"][-1].content
+
+
+class HttpTarget:
+    """Sends queries to a running server (src/server.py) over HTTP."""
+
+    def __init__(self, url: str, timeout: float = 120):
+        self.url = url.rstrip("/") + "/chat"
+        self.timeout = timeout
+        # Each simulated user (thread) keeps its own conversation
+        self._local = threading.local()
+
+    def send(self, query: str) -> str:
+        """Answer one query and return the final message."""
+        import urllib.error
+        import urllib.request
+
+        payload = {"message": query, "session_id": getattr(self._local, "session_id", None)}
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        # Non-2xx responses (503 when the server is saturated) raise HTTPError
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                reply = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                # Session evicted: the next query starts a new one
+                self._local.session_id = None
+            raise
+        self._local.session_id = reply["session_id"]
+        return reply["answer"]
+
+
+class ResourceSampler:
+    """Samples thread count and resident memory in the background."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss_mb = _rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load_sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_mb = max(self.peak_rss_mb, _rss_mb())
+
+    def start(self):
+        self._cpu_start = _cpu_seconds()
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stop sampling and return the resource figures."""
+        self._stop.set()
+        self._thread.join()
+        return {
+            "cpu_seconds": _cpu_seconds() - self._cpu_start,
+            "peak_rss_mb": max(self.peak_rss_mb, _rss_mb()),
+            "peak_threads": self.peak_threads,
+        }
+
+
+def _cpu_seconds() -> float:
+    times = os.times()
+    return times.user + times.system
+
+
+def _rss_mb() -> float:
+    """Current resident memory (Linux), else the peak reported by the OS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+class LoadTest:
+    """Runs a query mix against a target and collects latency per intent."""
+
+    def __init__(self, target, mix: dict, seed: int = 0):
+        self.target = target
+        self.intents = list(mix)
+        self.weights = [mix[intent] for intent in self.intents]
+        self.random = random.Random(seed)
+        self.latency = {intent: Histogram() for intent in self.intents}
+        self.errors = {intent: Counter() for intent in self.intents}
+        self.sent = Counter()
+        self._lock = threading.Lock()
+
+    def next_query(self):
+        """Draw an intent from the mix and one of its queries."""
+        with self._lock:
+            intent = self.random.choices(self.intents, self.weights)[0]
+            return intent, self.random.choice(QUERIES[intent])
+
+    def _send(self, intent: str, query: str, started: float = None):
+        started = started or time.perf_counter()
+        error = None
+        try:
+            self.target.send(query)
+        except Exception as e:
+            error = type(e).__name__
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.sent[intent] += 1
+            if error:
+                self.errors[intent][error] += 1
+            else:
+                self.latency[intent].observe(elapsed_ms)
+
+    def run_concurrency(self, users: int, duration: float = None, requests: int = None):
+        """Closed loop: each user sends its next query when the previous one is answered."""
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [requests] if requests else None
+
+        def user():
+            while deadline is None or time.perf_counter() < deadline:
+                if remaining is not None:
+                    with self._lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self._send(*self.next_query())
+
+        threads = [
+            threading.Thread(target=user, name=f"load_user_{i}", daemon=True)
+            for i in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_rate(self, rate: float, max_workers: int, duration: float = None, requests: int = None):
+        """Open loop: Poisson arrivals at the target rate, whatever the response times."""
+        start = time.perf_counter()
+        arrival = start
+        count = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as pool:
+            while True:
+                arrival += self.random.expovariate(rate)
+                if duration and arrival - start >= duration:
+                    break
+                if requests and count >= requests:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                pool.submit(self._send, *self.next_query(), arrival)
+                count += 1
+
+    def report(self, elapsed: float, resources: dict) -> dict:
+        """Throughput, latency percentiles and error rates, overall and per intent."""
+        overall = Histogram()
+        intents = {}
+        for intent in self.intents:
+            sent = self.sent[intent]
+            if not sent:
+                continue
+            for sample in self.latency[intent].samples:
+                overall.observe(sample)
+            failed = sum(self.errors[intent].values())
+            intents[intent] = {
+                "requests": sent,
+                "errors": failed,
+                "error_rate": failed / sent,
+                "error_types": dict(self.errors[intent]),
+                **self.latency[intent].summary(),
+            }
+
+        total = sum(self.sent.values())
+        failed = sum(sum(errors.values()) for errors in self.errors.values())
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": total,
+            "errors": failed,
+            "error_rate": failed / total if total else 0.0,
+            "throughput_rps": (total - failed) / elapsed if elapsed else 0.0,
+            "latency": overall.summary(),
+            "intents": intents,
+            "cpu_percent": resources["cpu_seconds"] / elapsed * 100 if elapsed else 0.0,
+            **resources,
+        }
+
+
+def print_report(report: dict, description: str):
+    """Print the results as a table."""
+    print(f"\n{'='*80}")
+    print(f"LOAD TEST ({description})")
+    print(f"{'='*80}")
+    print(
+        f"{'Intent':<12}{'Requests':>10}{'Errors':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}"
+    )
+    rows = list(report["intents"].items()) + [
+        ("all", {"requests": report["requests"], "errors": report["errors"], **report["latency"]})
+    ]
+    for intent, row in rows:
+        print(
+            f"{intent:<12}{row['requests']:>10}{row['errors']:>8}{row['p50_ms']:>10.0f}"
+            f"{row['p95_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}"
+        )
+    print(f"{'='*80}")
+    print(
+        f"Throughput: {report['throughput_rps']:.2f} req/s over {report['elapsed_seconds']:.1f}s, "
+        f"error rate {report['error_rate']:.1%}"
+    )
+    print(
+        f"CPU: {report['cpu_percent']:.0f}% of one core, peak RSS {report['peak_rss_mb']:.0f} MB, "
+        f"peak threads {report['peak_threads']}"
+    )
+    for intent, row in report["intents"].items():
+        if row["error_types"]:
+            errors = ", ".join(f"{name} x{count}" for name, count in row["error_types"].items())
+            print(f"  {intent} errors: {errors}")
+
+
+def main():
+    """Parse arguments, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description="Load test the multi-agent system")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=None, help="Simultaneous users (closed loop)")
+    load.add_argument("--rate", type=float, default=None, help="Requests per second (open loop)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run (default 30)")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Intent weights (default {DEFAULT_MIX})")
+    parser.add_argument(
+        "--max-workers", type=int, default=64, help="Worker threads in --rate mode"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use the fake LLM backend instead of the configured one",
+    )
+    parser.add_argument(
+        "--fake-latency",
+        default="lognormal:600:0.4",
+        help="LLM latency distribution with --offline (see LLM_FAKE_LATENCY_MS)",
+    )
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="Load test a running server (python -m src.server) instead of an in-process graph",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the query mix")
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.duration is None and args.requests is None:
+        args.duration = 30
+    if args.concurrency is None and args.rate is None:
+        args.concurrency = 10
+
+    if args.url:
+        if args.offline:
+            print("Note: --offline has no effect with --url; start the server with --offline")
+        target = HttpTarget(args.url)
+    else:
+        if args.offline:
+            # Read when the agents build their chat models
+            os.environ["LLM_BACKEND"] = "fake"
+            os.environ["LLM_FAKE_LATENCY_MS"] = args.fake_latency
+            os.environ.setdefault("LLM_FAKE_SEED", str(args.seed))
+
+        print("Building the agent graph...")
+        target = LocalTarget()
+    test = LoadTest(target, mix, seed=args.seed)
+
+    if args.concurrency:
+        description = f"{args.concurrency} concurrent users"
+    else:
+        description = f"{args.rate:g} req/s"
+    limit = f"{args.requests} requests" if args.requests else f"{args.duration:g}s"
+    print(f"Running {description} for {limit} ({args.mix})...")
+
+    sampler = ResourceSampler().start()
+    start = time.perf_counter()
+    if args.concurrency:
+        test.run_concurrency(args.concurrency, args.duration, args.requests)
+    else:
+        test.run_rate(args.rate, args.max_workers, args.duration, args.requests)
+    elapsed = time.perf_counter() - start
+    report = test.report(elapsed, sampler.stop())
+    report.update(
+        {"mode": description, "mix": mix, "offline": args.offline, "url": args.url}
+    )
+
+    print_report(report, description)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Retrieval benchmark: quality, latency and index size per retrieval configuration.
+
+For every knowledge file in src/data with labelled questions in
+src/test_data/retrieval_golden.json, an index is built with each chunker and
+converted to each FAISS index type:
+- flat: exact search (what src.build.index builds)
+- hnsw: graph-based approximate search
+- ivf: inverted lists over k-means clusters, probing a fraction of them
+
+The retriever used by the RAG agents (get_retriever) then answers every
+question, dense only and hybrid (dense + BM25), for each k. Reported per
+configuration: recall@k, MRR@k, p50/p95/p99 query latency and index size
+(the FAISS and BM25 indexes are held in memory whole, so this is also their
+memory footprint); the peak resident memory of the run is reported too.
+
+Each run is appended to a history file together with the git commit, and a
+Markdown table comparing the run with the latest run of a different commit
+is written next to it, so retrieval quality and speed can be tracked across
+commits.
+
+Usage:
+    python -m src.benchmarks.retrieval_benchmark [--stores faq] [--k 1 3 5]
+        [--index-types flat hnsw ivf] [--chunkers recursive qa section] [--modes dense hybrid]
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmarks.chunker_benchmark import directory_size
+from src.build.chunkers import CHUNKERS, default_chunker_name
+from src.build.index import build_index
+from src.evaluator.retrieval_evaluator import is_hit, load_retrieval_golden, percentile
+from src.utils.retrieval import get_retriever
+from src.utils.vector_lib import (
+    get_embeddings,
+    get_index_documents,
+    get_lexical_index,
+    get_local_index,
+)
+
+DATA_DIR = project_root / "src" / "data"
+RESULTS_DIR = project_root / "src" / "benchmarks" / "results"
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+# Neighbours per HNSW node and candidate list size at query time
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
+
+def convert_index(index_dir: str, index_type: str, nprobe: int = None):
+    """
+    Replace the flat FAISS index saved in index_dir with another index type.
+
+    The stored vectors are reused, so every index type searches the same
+    embeddings and only the search structure differs.
+
+    Args:
+        index_dir: Directory written by build_index
+        index_type: "flat", "hnsw" or "ivf"
+        nprobe: Clusters searched per IVF query (defaults to a quarter of them)
+    """
+    if index_type == "flat":
+        return
+
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    vector_store = FAISS.load_local(
+        index_dir, get_embeddings(), allow_dangerous_deserialization=True
+    )
+    flat = vector_store.index
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(flat.d, HNSW_M)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif index_type == "ivf":
+        # Rule of thumb: about sqrt(n) clusters
+        nlist = max(1, int(math.sqrt(flat.ntotal)))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(flat.d), flat.d, nlist)
+        index.train(vectors)
+        index.nprobe = nprobe or max(1, nlist // 4)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}'. Available: {', '.join(INDEX_TYPES)}")
+
+    index.add(vectors)
+    vector_store.index = index
+    vector_store.save_local(index_dir)
+
+
+def clear_index_caches():
+    """Release the indexes loaded for the previous configuration."""
+    get_local_index.cache_clear()
+    get_index_documents.cache_clear()
+    get_lexical_index.cache_clear()
+
+
+def first_hit_rank(results: list, expected_text: str):
+    """1-based rank of the first retrieved chunk containing the answer, or None."""
+    for rank, (doc, _) in enumerate(results, 1):
+        if is_hit(doc, expected_text):
+            return rank
+    return None
+
+
+def evaluate_configuration(
+    store_name: str, index_dir: str, mode: str, k: int, questions: list, repeats: int
+) -> dict:
+    """Recall@k, MRR@k and latency percentiles of one retriever configuration."""
+    retriever = get_retriever(store_name, mode=mode, k=k, index_dir=index_dir)
+    # Load the indexes outside of the timed loop
+    retriever.retrieve(questions[0]["question"])
+
+    ranks, latencies_ms, misses = [], [], []
+    for question in questions:
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            results = retriever.retrieve(question["question"])
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        rank = first_hit_rank(results, question["expected_text"])
+        ranks.append(rank)
+        if rank is None:
+            misses.append(question["question"])
+
+    total = len(questions)
+    return {
+        "recall": sum(1 for rank in ranks if rank) / total,
+        "mrr": sum(1 / rank for rank in ranks if rank) / total,
+        "latency_ms_p50": percentile(latencies_ms, 50),
+        "latency_ms_p95": percentile(latencies_ms, 95),
+        "latency_ms_p99": percentile(latencies_ms, 99),
+        "misses": misses,
+    }
+
+
+def benchmark_store(store_name: str, questions: list, args) -> list:
+    """Build, convert and evaluate every configuration of one knowledge file."""
+    document_path = str(DATA_DIR / f"{store_name}.txt")
+    default_chunker = default_chunker_name(document_path)
+    rows = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for chunker in args.chunkers:
+            built_dir = os.path.join(workdir, f"{chunker}_flat")
+            stats = build_index(document_path, index_dir=built_dir, chunker=chunker)
+
+            for index_type in args.index_types:
+                index_dir = os.path.join(workdir, f"{chunker}_{index_type}")
+                if index_type != "flat":
+                    shutil.copytree(built_dir, index_dir)
+                    convert_index(index_dir, index_type, args.nprobe)
+
+                for mode in args.modes:
+                    for k in args.k:
+                        metrics = evaluate_configuration(
+                            store_name, index_dir, mode, k, questions, args.repeats
+                        )
+                        rows.append(
+                            {
+                                "store": store_name,
+                                "chunker": chunker,
+                                "default_chunker": chunker == default_chunker,
+                                "index": index_type,
+                                "mode": mode,
+                                "k": k,
+                                "chunks": stats["chunks"],
+                                "index_kb": directory_size(index_dir) / 1024,
+                                **metrics,
+                            }
+                        )
+                clear_index_caches()
+    return rows
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (Linux/macOS)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def row_key(row: dict) -> tuple:
+    return (row["store"], row["chunker"], row["index"], row["mode"], row["k"])
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, with "+dirty" for uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}+dirty" if dirty else commit
+
+
+def load_history(path: Path) -> list:
+    """Previous runs, oldest first."""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_run(history: list, commit: str):
+    """Latest run of another commit, to compare against."""
+    base = commit.replace("+dirty", "")
+    for run in reversed(history):
+        if run["commit"].replace("+dirty", "") != base:
+            return run
+    return None
+
+
+def format_table(run: dict, baseline: dict = None) -> str:
+    """Markdown comparison table of a run, with changes against a baseline run."""
+    previous = {row_key(row): row for row in baseline["rows"]} if baseline else {}
+    lines = [
+        "# Retrieval benchmark",
+        "",
+        f"Commit `{run['commit']}`, {run['date']}, {run['questions']} labelled questions, "
+        f"{run['repeats']} timed repeats per question, peak RSS {run['peak_rss_mb']:.0f} MB.",
+    ]
+    if baseline:
+        lines.append(f"Changes (Δ) are against commit `{baseline['commit']}` ({baseline['date']}).")
+    lines += [
+        "",
+        "| Store | Chunker | Index | Hybrid | k | Recall@k | Δ | MRR@k | Δ | p50 ms | p95 ms | p99 ms | Δ p50 | Index KB |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in run["rows"]:
+        before = previous.get(row_key(row))
+
+        def delta(name, fmt):
+            return format(row[name] - before[name], fmt) if before else ""
+
+        chunker = row["chunker"] + (" (default)" if row["default_chunker"] else "")
+        lines.append(
+            f"| {row['store']} | {chunker} | {row['index']} | "
+            f"{'yes' if row['mode'] == 'hybrid' else 'no'} | {row['k']} | "
+            f"{row['recall']:.0%} | {delta('recall', '+.0%')} | "
+            f"{row['mrr']:.3f} | {delta('mrr', '+.3f')} | "
+            f"{row['latency_ms_p50']:.2f} | {row['latency_ms_p95']:.2f} | "
+            f"{row['latency_ms_p99']:.2f} | {delta('latency_ms_p50', '+.2f')} | "
+            f"{row['index_kb']:.0f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def print_rows(rows: list):
+    """Print the results as a console table."""
+    print(f"\n{'='*96}")
+    print("RETRIEVAL BENCHMARK")
+    print(f"{'='*96}")
+    print(
+        f"{'Store':<12}{'Chunker':<11}{'Index':<7}{'Mode':<8}{'k':>3}{'Recall':>9}"
+        f"{'MRR':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Index KB':>10}"
+    )
+    for row in rows:
+        marker = "*" if row["default_chunker"] else " "
+        print(
+            f"{row['store']:<12}{row['chunker'] + marker:<11}{row['index']:<7}"
+            f"{row['mode']:<8}{row['k']:>3}{row['recall']:>9.0%}{row['mrr']:>8.3f}"
+            f"{row['latency_ms_p50']:>9.2f}{row['latency_ms_p95']:>9.2f}"
+            f"{row['latency_ms_p99']:>9.2f}{row['index_kb']:>10.0f}"
+        )
+    print(f"{'='*96}")
+    print("* default chunker for the document")
+
+
+def main():
+    """Parse arguments, run the benchmark and write the comparison table."""
+    golden = load_retrieval_golden()
+    parser = argparse.ArgumentParser(description="Benchmark retrieval configurations")
+    parser.add_argument("--stores", nargs="+", default=sorted(golden), choices=sorted(golden))
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 3, 5], help="Documents per query")
+    parser.add_argument(
+        "--index-types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES
+    )
+    parser.add_argument(
+        "--chunkers", nargs="+", default=sorted(CHUNKERS), choices=sorted(CHUNKERS)
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["dense", "hybrid"],
+        choices=["dense", "hybrid"],
+        help="Retrieval modes (hybrid adds BM25)",
+    )
+    parser.add_argument("--nprobe", type=int, default=None, help="Clusters searched per IVF query")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per question")
+    parser.add_argument(
+        "--history",
+        default=str(RESULTS_DIR / "retrieval_history.jsonl"),
+        help="Run history, one JSON line per run",
+    )
+    parser.add_argument(
+        "--table",
+        default=str(RESULTS_DIR / "retrieval.md"),
+        help="Markdown comparison table written after the run",
+    )
+    args = parser.parse_args()
+
+    # Load the embedding model once so it is not part of any build or query time
+    get_embeddings()
+
+    rows = []
+    for store_name in args.stores:
+        rows += benchmark_store(store_name, golden[store_name], args)
+
+    print_rows(rows)
+    print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+    for row in rows:
+        for missed in row["misses"]:
+            print(
+                f"  miss [{row['store']}/{row['chunker']}/{row['index']}/"
+                f"{row['mode']}/k={row['k']}]: {missed}"
+            )
+
+    history_path = Path(args.history)
+    run = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+        "questions": sum(len(golden[store]) for store in args.stores),
+        "repeats": args.repeats,
+        "peak_rss_mb": peak_rss_mb(),
+        "rows": rows,
+    }
+    baseline = previous_run(load_history(history_path), run["commit"])
+
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+    Path(args.table).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.table, "w", encoding="utf-8") as f:
+        f.write(format_table(run, baseline))
+
+    print(f"Run appended to {history_path}; comparison table written to {args.table}")
+    if baseline:
+        print(f"Compared with commit {baseline['commit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Startup benchmark: import-time profile and time to the first prompt of the CLI.
+
+Usage:
+    python -m src.benchmarks.startup_benchmark [--runs 5] [--max-ms 1500] [--top 20]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+MAIN_SCRIPT = project_root / "src" / "main.py"
+PROMPT_MARKER = "Enter your query"
+
+# "import time:       412 |       1374 | langchain_core.messages"
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def benchmark_env() -> dict:
+    """Environment for the CLI subprocess: no speech, unbuffered output."""
+    env = dict(os.environ)
+    env.update({"TTS_ENABLED": "false", "PYTHONUNBUFFERED": "1"})
+    return env
+
+
+def profile_imports(module: str = "src.main") -> list:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        List of {"module", "self_ms", "cumulative_ms", "depth"} dictionaries
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        env=benchmark_env(),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append(
+            {
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                # importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return rows
+
+
+def package_totals(rows: list) -> dict:
+    """Sum self time per top-level package."""
+    totals = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0.0) + row["self_ms"]
+    return totals
+
+
+def time_to_first_prompt(timeout: float = 120.0) -> float:
+    """
+    Start the CLI and measure the time until it asks for the first query.
+
+    Returns:
+        Milliseconds from process start to the prompt
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-u", str(MAIN_SCRIPT)],
+        cwd=project_root,
+        env=benchmark_env(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        output = ""
+        while PROMPT_MARKER not in output:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"No prompt within {timeout}s")
+            char = process.stdout.read(1)
+            if not char:
+                raise RuntimeError(f"CLI exited before prompting:\n{output[-2000:]}")
+            output += char
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        process.stdin.write("q\n")
+        process.stdin.flush()
+        process.wait(timeout=timeout)
+        return elapsed_ms
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def main():
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Measure CLI startup time")
+    parser.add_argument("--runs", type=int, default=5, help="CLI launches to time")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail (exit 1) if the median time to first prompt exceeds this",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Slowest imports to show")
+    parser.add_argument(
+        "--skip-imports", action="store_true", help="Only time the first prompt"
+    )
+    args = parser.parse_args()
+
+    if not args.skip_imports:
+        rows = profile_imports()
+        total_ms = sum(row["self_ms"] for row in rows)
+
+        print(f"\n{'='*80}")
+        print(f"IMPORT TIME PROFILE (import src.main, total {total_ms:.0f} ms)")
+        print(f"{'='*80}")
+        print(f"{'Module':<56}{'Self ms':>12}{'Cumul. ms':>12}")
+        for row in sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[
+            : args.top
+        ]:
+            print(
+                f"{row['module'][:55]:<56}{row['self_ms']:>12.1f}"
+                f"{row['cumulative_ms']:>12.1f}"
+            )
+
+        print(f"\n{'Package':<56}{'Self ms':>12}")
+        totals = package_totals(rows)
+        for package, ms in sorted(totals.items(), key=lambda t: t[1], reverse=True)[
+            : args.top
+        ]:
+            print(f"{package:<56}{ms:>12.1f}")
+
+    timings = [time_to_first_prompt() for _ in range(args.runs)]
+    median_ms = statistics.median(timings)
+
+    print(f"\n{'='*80}")
+    print(f"TIME TO FIRST PROMPT ({args.runs} runs)")
+    print(f"{'='*80}")
+    print(f"Median: {median_ms:.0f} ms")
+    print(f"Min:    {min(timings):.0f} ms")
+    print(f"Max:    {max(timings):.0f} ms")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"❌ Median {median_ms:.0f} ms exceeds the {args.max_ms:.0f} ms limit")
+        sys.exit(1)
+    if args.max_ms is not None:
+        print(f"✅ Within the {args.max_ms:.0f} ms limit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Speech recognition benchmark: accuracy, speed and memory per backend and model.
+
+For each option (backend:model), in a fresh process so peak memory is not
+shared between options, the model is loaded and every fixture transcribed.
+Reported per option:
+- word error rate (WER) against the fixture transcripts
+- real-time factor (RTF): transcription time / audio duration
+- model load time and peak resident memory
+
+Fixtures are WAV files with transcripts.json in --fixtures (see
+audio_fixtures.py); without them, espeak-generated fixtures are used.
+
+Usage:
+    python -m src.benchmarks.stt_benchmark [--options whisper:base faster-whisper:base faster-whisper:tiny]
+"""
+
+import argparse
+import json
+import multiprocessing
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmarks.audio_fixtures import FIXTURE_DIR, RATE, fixtures_or_generated
+from src.utils.stt_backends import BACKENDS, available_backends, get_stt_backend
+
+DEFAULT_OPTIONS = ["whisper:base", "faster-whisper:base", "faster-whisper:tiny"]
+
+
+def normalize_words(text: str) -> list:
+    """Lowercase words without punctuation."""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process (Linux/macOS)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def run_option(option: str, fixtures: list) -> dict:
+    """Load one backend/model and transcribe every fixture (runs in a child process)."""
+    backend_name, model_name = option.split(":", 1)
+    baseline_mb = _peak_rss_mb()
+
+    stt = get_stt_backend(backend_name, model_name)
+    start = time.perf_counter()
+    stt.load()
+    load_seconds = time.perf_counter() - start
+
+    # Untimed first call (lazy initialisation inside the engines)
+    stt.transcribe(fixtures[0]["samples"])
+
+    errors, latencies_ms = [], []
+    audio_seconds = transcribe_seconds = 0.0
+    for fixture in fixtures:
+        start = time.perf_counter()
+        text = stt.transcribe(fixture["samples"])
+        elapsed = time.perf_counter() - start
+        latencies_ms.append(elapsed * 1000)
+        transcribe_seconds += elapsed
+        audio_seconds += len(fixture["samples"]) / RATE
+        errors.append(word_error_rate(fixture["text"], text))
+
+    peak_mb = _peak_rss_mb()
+    return {
+        "option": option,
+        "backend": stt.name,
+        "model": model_name,
+        "wer": statistics.mean(errors),
+        "rtf": transcribe_seconds / audio_seconds,
+        "latency_ms_p50": statistics.median(latencies_ms),
+        "load_seconds": load_seconds,
+        "peak_rss_mb": peak_mb,
+        "model_rss_mb": peak_mb - baseline_mb,
+    }
+
+
+def main():
+    """Parse arguments, run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare speech recognition backends")
+    parser.add_argument(
+        "--options",
+        nargs="+",
+        default=DEFAULT_OPTIONS,
+        help=f"backend:model pairs (backends: {', '.join(sorted(BACKENDS))})",
+    )
+    parser.add_argument("--fixtures", default=str(FIXTURE_DIR), help="Directory of WAV files")
+    parser.add_argument("--save-fixtures", default=None, help="Write generated fixtures here")
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    fixtures = fixtures_or_generated(Path(args.fixtures), args.save_fixtures)
+    fixtures = [f for f in fixtures if f.get("text")]
+    if not fixtures:
+        print(
+            "No fixtures with transcripts. Add WAV files and transcripts.json to "
+            f"{args.fixtures}, or install espeak-ng to generate them."
+        )
+        sys.exit(1)
+
+    installed = available_backends()
+    options = []
+    for option in args.options:
+        backend = option.split(":", 1)[0]
+        if ":" not in option or backend not in BACKENDS:
+            parser.error(f"Invalid option '{option}' (expected backend:model)")
+        if backend in installed:
+            options.append(option)
+        else:
+            print(f"Skipping {option}: {backend} is not installed")
+    if not options:
+        print("No speech recognition backend installed.")
+        sys.exit(1)
+
+    # A fresh process per option keeps the peak memory figures independent
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for option in options:
+        print(f"Benchmarking {option}...")
+        with context.Pool(1) as pool:
+            rows.append(pool.apply(run_option, (option, fixtures)))
+
+    total_audio = sum(len(f["samples"]) for f in fixtures) / RATE
+    print(f"\n{'='*80}")
+    print(f"STT BENCHMARK ({len(fixtures)} fixtures, {total_audio:.1f}s of audio)")
+    print(f"{'='*80}")
+    print(
+        f"{'Option':<24}{'WER':>8}{'RTF':>8}{'p50 ms':>10}"
+        f"{'Load s':>9}{'Peak MB':>10}{'Model MB':>10}"
+    )
+    for row in rows:
+        print(
+            f"{row['option']:<24}{row['wer']:>8.1%}{row['rtf']:>8.2f}"
+            f"{row['latency_ms_p50']:>10.0f}{row['load_seconds']:>9.1f}"
+            f"{row['peak_rss_mb']:>10.0f}{row['model_rss_mb']:>10.0f}"
+        )
+    print(f"{'='*80}")
+    print("RTF = transcription time / audio duration (lower is faster)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+TTS backend benchmark: synthesis latency and real-time factor per engine.
+
+The real-time factor (RTF) is synthesis time divided by the duration of the
+audio produced; below 1.0 the engine renders faster than it speaks. Timings
+include the tempo change (ffmpeg or in-process for gTTS, in-engine for local
+backends) and bypass the audio cache.
+
+Usage:
+    python -m src.benchmarks.tts_benchmark [--backends gtts espeak pyttsx3] [--repeats 3]
+        [--pipeline memory|file]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.tts_backends import BACKENDS, available_backends
+from src.utils.tts_utils import TextToSpeech
+
+SENTENCES = [
+    "How much would you like to deposit?",
+    "Your current account balance is 1,250 dollars.",
+    "A Certificate of Deposit locks in a fixed interest rate for a set term, "
+    "and withdrawing early usually means paying a penalty.",
+    "You can reset your online banking password from the login page by "
+    "selecting forgot password and following the instructions sent to your email.",
+]
+
+
+def audio_duration(path: str):
+    """Duration of an audio file in seconds, or None if it cannot be measured."""
+    if path.endswith(".wav"):
+        with wave.open(path, "rb") as audio:
+            return audio.getnframes() / audio.getframerate()
+
+    if shutil.which("ffprobe"):
+        completed = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            return float(completed.stdout.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def benchmark_backend(name: str, sentences: list, repeats: int) -> dict:
+    """Render every sentence `repeats` times with one backend."""
+    tts = TextToSpeech(backend=name)
+    latencies_ms = []
+    audio_seconds = 0.0
+    synthesis_seconds = 0.0
+    measured = True
+
+    for _ in range(repeats):
+        for sentence in sentences:
+            clean_text = tts._clean_text(sentence)
+            start = time.perf_counter()
+            if tts.in_memory:
+                clip = tts.render_clip(clean_text)
+                elapsed = time.perf_counter() - start
+                duration = clip.duration
+            else:
+                path = tts.render(clean_text)
+                elapsed = time.perf_counter() - start
+                try:
+                    duration = audio_duration(path)
+                finally:
+                    os.unlink(path)
+
+            latencies_ms.append(elapsed * 1000)
+            synthesis_seconds += elapsed
+            if duration is None:
+                measured = False
+            else:
+                audio_seconds += duration
+
+    return {
+        "backend": name,
+        "pipeline": "memory" if tts.in_memory else "file",
+        "speed": tts.effective_speed,
+        "utterances": len(latencies_ms),
+        "latency_ms_mean": statistics.mean(latencies_ms),
+        "latency_ms_p50": statistics.median(latencies_ms),
+        "latency_ms_max": max(latencies_ms),
+        "audio_seconds": audio_seconds if measured else None,
+        "rtf": synthesis_seconds / audio_seconds if measured and audio_seconds else None,
+    }
+
+
+def main():
+    """Parse arguments, run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare TTS backends")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=None,
+        choices=sorted(BACKENDS),
+        help="Backends to compare (default: every installed backend)",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per sentence")
+    parser.add_argument(
+        "--pipeline",
+        choices=["memory", "file"],
+        default=None,
+        help="Audio pipeline to measure (default: TTS_AUDIO_PIPELINE)",
+    )
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+    if args.pipeline:
+        os.environ["TTS_AUDIO_PIPELINE"] = args.pipeline
+
+    installed = available_backends()
+    backends = args.backends or installed
+    missing = [name for name in backends if name not in installed]
+    if missing:
+        print(f"Skipping backends that are not installed: {', '.join(missing)}")
+    backends = [name for name in backends if name in installed]
+    if not backends:
+        print("No TTS backend installed.")
+        sys.exit(1)
+
+    rows = [benchmark_backend(name, SENTENCES, args.repeats) for name in backends]
+
+    print(f"\n{'='*80}")
+    print(f"TTS BACKEND BENCHMARK ({len(SENTENCES)} sentences x {args.repeats})")
+    print(f"{'='*80}")
+    print(
+        f"{'Backend':<12}{'Pipeline':>10}{'Speed':>8}{'Mean ms':>10}{'p50 ms':>10}"
+        f"{'Max ms':>10}{'Audio s':>10}{'RTF':>8}"
+    )
+    for row in rows:
+        audio = f"{row['audio_seconds']:.1f}" if row["audio_seconds"] else "n/a"
+        rtf = f"{row['rtf']:.2f}" if row["rtf"] else "n/a"
+        print(
+            f"{row['backend']:<12}{row['pipeline']:>10}{row['speed']:>8.2f}{row['latency_ms_mean']:>10.0f}"
+            f"{row['latency_ms_p50']:>10.0f}{row['latency_ms_max']:>10.0f}"
+            f"{audio:>10}{rtf:>8}"
+        )
+    print(f"{'='*80}")
+    print("RTF = synthesis time / audio duration (lower is faster)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
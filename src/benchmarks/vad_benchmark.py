@@ -0,0 +1,146 @@
+"""
+Voice activity detection benchmark: microphone capture time per utterance.
+
+Each fixture is replayed chunk by chunk through the capture loop, followed by
+background noise up to the phrase time limit (the microphone keeps recording
+after the user stops talking). The legacy byte-threshold check is compared
+with EnergyVAD, and the audio handed to Whisper is measured after trimming.
+
+Fixtures are mono WAV files in --fixtures (see audio_fixtures.py). Without
+any, they are generated with espeak (when installed) or as a synthetic
+speech-like signal; --save-fixtures writes them out for reuse.
+
+Usage:
+    python -m src.benchmarks.vad_benchmark [--fixtures DIR] [--timeout 5] [--phrase-limit 10]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from src.benchmarks.audio_fixtures import FIXTURE_DIR, NOISE_RMS, RATE, fixtures_or_generated
+from src.utils.vad import EnergyVAD, frame_rms, speech_bounds
+
+CHUNK = 1024
+
+
+def microphone_stream(samples: np.ndarray, phrase_limit: float, rng) -> np.ndarray:
+    """The fixture followed by background noise at its own noise level, up to phrase_limit."""
+    levels = frame_rms(samples, RATE)
+    noise_rms = float(np.percentile(levels, 10)) if len(levels) else NOISE_RMS
+    total = int(phrase_limit * RATE)
+    tail = rng.normal(0, noise_rms, max(0, total - len(samples))).astype(np.float32)
+    return np.concatenate([samples, tail])[:total]
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def legacy_capture(pcm: bytes, timeout: float, phrase_limit: float) -> int:
+    """Chunks recorded by the old `max(data) < 500` loop."""
+    silent_chunks = 0
+    max_silent_chunks = int(timeout * RATE / CHUNK)
+    recorded = 0
+    for index in range(int(phrase_limit * RATE / CHUNK)):
+        data = pcm[index * CHUNK * 2 : (index + 1) * CHUNK * 2]
+        recorded += 1
+        if max(data) < 500:
+            silent_chunks += 1
+            if silent_chunks > max_silent_chunks:
+                break
+        else:
+            silent_chunks = 0
+    return recorded
+
+
+def vad_capture(samples: np.ndarray, timeout: float, phrase_limit: float):
+    """Chunks recorded by the VAD loop, and whether speech was detected."""
+    vad = EnergyVAD(RATE)
+    max_wait_chunks = int(timeout * RATE / CHUNK)
+    recorded = 0
+    for index in range(int(phrase_limit * RATE / CHUNK)):
+        recorded += 1
+        if vad.feed(samples[index * CHUNK : (index + 1) * CHUNK]):
+            break
+        if not vad.speech_started and index >= max_wait_chunks:
+            break
+    return recorded, vad.speech_started
+
+
+def benchmark_fixture(fixture: dict, timeout: float, phrase_limit: float, rng) -> dict:
+    samples = microphone_stream(fixture["samples"], phrase_limit, rng)
+    speech_start, speech_end = speech_bounds(fixture["samples"], RATE, padding_ms=0)
+
+    legacy_chunks = legacy_capture(to_pcm16(samples), timeout, phrase_limit)
+    vad_chunks, detected = vad_capture(samples, timeout, phrase_limit)
+    captured = samples[: vad_chunks * CHUNK]
+    start, end = speech_bounds(captured, RATE)
+
+    return {
+        "fixture": fixture["name"],
+        "speech_seconds": (speech_end - speech_start) / RATE,
+        "legacy_capture_seconds": legacy_chunks * CHUNK / RATE,
+        "vad_capture_seconds": vad_chunks * CHUNK / RATE,
+        # Time from the end of speech until recording stopped
+        "vad_stop_delay_seconds": vad_chunks * CHUNK / RATE - speech_end / RATE,
+        "trimmed_seconds": (end - start) / RATE,
+        "detected": detected,
+    }
+
+
+def main():
+    """Parse arguments, run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark voice activity detection")
+    parser.add_argument("--fixtures", default=str(FIXTURE_DIR), help="Directory of WAV files")
+    parser.add_argument("--timeout", type=float, default=5, help="Seconds to wait for speech")
+    parser.add_argument(
+        "--phrase-limit", type=float, default=10, help="Maximum recording seconds"
+    )
+    parser.add_argument("--save-fixtures", default=None, help="Write generated fixtures here")
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    fixtures = fixtures_or_generated(Path(args.fixtures), args.save_fixtures, rng)
+
+    rows = [benchmark_fixture(f, args.timeout, args.phrase_limit, rng) for f in fixtures]
+
+    print(f"\n{'='*80}")
+    print(f"VAD BENCHMARK (timeout {args.timeout:g}s, phrase limit {args.phrase_limit:g}s)")
+    print(f"{'='*80}")
+    print(
+        f"{'Fixture':<20}{'Speech s':>10}{'Legacy s':>10}{'VAD s':>8}"
+        f"{'Stop delay':>12}{'Trimmed s':>11}{'Detected':>10}"
+    )
+    for row in rows:
+        print(
+            f"{row['fixture']:<20}{row['speech_seconds']:>10.2f}"
+            f"{row['legacy_capture_seconds']:>10.2f}{row['vad_capture_seconds']:>8.2f}"
+            f"{row['vad_stop_delay_seconds']:>12.2f}{row['trimmed_seconds']:>11.2f}"
+            f"{'yes' if row['detected'] else 'no':>10}"
+        )
+    legacy = statistics.mean(r["legacy_capture_seconds"] for r in rows)
+    vad = statistics.mean(r["vad_capture_seconds"] for r in rows)
+    print(f"{'='*80}")
+    print(
+        f"Mean capture: legacy {legacy:.2f}s, VAD {vad:.2f}s "
+        f"({(1 - vad / legacy) * 100:.0f}% shorter)"
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
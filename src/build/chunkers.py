@@ -0,0 +1,243 @@
+"""
+Pluggable chunkers used to split knowledge files before indexing.
+"""
+
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Upper bound for structure-aware chunks; longer sections are split without overlap
+MAX_CHUNK_CHARS = 1000
+
+_QUESTION_PREFIX = "Q:"
+_ANSWER_PREFIX = "A:"
+
+
+def _is_heading(line: str) -> bool:
+    """Section headings in the knowledge files are written in capitals."""
+    return bool(line) and line.isupper()
+
+
+def _is_subheading(lines: List[str]) -> bool:
+    """A paragraph starts with a subheading when its short first line has no full stop."""
+    return len(lines) > 1 and len(lines[0]) <= 80 and not lines[0].endswith(".")
+
+
+def _split_long(text: str, prefix: str) -> List[str]:
+    """Split text longer than MAX_CHUNK_CHARS, repeating the heading prefix."""
+    if len(text) <= MAX_CHUNK_CHARS:
+        return [text]
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=MAX_CHUNK_CHARS - len(prefix) - 1, chunk_overlap=0
+    )
+    body = text[len(prefix) :].strip() if text.startswith(prefix) else text
+    return [f"{prefix}\n{part}" if prefix else part for part in splitter.split_text(body)]
+
+
+def _make_chunks(
+    text: str, prefix: str, source: Document, chunker: str, **metadata
+) -> List[Document]:
+    """Create chunk(s) for text, keeping the source document's metadata."""
+    return [
+        Document(
+            page_content=part,
+            metadata={**source.metadata, "chunker": chunker, **metadata},
+        )
+        for part in _split_long(text, prefix)
+    ]
+
+
+def recursive_chunker(documents: List[Document]) -> List[Document]:
+    """
+    Fixed-size character chunks with overlap (the original splitter).
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000, chunk_overlap=200, length_function=len
+    )
+    chunks = splitter.split_documents(documents)
+    for chunk in chunks:
+        chunk.metadata["chunker"] = "recursive"
+    return chunks
+
+
+def _qa_blocks(text: str) -> List[Tuple[str, str, List[str]]]:
+    """
+    Group lines into (section, question, lines) blocks.
+
+    A block is a Q/A pair or a free-standing paragraph; headings only update
+    the current section.
+    """
+    blocks = []
+    section = ""
+    question = ""
+    lines: List[str] = []
+
+    def close():
+        if lines:
+            blocks.append((section, question, lines))
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+
+        if line.startswith(_QUESTION_PREFIX):
+            close()
+            question = line[len(_QUESTION_PREFIX) :].strip()
+            lines = [line]
+        elif _is_heading(line):
+            close()
+            section, question, lines = line, "", []
+        elif line:
+            lines = lines + [line]
+        elif lines and not lines[-1].startswith(_QUESTION_PREFIX):
+            # A blank line closes a Q/A pair or paragraph (but not a bare question)
+            close()
+            question, lines = "", []
+
+    close()
+    return blocks
+
+
+def extract_qa_pairs(text: str) -> List[Dict[str, str]]:
+    """
+    Extract canonical question/answer pairs from a Q:/A: formatted document.
+
+    Returns:
+        List of {"question", "answer", "section"} dictionaries (empty when the
+        document has no Q/A pairs)
+    """
+    pairs = []
+    for section, question, lines in _qa_blocks(text):
+        answer_lines = [line for line in lines if not line.startswith(_QUESTION_PREFIX)]
+        if not question or not answer_lines:
+            continue
+        answer = " ".join(answer_lines)
+        if answer.startswith(_ANSWER_PREFIX):
+            answer = answer[len(_ANSWER_PREFIX) :].strip()
+        pairs.append({"question": question, "answer": answer, "section": section})
+    return pairs
+
+
+def qa_pair_chunker(documents: List[Document]) -> List[Document]:
+    """
+    One chunk per question/answer pair, prefixed with its section heading.
+
+    Text outside Q/A pairs (closing notes) becomes its own chunk.
+    """
+    chunks = []
+
+    for document in documents:
+        for section, question, lines in _qa_blocks(document.page_content):
+            body = "\n".join(lines)
+            text = f"{section}\n{body}" if section else body
+            chunks.extend(
+                _make_chunks(
+                    text, section, document, "qa", section=section, question=question
+                )
+            )
+
+    return chunks
+
+
+def _section_blocks(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Group paragraphs into (heading, subheading, text) sections.
+
+    Paragraphs without their own subheading are merged into the previous
+    section while the result fits in MAX_CHUNK_CHARS.
+    """
+    sections: List[Tuple[str, str, str]] = []
+    heading = ""
+    subheading = ""
+
+    for block in re.split(r"\n\s*\n", text):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if not lines:
+            continue
+
+        if _is_heading(lines[0]):
+            heading, subheading = lines[0], ""
+            lines = lines[1:]
+            if not lines:
+                continue
+            paragraph = " ".join(lines)
+        elif _is_subheading(lines):
+            subheading = lines[0]
+            paragraph = " ".join(lines[1:])
+        else:
+            paragraph = " ".join(lines)
+            if sections and sections[-1][:2] == (heading, subheading):
+                merged = f"{sections[-1][2]}\n{paragraph}"
+                if len(merged) <= MAX_CHUNK_CHARS:
+                    sections[-1] = (heading, subheading, merged)
+                    continue
+
+        sections.append((heading, subheading, paragraph))
+
+    return sections
+
+
+def section_chunker(documents: List[Document]) -> List[Document]:
+    """
+    One chunk per titled section, prefixed with "HEADING > Subheading".
+
+    Sections longer than MAX_CHUNK_CHARS are split without overlap, each part
+    keeping the heading prefix.
+    """
+    chunks = []
+
+    for document in documents:
+        for heading, subheading, body in _section_blocks(document.page_content):
+            prefix = " > ".join(part for part in (heading, subheading) if part)
+            text = f"{prefix}\n{body}" if prefix else body
+            chunks.extend(
+                _make_chunks(
+                    text,
+                    prefix,
+                    document,
+                    "section",
+                    section=heading,
+                    subsection=subheading,
+                )
+            )
+
+    return chunks
+
+
+CHUNKERS: Dict[str, Callable[[List[Document]], List[Document]]] = {
+    "recursive": recursive_chunker,
+    "qa": qa_pair_chunker,
+    "section": section_chunker,
+}
+
+# Chunker used for each knowledge file when none is given explicitly
+DEFAULT_CHUNKERS = {
+    "faq": "qa",
+    "investment": "section",
+    "policy": "section",
+}
+
+
+def get_chunker(name: str) -> Callable[[List[Document]], List[Document]]:
+    """
+    Returns the chunker registered under name.
+
+    Raises:
+        ValueError: If no chunker has that name
+    """
+    if name not in CHUNKERS:
+        raise ValueError(
+            f"Unknown chunker '{name}'. Available: {', '.join(sorted(CHUNKERS))}"
+        )
+    return CHUNKERS[name]
+
+
+def default_chunker_name(document_path: str) -> str:
+    """
+    Returns the chunker configured for a document, falling back to "recursive".
+    """
+    document_id = os.path.splitext(os.path.basename(document_path))[0].lower()
+    return DEFAULT_CHUNKERS.get(document_id, "recursive")
@@ -3,17 +3,26 @@ This script is used to build the data pipeline for the RAG system
 """
 
 from datetime import datetime, timezone
+import argparse
+import json
 import os
-import sys
 import uuid
 
 from langchain_community.document_loaders import TextLoader
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.build.chunkers import (
+    CHUNKERS,
+    default_chunker_name,
+    extract_qa_pairs,
+    get_chunker,
+)
+from src.utils.answer_lookup import AnswerLookup
+from src.utils.lexical_index import LexicalIndex
+from src.utils.vector_lib import BUILD_INFO_FILE, get_embeddings
 
-def build_index(document_path: str, index_dir: str = None):
+
+def build_index(document_path: str, index_dir: str = None, chunker: str = None):
     """
     Build a FAISS index from a document with metadata.
 
@@ -21,6 +30,11 @@ def build_index(document_path: str, index_dir: str = None):
         document_path (str): Path to the document to index.
         index_dir (str, optional): Directory to save the index. If None, derives from document filename.
                                   Format: storage/vectors/{filename}_index/
+        chunker (str, optional): Name of the chunker to use (see src.build.chunkers.CHUNKERS).
+                                 If None, uses the chunker configured for the document.
+
+    Returns:
+        dict: Index directory, chunker name and number of chunks
     """
     # Extract filename from document path and create index directory name
     if index_dir is None:
@@ -28,7 +42,7 @@ def build_index(document_path: str, index_dir: str = None):
         document_filename = os.path.splitext(os.path.basename(document_path))[0]
         # Convert to lowercase and create index directory path
         index_dir = f"storage/vectors/{document_filename.lower()}_index"
-    
+
     if not os.path.exists(index_dir):
         os.makedirs(index_dir, exist_ok=True)
 
@@ -37,10 +51,8 @@ def build_index(document_path: str, index_dir: str = None):
     documents = loader.load()
 
     # Split text into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000, chunk_overlap=200, length_function=len
-    )
-    chunks = text_splitter.split_documents(documents)
+    chunker = chunker or default_chunker_name(document_path)
+    chunks = get_chunker(chunker)(documents)
 
     document_id = os.path.splitext(os.path.basename(document_path))[0]
     for idx, chunk in enumerate(chunks):
@@ -56,22 +68,67 @@ def build_index(document_path: str, index_dir: str = None):
         )
 
     # Create embeddings and vector store
-    embeddings = HuggingFaceEmbeddings(
-        model_name=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
-        model_kwargs={"device": "cuda" if os.getenv("USE_CUDA") == "true" else "cpu"},
-    )
+    embeddings = get_embeddings()
 
-    # Create and save chunk embeddings in vector store
-    vector_store = FAISS.from_documents(chunks, embeddings)
+    # Create and save chunk embeddings in vector store.
+    # Chunk ids double as docstore ids so the lexical index can refer to them.
+    chunk_ids = [chunk.metadata["id"] for chunk in chunks]
+    vector_store = FAISS.from_documents(chunks, embeddings, ids=chunk_ids)
     vector_store.save_local(index_dir)
 
+    # Build the BM25 inverted index over the same chunks
+    lexical_index = LexicalIndex.from_texts(
+        [chunk.page_content for chunk in chunks], chunk_ids
+    )
+    lexical_index.save(index_dir)
+
+    # Canonical Q/A pairs can be answered directly, without retrieval or the LLM
+    qa_pairs = [
+        pair for document in documents for pair in extract_qa_pairs(document.page_content)
+    ]
+    if qa_pairs:
+        AnswerLookup(qa_pairs).save(index_dir)
+
+    # Lets the app detect an index built with another chunker than the configured one
+    with open(os.path.join(index_dir, BUILD_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "document": document_path,
+                "chunker": chunker,
+                "chunks": len(chunks),
+                "built_at": datetime.now(timezone.utc).isoformat(),
+            },
+            f,
+            indent=2,
+        )
+
     print(f"Index built and saved to {index_dir}")
+    print(f"Chunker: {chunker}")
+    print(f"Lexical terms indexed: {len(lexical_index.postings)}")
+    print(f"Direct answers indexed: {len(qa_pairs)}")
     print(f"Total chunks created: {len(chunks)}")
 
+    return {
+        "index_dir": index_dir,
+        "chunker": chunker,
+        "chunks": len(chunks),
+        "direct_answers": len(qa_pairs),
+    }
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.build.index path/to/document.txt")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Build the vector and lexical indexes for a document",
+        usage="python -m src.build.index path/to/document.txt [--chunker NAME]",
+    )
+    parser.add_argument("document_path", help="Path to the document to index")
+    parser.add_argument(
+        "--chunker",
+        choices=sorted(CHUNKERS),
+        default=None,
+        help="Chunker to use (defaults to the one configured for the document)",
+    )
+    parser.add_argument("--index-dir", default=None, help="Output directory")
+    args = parser.parse_args()
 
-    build_index(sys.argv[1])
\ No newline at end of file
+    build_index(args.document_path, args.index_dir, args.chunker)
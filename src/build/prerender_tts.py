@@ -0,0 +1,72 @@
+"""
+Pre-render frequently spoken phrases into the TTS audio cache.
+
+Usage:
+    python -m src.build.prerender_tts [--phrases src/build/tts_phrases.txt]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from src.utils.audio_cache import get_audio_cache
+from src.utils.tts_utils import get_tts
+
+DEFAULT_PHRASES_FILE = os.path.join(os.path.dirname(__file__), "tts_phrases.txt")
+
+
+def load_phrases(path: str) -> list:
+    """Read one phrase per line, skipping blank lines and # comments."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def prerender(phrases: list) -> dict:
+    """
+    Synthesize every phrase into the audio cache.
+
+    Returns:
+        dict: Phrases, sentences cached, seconds taken and cache stats
+    """
+    tts = get_tts()
+    start = time.perf_counter()
+    sentences = sum(tts.prerender(phrase) for phrase in phrases)
+    return {
+        "phrases": len(phrases),
+        "sentences": sentences,
+        "seconds": time.perf_counter() - start,
+        "cache": get_audio_cache().stats(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-render common phrases into the TTS audio cache"
+    )
+    parser.add_argument(
+        "--phrases",
+        default=DEFAULT_PHRASES_FILE,
+        help="Phrase list, one per line (default: src/build/tts_phrases.txt)",
+    )
+    args = parser.parse_args()
+
+    cache = get_audio_cache()
+    if cache is None:
+        print("TTS cache is disabled (TTS_CACHE_ENABLED=false); nothing to do.")
+        sys.exit(1)
+    if not get_tts().enabled:
+        print("No TTS engine available; install gTTS to pre-render phrases.")
+        sys.exit(1)
+
+    stats = prerender(load_phrases(args.phrases))
+    print(f"Pre-rendered {stats['phrases']} phrases ({stats['sentences']} sentences)")
+    print(f"Time: {stats['seconds']:.1f}s")
+    print(
+        f"Cache: {stats['cache']['entries']} files, "
+        f"{stats['cache']['bytes'] / 1024:.0f} KB in {cache.cache_dir}"
+    )
@@ -2,23 +2,20 @@
 LangFuse evaluator for RAG response quality scoring.
 """
 
-import os
-from openai import OpenAI
+from src.utils.token_usage import enforce_token_budget, usage_callback
 
 
-def evaluate_rag_quality(query: str, response: str, context: str = None) -> dict:
-    """
-    Evaluates RAG response quality on a 1-10 scale.
+def _evaluation_request(query: str, response: str, context: str = None):
+    """Chat model and messages for an evaluation."""
+    from langchain_core.messages import HumanMessage
 
-    Args:
-        query: Original user query
-        response: RAG system's response
-        context: Retrieved context (optional)
+    from src.utils.llm_backends import get_chat_model
 
-    Returns:
-        dict with score, reasoning, and metadata
-    """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    llm = get_chat_model(
+        temperature=0,
+        max_tokens=200,
+        callbacks=[usage_callback("evaluator", "evaluate_rag_quality")],
+    )
 
     evaluation_prompt = f"""You are an expert evaluator assessing the quality of RAG (Retrieval-Augmented Generation) responses.
 
@@ -40,15 +37,12 @@ Score: [1-10]
 Reasoning: [Brief explanation of the score]
 """
 
-    completion = client.chat.completions.create(
-        model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
-        messages=[{"role": "user", "content": evaluation_prompt}],
-        temperature=0,
-        max_tokens=200,
-    )
+    enforce_token_budget(evaluation_prompt, max_tokens=200)
+    return llm, [HumanMessage(content=evaluation_prompt)]
 
-    eval_text = completion.choices[0].message.content
 
+def _parse_evaluation(eval_text: str) -> dict:
+    """Score and reasoning from the evaluator's answer."""
     # Parse score
     score_line = [line for line in eval_text.split("\n") if line.startswith("Score:")]
     score = 5  # default
@@ -75,3 +69,25 @@ Reasoning: [Brief explanation of the score]
             "clarity": True,
         },
     }
+
+
+def evaluate_rag_quality(query: str, response: str, context: str = None) -> dict:
+    """
+    Evaluates RAG response quality on a 1-10 scale.
+
+    Args:
+        query: Original user query
+        response: RAG system's response
+        context: Retrieved context (optional)
+
+    Returns:
+        dict with score, reasoning, and metadata
+    """
+    llm, messages = _evaluation_request(query, response, context)
+    return _parse_evaluation(llm.invoke(messages).content)
+
+
+async def aevaluate_rag_quality(query: str, response: str, context: str = None) -> dict:
+    """Async version of evaluate_rag_quality."""
+    llm, messages = _evaluation_request(query, response, context)
+    return _parse_evaluation((await llm.ainvoke(messages)).content)
@@ -0,0 +1,138 @@
+"""
+Retrieval evaluator: hit rate and latency of the RAG retrievers on labelled questions.
+
+Usage:
+    python -m src.evaluator.retrieval_evaluator [--k 3] [--modes dense hybrid]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.retrieval import get_retriever
+
+DEFAULT_GOLDEN_PATH = project_root / "src" / "test_data" / "retrieval_golden.json"
+
+
+def load_retrieval_golden(path: str = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Load the labelled question set, keyed by vector store name.
+
+    Each question has an `expected_text` that appears verbatim in the source
+    document, so labels stay valid whatever chunker built the index.
+    """
+    with open(path or DEFAULT_GOLDEN_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def is_hit(doc, expected_text: str) -> bool:
+    """Check whether a retrieved chunk contains the labelled answer text."""
+    return " ".join(expected_text.lower().split()) in " ".join(
+        doc.page_content.lower().split()
+    )
+
+
+def evaluate_retriever(retriever, questions: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Run every labelled question through a retriever.
+
+    Args:
+        retriever: Object with a retrieve(query) method returning (doc, score) pairs
+        questions: Labelled questions for the retriever's vector store
+
+    Returns:
+        Dictionary with hit rate, latency stats and the missed questions
+    """
+    hits = 0
+    latencies_ms = []
+    misses = []
+
+    for question in questions:
+        start = time.perf_counter()
+        results = retriever.retrieve(question["question"])
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        if any(is_hit(doc, question["expected_text"]) for doc, _ in results):
+            hits += 1
+        else:
+            misses.append(question["question"])
+
+    total = len(questions)
+    return {
+        "questions": total,
+        "hit_rate": hits / total if total else 0.0,
+        "latency_ms_mean": sum(latencies_ms) / total if total else 0.0,
+        "latency_ms_p50": percentile(latencies_ms, 50),
+        "latency_ms_p95": percentile(latencies_ms, 95),
+        "misses": misses,
+    }
+
+
+def run_evaluation(modes: List[str], k: int, golden_path: str = None) -> list:
+    """Evaluate each retrieval mode on each vector store and print a table."""
+    golden = load_retrieval_golden(golden_path)
+    rows = []
+
+    for store_name, questions in golden.items():
+        for mode in modes:
+            retriever = get_retriever(store_name, mode=mode, k=k)
+            # Load the indexes and embedding model outside of the timed loop
+            retriever.retrieve(questions[0]["question"])
+            metrics = evaluate_retriever(retriever, questions)
+            rows.append({"store": store_name, "mode": mode, "k": k, **metrics})
+
+    print(f"\n{'='*80}")
+    print(f"RETRIEVAL EVALUATION (k={k})")
+    print(f"{'='*80}")
+    print(f"{'Store':<12}{'Mode':<10}{'Hit rate':>10}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in rows:
+        print(
+            f"{row['store']:<12}{row['mode']:<10}{row['hit_rate']:>10.2%}"
+            f"{row['latency_ms_mean']:>10.2f}{row['latency_ms_p50']:>10.2f}"
+            f"{row['latency_ms_p95']:>10.2f}"
+        )
+    print(f"{'='*80}")
+
+    for row in rows:
+        for missed in row["misses"]:
+            print(f"  miss [{row['store']}/{row['mode']}]: {missed}")
+
+    return rows
+
+
+def main():
+    """Parse arguments and run the evaluation."""
+    parser = argparse.ArgumentParser(description="Evaluate RAG retrieval quality")
+    parser.add_argument("--k", type=int, default=3, help="Documents per query")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["dense", "hybrid"],
+        choices=["dense", "hybrid"],
+        help="Retrieval modes to compare",
+    )
+    parser.add_argument("--golden", default=None, help="Labelled question file")
+    args = parser.parse_args()
+
+    run_evaluation(args.modes, args.k, args.golden)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,78 @@
 Main file for the bank application.
 """
 
+import os
 import sys
+import argparse
 import json
+import logging
+import re
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from langgraph.graph import StateGraph
-from langchain_core.messages import HumanMessage
-from src.agents.agent_state import AgentState
 from src.enums.agents_enum import AgentsEnum
-from src.agents.orchestrator import orchestrator_agent
-from src.agents.bank_agent import bank_agent
-from src.agents.investments_agent import investment_agent
-from src.agents.policy_agent import policy_agent
-from src.agents.faq_agent import faq_agent
-from src.agents.aggregator_agent import aggregator_agent
-from src.utils.tts_utils import speak_text
+from src.utils.background import BackgroundTask
+from src.utils.audio_cache import get_audio_cache
+from src.utils.tts_utils import interrupt_speech, speak_text, wait_for_speech
 from src.utils.voice_input_handler import get_voice_handler, listen_for_voice_input
+from src.utils.warmup import start_warmup, warmup_status
 from src.utils.langfuse_utils import get_langfuse_callbacks
-
-
-def create_multi_agent_system():
+from src.utils.metrics import (
+    SlowRequestProfiler,
+    mark,
+    registry,
+    request_trace,
+    timed,
+)
+from src.utils.streaming import SentenceBuffer
+from src.utils.token_usage import TokenBudgetExceeded, format_request_usage, ledger
+
+
+def create_multi_agent_system(use_async: bool = False):
     """
     Creates a multi-agent system for the bank application.
+
+    Args:
+        use_async: Build the graph from the async agents, to be run with
+                   ainvoke/astream; LLM calls are then awaited instead of
+                   blocking a thread per request
+
+    Returns:
+        Compiled LangGraph workflow
     """
+    # Imported here so that LangGraph, LangChain and the agent modules load
+    # while the user reads the welcome banner instead of before it
+    from langgraph.graph import StateGraph
+    from src.agents import aggregator_agent, bank_agent, orchestrator
+    from src.agents import faq_agent, investments_agent, policy_agent
+    from src.agents.agent_state import AgentState
 
     workflow = StateGraph(AgentState)
 
-    workflow.add_node(AgentsEnum.ORCHESTRATOR.value, orchestrator_agent)
-    workflow.add_node(AgentsEnum.BANK.value, bank_agent)
-    workflow.add_node(AgentsEnum.INVESTMENT.value, investment_agent)
-    workflow.add_node(AgentsEnum.POLICY.value, policy_agent)
-    workflow.add_node(AgentsEnum.FAQ.value, faq_agent)
-    workflow.add_node(AgentsEnum.AGGREGATOR.value, aggregator_agent)
+    if use_async:
+        nodes = {
+            AgentsEnum.ORCHESTRATOR.value: orchestrator.aorchestrator_agent,
+            AgentsEnum.BANK.value: bank_agent.abank_agent,
+            AgentsEnum.INVESTMENT.value: investments_agent.ainvestment_agent,
+            AgentsEnum.POLICY.value: policy_agent.apolicy_agent,
+            AgentsEnum.FAQ.value: faq_agent.afaq_agent,
+            AgentsEnum.AGGREGATOR.value: aggregator_agent.aaggregator_agent,
+        }
+    else:
+        nodes = {
+            AgentsEnum.ORCHESTRATOR.value: orchestrator.orchestrator_agent,
+            AgentsEnum.BANK.value: bank_agent.bank_agent,
+            AgentsEnum.INVESTMENT.value: investments_agent.investment_agent,
+            AgentsEnum.POLICY.value: policy_agent.policy_agent,
+            AgentsEnum.FAQ.value: faq_agent.faq_agent,
+            AgentsEnum.AGGREGATOR.value: aggregator_agent.aggregator_agent,
+        }
+    for name, node in nodes.items():
+        # Each node's latency is recorded as "node.<name>"
+        workflow.add_node(name, timed(f"node.{name}")(node))
 
     workflow.set_entry_point(AgentsEnum.ORCHESTRATOR.value)
 
@@ -111,12 +147,220 @@ def create_multi_agent_system():
     return workflow.compile()
 
 
+def stream_workflow(workflow, inputs, config: dict):
+    """
+    Run the workflow, printing and speaking the answer while it is generated.
+
+    Tokens published by the agents (see src/utils/streaming.py) are printed as
+    they arrive and spoken one sentence at a time.
+
+    Args:
+        workflow: Compiled multi-agent graph
+        inputs: Initial state
+        config: Run configuration (callbacks)
+
+    Returns:
+        (final state, True if an answer was streamed)
+    """
+    sentences = SentenceBuffer()
+    result = None
+    streamed = False
+
+    for mode, chunk in workflow.stream(
+        inputs, config=config, stream_mode=["custom", "values"]
+    ):
+        if mode == "values":
+            result = chunk
+            continue
+        if chunk.get("type") != "token":
+            continue
+
+        if not streamed:
+            mark("time_to_first_word")
+            streamed = True
+        print(chunk["text"], end="", flush=True)
+        for sentence in sentences.feed(chunk["text"]):
+            speak_text(sentence)
+
+    if streamed:
+        print()
+        remainder = sentences.flush()
+        if remainder:
+            speak_text(remainder)
+
+    return result, streamed
+
+
+def on_partial_transcript(stable_text: str, full_text: str, speculate: bool = True):
+    """
+    Show a partial voice transcript and start classifying it early.
+
+    Called from the streaming transcription thread while the user is still
+    speaking. Classification starts once the hypothesis reads like a complete
+    sentence, so the orchestrator usually has its answer by the time the
+    final transcript arrives.
+
+    Args:
+        stable_text: Words that will not change any more
+        full_text: Current hypothesis of the whole command
+        speculate: Start a speculative orchestrator classification
+    """
+    print(f"   … {full_text}")
+    if speculate and full_text.rstrip().endswith((".", "?", "!")):
+        from src.agents.orchestrator import speculate as speculate_classification
+
+        speculate_classification(full_text)
+
+
+def handle_response(result: dict, streamed: bool = False):
+    """
+    Print and speak the workflow's response.
+
+    Args:
+        result: Final state returned by the workflow
+        streamed: The answer was already printed and spoken while streaming
+
+    Returns:
+        The pending transaction {"category", "followup"} if the response asks a
+        followup question, otherwise None
+    """
+    if not streamed:
+        mark("time_to_first_word")
+
+    if not result.get("messages"):
+        print(result)
+        return None
+
+    final_message = result["messages"][-1]
+
+    if not hasattr(final_message, "content"):
+        print(result)
+        return None
+
+    response_content = final_message.content
+
+    # An orchestrator classification carries the followup question, if any
+    is_classification = "{" in response_content and "followup" in response_content
+    followup = parse_followup(response_content) if is_classification else None
+    if followup:
+        print(followup["followup"])
+        speak_text(followup["followup"])
+        return followup
+
+    if is_classification or not streamed:
+        print(response_content)
+        speak_text(response_content)
+    return None
+
+
+def parse_followup(response_content: str):
+    """
+    Extract the followup question from an orchestrator classification.
+
+    Args:
+        response_content: Final message of the workflow
+
+    Returns:
+        The pending transaction {"category", "followup"}, or None if the
+        response is not a classification with a followup question
+    """
+    try:
+        json_start = response_content.find("{")
+        json_end = response_content.rfind("}") + 1
+        if json_start < 0 or json_end <= json_start:
+            return None
+
+        json_str = response_content[json_start:json_end]
+        json_str = json_str.replace("'", '"')
+        classification = json.loads(json_str)
+    except (json.JSONDecodeError, Exception):
+        return None
+
+    if not isinstance(classification, dict) or not classification.get("followup"):
+        return None
+    return {
+        "category": classification.get("category", ""),
+        "followup": classification.get("followup", ""),
+    }
+
+
+def apply_pending_transaction(user_input: str, pending_transaction):
+    """
+    Turn the answer to a followup question into a complete query.
+
+    Args:
+        user_input: What the user said after the followup question
+        pending_transaction: {"category", "followup"} from parse_followup, or None
+
+    Returns:
+        (query for the workflow, pending transaction still open or None)
+    """
+    if not pending_transaction:
+        return user_input, None
+
+    # Extract numbers from the input (handles "50", "50 dollars", "$50", etc.)
+    numbers = re.findall(r"\d+\.?\d*", user_input)
+    if numbers:
+        amount = float(numbers[0])
+        # Construct a query that includes the transaction type and amount
+        # This helps the orchestrator understand the context
+        return f"I want to {pending_transaction['category']} {amount} dollars", None
+
+    # Even if no number, include context so orchestrator can extract amount from natural language
+    return f"{pending_transaction['category']}: {user_input}", pending_transaction
+
+
 def main():
     """
     Main function to run the multi-agent system.
     """
-    # Create the multi-agent system
-    workflow = create_multi_agent_system()
+    parser = argparse.ArgumentParser(description="Voice-enabled banking assistant")
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Load models and indexes on first use instead of in the background at launch",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a latency waterfall after each request and a summary on exit",
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Keep cProfile/pyinstrument reports of the N slowest requests",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="Profiler used by --profile-slowest",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        metavar="PATH",
+        help="Write latency and token metrics to a JSON file on exit",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the complete answer instead of printing and speaking it as it is generated",
+    )
+    args = parser.parse_args()
+
+    # Diagnostics (e.g. context token savings) are logged at INFO
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+
+    # Build the multi-agent system in the background; the first query waits for it
+    workflow_task = BackgroundTask("workflow_init", create_multi_agent_system).start()
+
+    # Preload the embedding model, indexes, Whisper and the LLM connection in parallel
+    voice_handler = get_voice_handler()
+    if not args.no_warmup:
+        start_warmup(voice_handler)
 
     print("=" * 80)
     print("Welcome to the bank application")
@@ -128,31 +372,54 @@ def main():
     welcome_msg = "Welcome to the bank application. You can ask me about your account, investments, policies, or frequently asked questions."
     speak_text(welcome_msg)
 
-    # Initialize voice input handler
-    voice_handler = get_voice_handler()
     print(f"Voice Status: {voice_handler.get_status()}")
+    if not args.no_warmup:
+        status = ", ".join(f"{name} {state}" for name, state in warmup_status().items())
+        print(f"Warm-up: {status}")
 
-    if voice_handler.is_voice_enabled():
+    # Checked against enabled, not the mute state: the welcome message is
+    # usually still playing (and muting voice input) at this point
+    if voice_handler.enabled:
         print(
             "💡 Tip: Type 'voice' or 'v' to use voice input, or just type your query normally."
         )
 
+    profiler = (
+        SlowRequestProfiler(keep=args.profile_slowest, backend=args.profiler)
+        if args.profile_slowest
+        else None
+    )
+
     # Track conversation state
     pending_transaction = None  # Store {"category": "deposit", "followup": "..."}
 
     while True:
         # Offer input options
-        if voice_handler.is_voice_enabled():
+        if voice_handler.enabled:
             user_input = input(
                 "Enter your query (or type 'voice' or 'v' for voice input): "
             )
         else:
             user_input = input("Enter your query: ")
 
+        # New input cuts off whatever is still being spoken (barge-in)
+        interrupt_speech()
+
         # Handle voice input mode
-        if voice_handler.is_voice_enabled() and user_input.lower() in ["voice", "v"]:
+        if voice_handler.enabled and user_input.lower() in ["voice", "v"]:
+            # Let the interrupted speech drain; playback mutes voice input and
+            # only unmutes it once the speech pipeline is idle
+            wait_for_speech(timeout=2)
+            voice_handler.unmute_listening()
             print("🎤 Voice mode activated. Please speak your command...")
-            voice_input = listen_for_voice_input(timeout=10)
+            # Without a pending transaction, the transcript is the query as-is
+            # and can be classified before the user has finished speaking
+            voice_input = listen_for_voice_input(
+                timeout=10,
+                on_partial=lambda stable, full: on_partial_transcript(
+                    stable, full, speculate=pending_transaction is None
+                ),
+            )
 
             if voice_input:
                 user_input = voice_input
@@ -165,22 +432,9 @@ def main():
             break
 
         # If there's a pending transaction, enhance the query to include context
-        if pending_transaction:
-            import re
-
-            # Extract numbers from the input (handles "50", "50 dollars", "$50", etc.)
-            numbers = re.findall(r"\d+\.?\d*", user_input)
-            if numbers:
-                amount = float(numbers[0])
-                # Construct a query that includes the transaction type and amount
-                # This helps the orchestrator understand the context
-                user_input = (
-                    f"I want to {pending_transaction['category']} {amount} dollars"
-                )
-                pending_transaction = None  # Clear pending transaction
-            else:
-                # Even if no number, include context so orchestrator can extract amount from natural language
-                user_input = f"{pending_transaction['category']}: {user_input}"
+        user_input, pending_transaction = apply_pending_transaction(
+            user_input, pending_transaction
+        )
 
         # For each new query, start fresh (don't accumulate conversation history)
         # This prevents multi-query responses from being cached/reused
@@ -190,7 +444,7 @@ def main():
             trace_name="banking_conversation",
             metadata={
                 "user_query": user_input,
-                "voice_enabled": voice_handler.is_voice_enabled(),
+                "voice_enabled": voice_handler.enabled,
                 "has_pending_transaction": pending_transaction is not None,
             },
         )
@@ -198,59 +452,67 @@ def main():
         # Configure workflow with LangFuse monitoring
         config = {"callbacks": langfuse_callbacks} if langfuse_callbacks else {}
 
-        result = workflow.invoke(
-            AgentState(messages=[HumanMessage(content=user_input)]), config=config
-        )
-
-        # Update conversation messages with the result
-        if not result.get("messages"):
-            print(result)
-            continue
-
-        final_message = result["messages"][-1]
-
-        if not hasattr(final_message, "content"):
-            print(result)
-            continue
-
-        response_content = final_message.content
-
-        # Check if this is an orchestrator response with a followup
-        if not ("{" in response_content and "followup" in response_content):
-            print(response_content)
-            speak_text(response_content)
-            continue
-
-        # Try to parse JSON from response
-        try:
-            json_start = response_content.find("{")
-            json_end = response_content.rfind("}") + 1
-
-            if json_start < 0 or json_end <= json_start:
-                print(response_content)
-                speak_text(response_content)
-                continue
-
-            json_str = response_content[json_start:json_end]
-            json_str = json_str.replace("'", '"')
-            classification = json.loads(json_str)
-
-            # Handle followup question
-            if classification.get("followup"):
-                followup_text = classification["followup"]
-                print(followup_text)
-                speak_text(followup_text)
-                pending_transaction = {
-                    "category": classification.get("category", ""),
-                    "followup": classification.get("followup", ""),
-                }
-            else:
-                print(response_content)
-                speak_text(response_content)
+        from langchain_core.messages import HumanMessage
+        from src.agents.agent_state import AgentState
+
+        workflow = workflow_task.result()
+        with request_trace(user_input, profiler=profiler) as trace:
+            inputs = AgentState(messages=[HumanMessage(content=user_input)])
+            streamed = False
+            try:
+                if args.no_stream:
+                    result = workflow.invoke(inputs, config=config)
+                else:
+                    result, streamed = stream_workflow(workflow, inputs, config)
+            except TokenBudgetExceeded as e:
+                print(f"Sorry, that request is too large to answer ({e}).")
+                result = None
+
+            # Print and speak the response; a followup question starts a pending transaction
+            followup = None
+            if result is not None:
+                followup = handle_response(result, streamed)
+            if followup:
+                pending_transaction = followup
+
+        if args.profile:
+            print(trace.format_waterfall())
+            usage = format_request_usage(trace)
+            if usage:
+                print(usage)
+
+    if args.profile:
+        print("=" * 80)
+        print("Latency by span")
+        print("=" * 80)
+        print(registry.format_table())
+        print("=" * 80)
+        print("Token usage")
+        print("=" * 80)
+        print(ledger.format_table())
+
+        audio_cache = get_audio_cache()
+        if audio_cache is not None:
+            stats = audio_cache.stats()
+            print(
+                f"TTS cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} files, "
+                f"{stats['bytes'] / 1024:.0f} KB"
+            )
 
-        except (json.JSONDecodeError, Exception):
-            print(response_content)
-            speak_text(response_content)
+    if profiler and profiler.slowest:
+        print("\nProfiles of the slowest requests:")
+        for duration_ms, path in profiler.slowest:
+            print(f"  {duration_ms:>8.0f} ms  {path}")
+
+    if args.metrics_out:
+        with open(args.metrics_out, "w", encoding="utf-8") as f:
+            json.dump(
+                {"latency": registry.snapshot(), "tokens": ledger.snapshot()},
+                f,
+                indent=2,
+            )
+        print(f"Metrics written to {args.metrics_out}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,467 @@
+"""
+HTTP and WebSocket server for the bank application.
+
+Serves the async multi-agent graph (see create_multi_agent_system) on one
+event loop, so many conversations can be handled by a single process:
+
+- POST /chat           {"message", "session_id"?, "account_id"?} -> complete answer;
+                       without session_id a new session is started, and an
+                       unknown or evicted session_id gets 404
+- GET  /ws             WebSocket; each {"message", ...} is answered with
+                       {"type": "token"} messages followed by {"type": "answer"}
+- DELETE /sessions/ID  Forget a session
+- GET  /health         Sessions, requests in flight and warm-up status
+- GET  /metrics        Latency and token usage
+
+Each session keeps the state the console keeps between queries: the pending
+transaction of a followup question ("How much would you like to deposit?")
+and the account the bank agent operates on. Sessions idle for longer than
+SERVER_SESSION_IDLE_S are evicted, and at most SERVER_MAX_SESSIONS are kept
+(least recently used first out). At most SERVER_MAX_CONCURRENT requests run
+the graph at once; others wait up to SERVER_QUEUE_TIMEOUT_S, then get 503.
+
+Usage:
+    python -m src.server --offline
+    python -m src.server --host 0.0.0.0 --port 8080 --max-concurrent 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+
+from src.utils.metrics import registry, request_trace
+from src.utils.token_usage import TokenBudgetExceeded, ledger
+
+load_dotenv()
+
+
+@dataclass
+class Session:
+    """Conversation state kept between the queries of one user."""
+
+    session_id: str
+    account_id: str
+    pending_transaction: Optional[dict] = None
+    last_seen: float = field(default_factory=time.monotonic)
+    # Queries of one session are answered in order
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class SessionStore:
+    """Bounded session storage with idle eviction."""
+
+    def __init__(self, max_sessions: int, idle_seconds: float):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def create(self, account_id: str) -> Session:
+        """
+        Start a session with a new server-issued id.
+
+        Args:
+            account_id: Account the bank agent operates on for this session
+
+        Returns:
+            The new session, marked as most recently used
+        """
+        self.evict_idle()
+        session = Session(uuid.uuid4().hex, account_id)
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """
+        Return an existing session.
+
+        Args:
+            session_id: Id issued by create()
+
+        Returns:
+            The session, marked as most recently used, or None if the id was
+            never issued or the session has been evicted
+        """
+        self.evict_idle()
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        session.last_seen = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Forget a session; returns False if it did not exist."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than idle_seconds; returns how many."""
+        cutoff = time.monotonic() - self.idle_seconds
+        evicted = 0
+        # Sessions are ordered by last use, so the idle ones come first
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_seen >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+
+class BankAssistantServer:
+    """Answers queries with the async graph, one Session per conversation."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_sessions: int,
+        idle_seconds: float,
+        queue_timeout: float,
+        default_account: str,
+    ):
+        self.sessions = SessionStore(max_sessions, idle_seconds)
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.default_account = default_account
+        self.in_flight = 0
+        self.workflow = None
+        self._limit = None
+        self._evictor = None
+
+    async def start(self, app=None):
+        """Build the graph and start warming up models and indexes."""
+        from src.main import create_multi_agent_system
+        from src.utils.warmup import start_warmup
+
+        self._limit = asyncio.Semaphore(self.max_concurrent)
+        self.workflow = await asyncio.to_thread(create_multi_agent_system, True)
+        start_warmup()
+        self._evictor = asyncio.create_task(self._evict_periodically())
+
+    async def stop(self, app=None):
+        """Stop the idle session eviction task."""
+        if self._evictor:
+            self._evictor.cancel()
+
+    async def _evict_periodically(self):
+        interval = max(1.0, min(60.0, self.sessions.idle_seconds / 2))
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.evict_idle()
+
+    async def answer(self, session: Session, message: str, on_token=None) -> dict:
+        """
+        Answer one message of a conversation.
+
+        Args:
+            session: The conversation
+            message: What the user said
+            on_token: Optional coroutine function called with each streamed
+                      piece of the answer
+
+        Returns:
+            {"session_id", "answer", "followup", "duration_ms"}; "followup" is
+            True when the answer is a question the next message should reply to
+
+        Raises:
+            asyncio.TimeoutError: The server stayed at its concurrency limit
+                                  for longer than the queue timeout
+            TokenBudgetExceeded: The request is over the token budget
+        """
+        from langchain_core.messages import HumanMessage
+
+        from src.agents.agent_state import AgentState
+        from src.main import apply_pending_transaction, parse_followup
+
+        async with session.lock:
+            await asyncio.wait_for(self._limit.acquire(), self.queue_timeout)
+            self.in_flight += 1
+            try:
+                query, pending = apply_pending_transaction(
+                    message, session.pending_transaction
+                )
+                inputs = AgentState(
+                    messages=[HumanMessage(content=query)], account_id=session.account_id
+                )
+                result = None
+                with request_trace(query) as trace:
+                    async for mode, chunk in self.workflow.astream(
+                        inputs, stream_mode=["custom", "values"]
+                    ):
+                        if mode == "values":
+                            result = chunk
+                        elif chunk.get("type") == "token" and on_token:
+                            await on_token(chunk["text"])
+            finally:
+                self.in_flight -= 1
+                self._limit.release()
+
+            answer = result["messages"][-1].content if result and result.get("messages") else ""
+            followup = None
+            if "{" in answer and "followup" in answer:
+                followup = parse_followup(answer)
+            # A new followup question replaces the pending one; answering it clears it
+            session.pending_transaction = followup or pending
+            session.last_seen = time.monotonic()
+            return {
+                "session_id": session.session_id,
+                "answer": followup["followup"] if followup else answer,
+                "followup": followup is not None,
+                "duration_ms": trace.duration_ms,
+            }
+
+    async def _session_for(self, payload: dict) -> tuple:
+        """
+        Find or start the session a payload belongs to.
+
+        An unknown session id is never turned into a new session: it may be a
+        session that was evicted, and a new one would silently operate on the
+        default account instead of the one the conversation started with.
+
+        Args:
+            payload: Message with optional "session_id" and "account_id"
+
+        Returns:
+            (session, None, None), or (None, error message, HTTP status)
+        """
+        session_id = payload.get("session_id")
+        account_id = payload.get("account_id")
+        if not isinstance(session_id, (str, type(None))) or not isinstance(
+            account_id, (str, type(None))
+        ):
+            return None, "'session_id' and 'account_id' must be strings", 400
+        if session_id:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None, "Unknown or expired session, start a new one", 404
+            if account_id and account_id != session.account_id:
+                return None, "Session belongs to another account", 409
+            return session, None, None
+
+        if account_id:
+            from src.database.bank_db import get_bank_db
+
+            details = await asyncio.to_thread(get_bank_db().get_account_details, account_id)
+            if details is None:
+                return None, "Unknown account", 404
+        return self.sessions.create(account_id or self.default_account), None, None
+
+    async def handle_chat(self, request):
+        """POST /chat: answer one message as JSON."""
+        from aiohttp import web
+
+        try:
+            payload = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Body must be JSON"}, status=400)
+        if not isinstance(payload, dict):
+            return web.json_response({"error": "Body must be a JSON object"}, status=400)
+        message = payload.get("message")
+        if not isinstance(message, str) or not message.strip():
+            return web.json_response({"error": "'message' is required"}, status=400)
+        message = message.strip()
+
+        session, error, status = await self._session_for(payload)
+        if session is None:
+            return web.json_response({"error": error}, status=status)
+        try:
+            return web.json_response(await self.answer(session, message))
+        except asyncio.TimeoutError:
+            return web.json_response({"error": "Server busy, try again"}, status=503)
+        except TokenBudgetExceeded as e:
+            return web.json_response({"error": f"Request too large: {e}"}, status=413)
+        except Exception as e:
+            return web.json_response({"error": type(e).__name__}, status=500)
+
+    async def handle_websocket(self, request):
+        """GET /ws: answer messages over a WebSocket, streaming the tokens."""
+        from aiohttp import WSMsgType, web
+
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session_id = request.query.get("session_id")
+
+        async def send_token(text: str):
+            await ws.send_json({"type": "token", "text": text})
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                payload = json.loads(msg.data)
+            except json.JSONDecodeError:
+                payload = {"message": msg.data}
+            if not isinstance(payload, dict):
+                await ws.send_json({"type": "error", "error": "Message must be a JSON object"})
+                continue
+            message = payload.get("message")
+            if not isinstance(message, str) or not message.strip():
+                await ws.send_json({"type": "error", "error": "'message' is required"})
+                continue
+            message = message.strip()
+
+            # Messages on one connection belong to the same conversation
+            payload.setdefault("session_id", session_id)
+            session, error, status = await self._session_for(payload)
+            if session is None:
+                await ws.send_json({"type": "error", "error": error, "status": status})
+                if payload["session_id"] == session_id:
+                    # The next message starts a new conversation
+                    session_id = None
+                continue
+            session_id = session.session_id
+            try:
+                reply = await self.answer(session, message, on_token=send_token)
+                await ws.send_json({"type": "answer", **reply})
+            except asyncio.TimeoutError:
+                await ws.send_json({"type": "error", "error": "Server busy, try again"})
+            except TokenBudgetExceeded as e:
+                await ws.send_json({"type": "error", "error": f"Request too large: {e}"})
+            except Exception as e:
+                await ws.send_json({"type": "error", "error": type(e).__name__})
+        return ws
+
+    async def handle_delete_session(self, request):
+        """DELETE /sessions/{session_id}: forget a conversation."""
+        from aiohttp import web
+
+        if self.sessions.remove(request.match_info["session_id"]):
+            return web.json_response({"deleted": True})
+        return web.json_response({"error": "Unknown session"}, status=404)
+
+    async def handle_health(self, request):
+        """GET /health: load and readiness."""
+        from aiohttp import web
+
+        from src.utils.warmup import warmup_status
+
+        return web.json_response(
+            {
+                "status": "ok" if self.workflow is not None else "starting",
+                "sessions": len(self.sessions),
+                "evicted_sessions": self.sessions.evicted,
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "warmup": warmup_status(),
+            }
+        )
+
+    async def handle_metrics(self, request):
+        """GET /metrics: latency by span and token usage."""
+        from aiohttp import web
+
+        return web.json_response(
+            {"latency": registry.snapshot(), "tokens": ledger.snapshot()}
+        )
+
+
+def create_app(server: BankAssistantServer):
+    """
+    Build the aiohttp application.
+
+    Args:
+        server: Server whose handlers and lifecycle the app uses
+
+    Returns:
+        aiohttp.web.Application
+    """
+    from aiohttp import web
+
+    app = web.Application()
+    app.on_startup.append(server.start)
+    app.on_cleanup.append(server.stop)
+    app.router.add_post("/chat", server.handle_chat)
+    app.router.add_get("/ws", server.handle_websocket)
+    app.router.add_delete("/sessions/{session_id}", server.handle_delete_session)
+    app.router.add_get("/health", server.handle_health)
+    app.router.add_get("/metrics", server.handle_metrics)
+    return app
+
+
+def main():
+    """Parse arguments and run the server until interrupted."""
+    from aiohttp import web
+
+    from src.agents.bank_agent import DEFAULT_ACCOUNT
+
+    parser = argparse.ArgumentParser(description="Serve the banking assistant over HTTP")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8080")))
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=int(os.getenv("SERVER_MAX_CONCURRENT", "64")),
+        help="Requests running the graph at once",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=int(os.getenv("SERVER_MAX_SESSIONS", "10000")),
+        help="Sessions kept in memory (least recently used evicted first)",
+    )
+    parser.add_argument(
+        "--session-idle",
+        type=float,
+        default=float(os.getenv("SERVER_SESSION_IDLE_S", "1800")),
+        help="Seconds after which an idle session is evicted",
+    )
+    parser.add_argument(
+        "--queue-timeout",
+        type=float,
+        default=float(os.getenv("SERVER_QUEUE_TIMEOUT_S", "30")),
+        help="Seconds a request waits for a free slot before getting 503",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use the fake LLM backend instead of the configured one",
+    )
+    parser.add_argument(
+        "--fake-latency",
+        default="lognormal:600:0.4",
+        help="LLM latency distribution with --offline (see LLM_FAKE_LATENCY_MS)",
+    )
+    args = parser.parse_args()
+
+    if args.offline:
+        # Read when the agents build their chat models
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["LLM_FAKE_LATENCY_MS"] = args.fake_latency
+
+    server = BankAssistantServer(
+        max_concurrent=args.max_concurrent,
+        max_sessions=args.max_sessions,
+        idle_seconds=args.session_idle,
+        queue_timeout=args.queue_timeout,
+        default_account=DEFAULT_ACCOUNT,
+    )
+    print(f"Serving the banking assistant on http://{args.host}:{args.port}")
+    web.run_app(create_app(server), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,29 @@
 """
 Test runner for the bank application using golden data.
+
+Tests can run concurrently on a thread pool (--workers): each one is an
+independent graph invocation that mostly waits on the LLM, so the suite takes
+about as long as its slowest test. Every result records the test's wall-clock
+time and the time spent in each graph node.
+
+A test case may set a "budget" of LLM calls, prompt tokens and wall-clock
+milliseconds; a test that goes over it fails. Wall-clock budgets are only
+enforced against the deterministic LLM stand-ins (LLM_BACKEND=fake or
+replay, or --offline), whose latency does not depend on the API. They are
+raised to GOLDEN_WALL_FLOOR_MS (default 250) so a slower machine does not
+fail them, and multiplied by --workers, since concurrent tests share the CPU.
 """
 
+import argparse
+import os
 import sys
 import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 from langchain_core.messages import HumanMessage
 
 # Add project root to path
@@ -14,13 +32,64 @@ sys.path.insert(0, str(project_root))
 
 from src.agents.agent_state import AgentState
 from src.main import create_multi_agent_system
+from src.utils.metrics import request_trace
+from src.utils.token_usage import summarize
+from src.utils.warmup import start_warmup, wait_until_ready
+
+# Budget key in golden data -> measured value it limits
+BUDGETS = {
+    "max_llm_calls": "llm_calls",
+    "max_prompt_tokens": "prompt_tokens",
+    "max_wall_ms": "wall_ms",
+}
+
+
+def is_deterministic_llm() -> bool:
+    """Whether LLM latency comes from a local stand-in rather than the API."""
+    return os.getenv("LLM_BACKEND", "openai").lower() in ("fake", "replay")
+
+
+def wall_budget_ms(limit: float, workers: int = 1) -> float:
+    """
+    Wall-clock limit enforced for a max_wall_ms budget.
+
+    Golden budgets are measured one test at a time on one machine; the floor
+    leaves room for slower hosts and the workers factor for tests competing
+    for the CPU (embedding, FAISS and SQLite all run in this process).
+
+    Args:
+        limit: max_wall_ms from golden data
+        workers: Number of tests running concurrently
+
+    Returns:
+        The limit in milliseconds
+    """
+    floor = float(os.getenv("GOLDEN_WALL_FLOOR_MS", "250"))
+    return max(limit, floor) * max(1, workers)
+
+
+def node_timings(trace) -> Dict[str, float]:
+    """Milliseconds spent in each graph node of a request ("node.faq" -> "faq")."""
+    timings = {}
+    for span in trace.spans:
+        if span.name.startswith("node."):
+            node = span.name[len("node.") :]
+            timings[node] = timings.get(node, 0.0) + span.duration_ms
+    return timings
 
 
 class TestRunner:
     """Test runner that validates against golden data."""
 
-    def __init__(self, golden_data_path: str = None):
-        """Initialize test runner with golden data."""
+    def __init__(self, golden_data_path: str = None, keep_results: bool = True):
+        """
+        Initialize test runner with golden data.
+
+        Args:
+            golden_data_path: Golden data file (defaults to golden_data.json here)
+            keep_results: Keep each test's final graph state in its result;
+                          without it only the validation outcome and timings are kept
+        """
         if golden_data_path is None:
             golden_data_path = Path(__file__).parent / "golden_data.json"
 
@@ -28,77 +97,174 @@ class TestRunner:
             self.golden_data = json.load(f)
 
         self.workflow = create_multi_agent_system()
+        self.keep_results = keep_results
         self.results = []
+        self.wall_ms = 0.0
+        self.workers = 1
+        self._lock = threading.Lock()
 
     def run_test(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run a single test case and return results.
 
+        Safe to call from several threads at once; the report of each test is
+        printed in one piece when it completes.
+
         Args:
             test_case: Test case from golden data
 
         Returns:
-            Dictionary with test results
+            Dictionary with test results, wall-clock time and per-node timings
         """
         query = test_case["query"]
         test_id = test_case["id"]
         test_name = test_case["name"]
 
-        print(f"\n{'='*80}")
-        print(f"Test {test_id}: {test_name}")
-        print(f"Query: {query}")
-        print(f"{'='*80}")
-
-        try:
-            # Run the workflow
-            result = self.workflow.invoke(
-                AgentState(messages=[HumanMessage(content=query)])
-            )
+        result = error = None
+        with request_trace(query) as trace:
+            try:
+                # Run the workflow
+                result = self.workflow.invoke(
+                    AgentState(messages=[HumanMessage(content=query)])
+                )
+            except Exception as e:
+                error = e
 
+        if result is not None:
             # Validate results
             validation = self._validate_result(test_case, result)
-
-            # Store results
-            test_result = {
-                "test_id": test_id,
-                "test_name": test_name,
-                "query": query,
-                "passed": validation["passed"],
-                "errors": validation["errors"],
-                "warnings": validation["warnings"],
-                "result": result,
+        else:
+            validation = {
+                "passed": False,
+                "errors": [f"Exception occurred: {str(error)}"],
+                "warnings": [],
             }
 
+        totals = summarize(trace.usage)
+        usage = {
+            "llm_calls": totals["calls"],
+            "prompt_tokens": totals["prompt_tokens"],
+            "completion_tokens": totals["completion_tokens"],
+        }
+        budget_errors = self._check_budget(test_case, trace, usage)
+        if budget_errors:
+            validation["errors"].extend(budget_errors)
+            validation["passed"] = False
+
+        test_result = {
+            "test_id": test_id,
+            "test_name": test_name,
+            "query": query,
+            "passed": validation["passed"],
+            "errors": validation["errors"],
+            "warnings": validation["warnings"],
+            "wall_ms": trace.duration_ms,
+            "node_ms": node_timings(trace),
+            "usage": usage,
+            "result": result if self.keep_results else None,
+        }
+
+        with self._lock:
             self.results.append(test_result)
+            print(self._format_test_result(test_result), flush=True)
 
-            # Print results
-            if validation["passed"]:
-                print(f"✅ PASSED")
-            else:
-                print(f"❌ FAILED")
-                for error in validation["errors"]:
-                    print(f"  - {error}")
-
-            if validation["warnings"]:
-                print(f"⚠️  Warnings:")
-                for warning in validation["warnings"]:
-                    print(f"  - {warning}")
-
-            return test_result
-
-        except Exception as e:
-            error_result = {
-                "test_id": test_id,
-                "test_name": test_name,
-                "query": query,
-                "passed": False,
-                "errors": [f"Exception occurred: {str(e)}"],
-                "warnings": [],
-                "result": None,
-            }
-            self.results.append(error_result)
-            print(f"❌ FAILED with exception: {str(e)}")
-            return error_result
+        return test_result
+
+    def _check_budget(self, test_case: Dict[str, Any], trace, usage: Dict[str, int]) -> List[str]:
+        """
+        Compare a test's cost with its budget in golden data.
+
+        Args:
+            test_case: Test case from golden data
+            trace: RequestTrace of the test's run
+            usage: LLM calls and token totals of the run
+
+        Returns:
+            One error per exceeded budget, showing the limit, the measured value
+            and where the calls, tokens or time went
+        """
+        budget = test_case.get("budget", {})
+        measured = dict(usage, wall_ms=trace.duration_ms)
+        exceeded = []
+        for key, name in BUDGETS.items():
+            if key not in budget:
+                continue
+            if name == "wall_ms" and not is_deterministic_llm():
+                continue
+            limit, actual = budget[key], measured[name]
+            source = ""
+            if name == "wall_ms":
+                limit = wall_budget_ms(budget[key], self.workers)
+                if limit != budget[key]:
+                    floor = os.getenv("GOLDEN_WALL_FLOOR_MS", "250")
+                    source = f"; max({budget[key]}, floor {floor}) x {self.workers} workers"
+            if actual > limit:
+                over = actual - limit
+                percent = f", +{over / limit:.0%}" if limit else ""
+                exceeded.append(
+                    (
+                        name,
+                        f"Budget exceeded: {name} {actual:.0f} > {key} {limit:.0f} "
+                        f"(+{over:.0f}{percent}{source})",
+                    )
+                )
+
+        # The breakdown follows the last error of its kind, so it is shown once
+        calls = [
+            f"      {r['agent'] + '/' + r['prompt']:<40} "
+            f"{r['prompt_tokens']:>6} prompt + {r['completion_tokens']} completion tokens"
+            for r in trace.usage
+        ]
+        nodes = [
+            f"      node.{node:<20} {ms:>8.0f} ms" for node, ms in node_timings(trace).items()
+        ]
+        last_usage = max(
+            (i for i, (name, _) in enumerate(exceeded) if name != "wall_ms"), default=None
+        )
+        errors = []
+        for i, (name, message) in enumerate(exceeded):
+            if name == "wall_ms":
+                message = "\n".join([message] + nodes)
+            elif i == last_usage:
+                message = "\n".join([message] + calls)
+            errors.append(message)
+        return errors
+
+    def _format_test_result(self, test_result: Dict[str, Any]) -> str:
+        """Report of one test as printed after it runs."""
+        lines = [
+            f"\n{'='*80}",
+            f"Test {test_result['test_id']}: {test_result['test_name']}",
+            f"Query: {test_result['query']}",
+            f"{'='*80}",
+        ]
+
+        if test_result["passed"]:
+            lines.append(f"✅ PASSED ({test_result['wall_ms']:.0f} ms)")
+        else:
+            lines.append(f"❌ FAILED ({test_result['wall_ms']:.0f} ms)")
+            for error in test_result["errors"]:
+                lines.append(f"  - {error}")
+
+        if test_result["warnings"]:
+            lines.append(f"⚠️  Warnings:")
+            for warning in test_result["warnings"]:
+                lines.append(f"  - {warning}")
+
+        if test_result["node_ms"]:
+            nodes = ", ".join(
+                f"{node} {ms:.0f} ms" for node, ms in test_result["node_ms"].items()
+            )
+            lines.append(f"Nodes: {nodes}")
+
+        usage = test_result["usage"]
+        if usage["llm_calls"]:
+            lines.append(
+                f"LLM: {usage['llm_calls']} calls, {usage['prompt_tokens']} prompt + "
+                f"{usage['completion_tokens']} completion tokens"
+            )
+
+        return "\n".join(lines)
 
     def _validate_result(
         self, test_case: Dict[str, Any], result: Dict[str, Any]
@@ -195,16 +361,56 @@ class TestRunner:
         passed = len(errors) == 0
         return {"passed": passed, "errors": errors, "warnings": warnings}
 
-    def run_all_tests(self) -> Dict[str, Any]:
-        """Run all test cases from golden data."""
+    def run_tests(self, test_cases: List[Dict[str, Any]], workers: int = 1) -> List[Dict[str, Any]]:
+        """
+        Run test cases, several at a time when workers > 1.
+
+        Args:
+            test_cases: Test cases from golden data
+            workers: Number of tests running concurrently
+
+        Returns:
+            Test results in the order of test_cases
+        """
+        self._warm_up()
+        self.workers = workers
+        start = time.perf_counter()
+        previous = len(self.results)
+        if workers > 1 and len(test_cases) > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="golden") as pool:
+                results = list(pool.map(self.run_test, test_cases))
+        else:
+            results = [self.run_test(test_case) for test_case in test_cases]
+        self.wall_ms = (time.perf_counter() - start) * 1000
+
+        # Report in golden data order rather than completion order
+        self.results[previous:] = results
+        return results
+
+    def _warm_up(self):
+        """Load models and indexes up front so the first test's timings are not inflated."""
+        for name in start_warmup():
+            wait_until_ready(name)
+
+    def run_all_tests(self, workers: int = 1) -> Dict[str, Any]:
+        """
+        Run all test cases from golden data.
+
+        Args:
+            workers: Number of tests running concurrently (1 runs them in order)
+        """
         print(f"\n{'='*80}")
-        print("RUNNING ALL TESTS")
+        print(f"RUNNING ALL TESTS ({workers} worker{'s' if workers != 1 else ''})")
         print(f"{'='*80}")
 
         test_cases = self.golden_data.get("test_cases", [])
-
-        for test_case in test_cases:
-            self.run_test(test_case)
+        if not is_deterministic_llm() and any(
+            "max_wall_ms" in tc.get("budget", {}) for tc in test_cases
+        ):
+            print("Wall-clock budgets are skipped (use --offline or LLM_BACKEND=fake to enforce them)")
+        elif workers > 1:
+            print(f"Wall-clock budgets are multiplied by {workers} (tests share the CPU)")
+        self.run_tests(test_cases, workers=workers)
 
         # Print summary
         self._print_summary()
@@ -213,6 +419,7 @@ class TestRunner:
             "total": len(test_cases),
             "passed": sum(1 for r in self.results if r["passed"]),
             "failed": sum(1 for r in self.results if not r["passed"]),
+            "wall_ms": self.wall_ms,
             "results": self.results,
         }
 
@@ -229,6 +436,13 @@ class TestRunner:
         print(f"✅ Passed: {passed}")
         print(f"❌ Failed: {failed}")
         print(f"Success Rate: {(passed/total*100):.1f}%")
+        if total:
+            slowest = max(self.results, key=lambda r: r["wall_ms"])
+            print(
+                f"Wall time: {self.wall_ms/1000:.1f}s "
+                f"(sum of tests {sum(r['wall_ms'] for r in self.results)/1000:.1f}s, "
+                f"slowest {slowest['test_id']} {slowest['wall_ms']/1000:.1f}s)"
+            )
         print(f"{'='*80}\n")
 
         if failed > 0:
@@ -240,10 +454,92 @@ class TestRunner:
                         print(f"    Error: {error}")
 
 
+    def write_json_report(self, path: str):
+        """Write the results (without graph state) and timings to a JSON file."""
+        report = {
+            "total": len(self.results),
+            "passed": sum(1 for r in self.results if r["passed"]),
+            "wall_ms": self.wall_ms,
+            "tests": [
+                {key: value for key, value in r.items() if key != "result"}
+                for r in self.results
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    def write_junit_report(self, path: str):
+        """Write the results as JUnit XML, for CI test report viewers."""
+        suite = ET.Element(
+            "testsuite",
+            name="golden_data",
+            tests=str(len(self.results)),
+            failures=str(sum(1 for r in self.results if not r["passed"])),
+            time=f"{self.wall_ms / 1000:.3f}",
+        )
+        for r in self.results:
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname="golden_data",
+                name=f"{r['test_id']}: {r['test_name']}",
+                time=f"{r['wall_ms'] / 1000:.3f}",
+            )
+            if not r["passed"]:
+                failure = ET.SubElement(
+                    case, "failure", message=r["errors"][0] if r["errors"] else "failed"
+                )
+                failure.text = "\n".join(r["errors"])
+            output = [f"Query: {r['query']}"]
+            output += [f"node.{node}: {ms:.1f} ms" for node, ms in r["node_ms"].items()]
+            output += [f"{name}: {value}" for name, value in r["usage"].items()]
+            output += [f"Warning: {warning}" for warning in r["warnings"]]
+            ET.SubElement(case, "system-out").text = "\n".join(output)
+        ET.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command line options shared by this module and run_tests.py."""
+    parser = argparse.ArgumentParser(description="Run the golden data test suite")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of tests run concurrently"
+    )
+    parser.add_argument("--json-report", default=None, help="Write a JSON report here")
+    parser.add_argument("--junit-report", default=None, help="Write a JUnit XML report here")
+    parser.add_argument(
+        "--drop-results",
+        action="store_true",
+        help="Do not keep each test's final graph state (saves memory)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Answer with the fake LLM backend (no API calls; enforces wall-clock budgets)",
+    )
+    return parser
+
+
+def run_from_args(args) -> Dict[str, Any]:
+    """Run the suite with parsed command line options and write the reports."""
+    if args.offline:
+        # Zero simulated latency, so wall-clock budgets measure only this code
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ["LLM_FAKE_LATENCY_MS"] = "0"
+        os.environ["LLM_FAKE_TOKEN_MS"] = "0"
+    runner = TestRunner(keep_results=not args.drop_results)
+    summary = runner.run_all_tests(workers=args.workers)
+    if args.json_report:
+        runner.write_json_report(args.json_report)
+        print(f"JSON report written to {args.json_report}")
+    if args.junit_report:
+        runner.write_junit_report(args.junit_report)
+        print(f"JUnit report written to {args.junit_report}")
+    return summary
+
+
 def main():
     """Main function to run tests."""
-    runner = TestRunner()
-    summary = runner.run_all_tests()
+    summary = run_from_args(build_arg_parser().parse_args())
 
     # Exit with error code if any tests failed
     if summary["failed"] > 0:
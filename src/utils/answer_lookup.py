@@ -0,0 +1,208 @@
+"""
+Direct answer lookup for canonical FAQ questions.
+
+A query that closely matches a stored question is answered with the stored
+answer, skipping retrieval and the LLM call.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.utils.lexical_index import tokenize
+from src.utils.vector_lib import get_index_dir, get_source_document
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ANSWER_INDEX_FILE = "answer_index.json"
+
+# Conversational words that may appear in a query without changing which
+# question it asks ("Could you please tell me ...", "What's ...")
+QUERY_FILLER = {
+    "could", "hello", "hey", "hi", "just", "know", "please", "s", "tell",
+    "thank", "thanks", "want", "would",
+}
+
+
+class AnswerLookup:
+    """TF-IDF cosine matcher over canonical questions."""
+
+    def __init__(self, entries: List[Dict[str, str]]):
+        """
+        Initialize the lookup.
+
+        Args:
+            entries: List of {"question", "answer", "section"} dictionaries
+        """
+        self.entries = entries
+
+        question_terms = [Counter(tokenize(entry["question"])) for entry in entries]
+        document_frequency = Counter(
+            term for terms in question_terms for term in terms
+        )
+        total = len(entries)
+        self.idf = {
+            term: math.log((1 + total) / (1 + count)) + 1
+            for term, count in document_frequency.items()
+        }
+        self.vectors = [self._vectorize(terms) for terms in question_terms]
+
+    def _vectorize(self, terms: Counter) -> Dict[str, float]:
+        """Unit-length TF-IDF vector of a question."""
+        vector = {term: count * self.idf[term] for term, count in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def match(self, query: str) -> Optional[Tuple[Dict[str, str], float]]:
+        """
+        Find the stored question closest to the query.
+
+        Query terms that never occur in any question are weighted like the
+        rarest known term, so off-topic additions lower the score; QUERY_FILLER
+        words are ignored.
+
+        Returns:
+            (entry, cosine score) for the best match, or None if nothing overlaps
+        """
+        terms = Counter(term for term in tokenize(query) if term not in QUERY_FILLER)
+        if not terms or not self.idf:
+            return None
+
+        max_idf = max(self.idf.values())
+        weights = {
+            term: count * self.idf.get(term, max_idf) for term, count in terms.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+
+        best_index, best_score = None, 0.0
+        for index, vector in enumerate(self.vectors):
+            score = sum(
+                weight * vector.get(term, 0.0) for term, weight in weights.items()
+            ) / norm
+            if score > best_score:
+                best_index, best_score = index, score
+
+        if best_index is None:
+            return None
+        return self.entries[best_index], best_score
+
+    @staticmethod
+    def missing_terms(query: str, question: str) -> List[str]:
+        """
+        Query terms the question does not contain.
+
+        A close match can still ask something the stored answer does not
+        cover: "What are the daily withdrawal limits for Zelle?" scores high
+        against "What are the daily withdrawal limits?", but the answer says
+        nothing about Zelle.
+
+        Returns:
+            Sorted terms of the query, other than QUERY_FILLER, missing from
+            the question
+        """
+        question_terms = set(tokenize(question))
+        return sorted(set(tokenize(query)) - question_terms - QUERY_FILLER)
+
+    def save(self, index_dir: str):
+        """Write the canonical entries to index_dir as JSON."""
+        path = os.path.join(index_dir, ANSWER_INDEX_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "AnswerLookup":
+        """Read entries previously written with save()."""
+        path = os.path.join(index_dir, ANSWER_INDEX_FILE)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def get_answer_lookup(name: str) -> Optional[AnswerLookup]:
+    """
+    Returns the answer lookup built for the named index, or None if it has none.
+
+    Indexes built before direct answers existed have no answer file on disk;
+    in that case the lookup is built in memory from the source document.
+    """
+    index_dir = get_index_dir(name)
+    if os.path.exists(os.path.join(index_dir, ANSWER_INDEX_FILE)):
+        return AnswerLookup.load(index_dir)
+
+    source = get_source_document(name)
+    if not os.path.exists(source):
+        return None
+
+    from src.build.chunkers import extract_qa_pairs
+
+    with open(source, "r", encoding="utf-8") as f:
+        qa_pairs = extract_qa_pairs(f.read())
+    return AnswerLookup(qa_pairs) if qa_pairs else None
+
+
+_stats_lock = threading.Lock()
+lookup_stats = {"requests": 0, "matches": 0}
+
+
+def find_direct_answer(name: str, query: str) -> Optional[str]:
+    """
+    Return the stored answer when the query matches a canonical question.
+
+    Enabled with DIRECT_ANSWER_ENABLED (default true); a match needs a score of
+    at least DIRECT_ANSWER_THRESHOLD (default 0.85), and every term of the query
+    must occur in the matched question, so a qualifier the stored answer does
+    not cover falls back to retrieval. Each call logs whether it matched, its
+    latency and the running match rate.
+
+    Args:
+        name: Vector store name (e.g., "faq")
+        query: User query
+
+    Returns:
+        The stored answer, or None to fall back to retrieval and generation
+    """
+    if os.getenv("DIRECT_ANSWER_ENABLED", "true").lower() != "true":
+        return None
+
+    start = time.perf_counter()
+    lookup = get_answer_lookup(name)
+    if lookup is None:
+        return None
+
+    result = lookup.match(query)
+    threshold = float(os.getenv("DIRECT_ANSWER_THRESHOLD", "0.85"))
+    missing = []
+    if result is not None and result[1] >= threshold:
+        missing = AnswerLookup.missing_terms(query, result[0]["question"])
+    matched = result is not None and result[1] >= threshold and not missing
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    outcome = "hit" if matched else "miss"
+    if missing:
+        outcome = f"miss, not in question: {', '.join(missing)}"
+
+    with _stats_lock:
+        lookup_stats["requests"] += 1
+        lookup_stats["matches"] += int(matched)
+        match_rate = lookup_stats["matches"] / lookup_stats["requests"]
+
+    logger.info(
+        "%s direct answer: %s (score %.2f) in %.2f ms, match rate %.0f%% of %d",
+        name,
+        outcome,
+        result[1] if result else 0.0,
+        elapsed_ms,
+        match_rate * 100,
+        lookup_stats["requests"],
+    )
+
+    return result[0]["answer"] if matched else None
@@ -0,0 +1,74 @@
+"""
+Preallocated ring buffer of float32 samples for microphone capture.
+
+Microphone chunks are converted from 16-bit PCM straight into the buffer, so
+a recording never grows a list of byte strings and reaches Whisper as the
+float32 array it expects, without a WAV file or decode step.
+"""
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 buffer; once full, the oldest samples are overwritten."""
+
+    def __init__(self, capacity: int):
+        """
+        Allocate the buffer.
+
+        Args:
+            capacity: Number of samples kept (e.g. seconds * sample rate)
+        """
+        import numpy as np
+
+        self.capacity = capacity
+        self._data = np.zeros(capacity, np.float32)
+        # Total samples written since clear(); the write position is this modulo capacity
+        self._written = 0
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    def clear(self):
+        """Forget the contents (the memory is kept for the next recording)."""
+        self._written = 0
+
+    def write_pcm16(self, data: bytes):
+        """
+        Append 16-bit little-endian PCM, scaled to [-1, 1].
+
+        Returns:
+            View of the samples just written, or a copy if they wrapped around
+        """
+        import numpy as np
+
+        pcm = np.frombuffer(data, dtype="<i2")
+        count = len(pcm)
+        if count >= self.capacity:
+            pcm = pcm[-self.capacity :]
+            self._written += count - self.capacity
+            count = self.capacity
+
+        start = self._written % self.capacity
+        first = min(count, self.capacity - start)
+        np.multiply(pcm[:first], 1 / 32768, out=self._data[start : start + first], casting="unsafe")
+        if first < count:
+            np.multiply(pcm[first:], 1 / 32768, out=self._data[: count - first], casting="unsafe")
+        self._written += count
+
+        if first == count:
+            return self._data[start : start + count]
+        return np.concatenate([self._data[start:], self._data[: count - first]])
+
+    def samples(self):
+        """
+        Contents in recording order.
+
+        Returns:
+            A view into the buffer when it has not wrapped (copy it before the
+            next write if it must be kept), otherwise a new array
+        """
+        import numpy as np
+
+        if self._written <= self.capacity:
+            return self._data[: self._written]
+        start = self._written % self.capacity
+        return np.concatenate([self._data[start:], self._data[:start]])
@@ -0,0 +1,195 @@
+"""
+Disk cache of synthesized speech, keyed by a hash of what was rendered.
+
+Repeated phrases (the welcome message, followup questions, common errors) are
+played from the cache without a network round trip or an ffmpeg subprocess.
+The least recently used files are evicted once the cache exceeds its size limit.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("storage", "tts_cache")
+
+
+def cache_key(clean_text: str, lang: str, speed: float, engine: str = "gtts") -> str:
+    """
+    Content address of an utterance.
+
+    Args:
+        clean_text: Text after TTS cleaning (what is actually spoken)
+        lang: Language code
+        speed: Playback tempo
+        engine: Synthesis engine name
+    """
+    payload = f"{engine}\n{lang}\n{speed:.3f}\n{clean_text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Size-bounded LRU cache of audio files in a directory."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Initialize the cache (existing files in cache_dir are reused).
+
+        Args:
+            cache_dir: Directory holding the audio files
+            max_bytes: Total size above which the least recently used files go
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last use time, file name)
+        self._entries: Dict[str, tuple] = {}
+        self._total_bytes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            key, _ = os.path.splitext(name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                self._entries[key] = (stat.st_size, stat.st_mtime, name)
+                self._total_bytes += stat.st_size
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up an utterance, marking it as recently used.
+
+        Returns:
+            Path of the cached audio file, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            path = os.path.join(self.cache_dir, entry[2]) if entry else None
+            if path is None or not os.path.exists(path):
+                self.misses += 1
+                if entry:
+                    self._forget(key)
+                return None
+
+            self.hits += 1
+            now = time.time()
+            self._entries[key] = (entry[0], now, entry[2])
+        # The modification time carries the LRU order across restarts
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, source_path: str) -> str:
+        """
+        Move a freshly synthesized file into the cache.
+
+        Args:
+            key: Key from cache_key()
+            source_path: Audio file to take over (it is moved, not copied)
+
+        Returns:
+            Path of the cached file
+        """
+        extension = os.path.splitext(source_path)[1]
+        name = f"{key}{extension}"
+        path = os.path.join(self.cache_dir, name)
+        shutil.move(source_path, path)
+        self._add(key, name, os.path.getsize(path))
+        return path
+
+    def put_bytes(self, key: str, data: bytes, extension: str) -> str:
+        """
+        Store encoded audio held in memory.
+
+        Args:
+            key: Key from cache_key()
+            data: Encoded audio
+            extension: File extension of the encoding (e.g. ".wav")
+
+        Returns:
+            Path of the cached file
+        """
+        name = f"{key}{extension}"
+        path = os.path.join(self.cache_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        self._add(key, name, len(data))
+        return path
+
+    def _add(self, key: str, name: str, size: int):
+        with self._lock:
+            if key in self._entries:
+                self._forget(key)
+            self._entries[key] = (size, time.time(), name)
+            self._total_bytes += size
+            self._evict()
+
+    def contains_path(self, path: str) -> bool:
+        """Check whether a file lives in the cache (and must not be deleted by callers)."""
+        return os.path.dirname(os.path.abspath(path)) == self.cache_dir
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate, entries and size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def _forget(self, key: str):
+        size, _, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits (lock held)."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (_, _, name) in sorted(self._entries.items(), key=lambda e: e[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._forget(key)
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            logger.info("Evicted %s from the TTS cache", name)
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> Optional[AudioCache]:
+    """
+    Returns the shared audio cache, or None when TTS_CACHE_ENABLED is false.
+
+    Stored in TTS_CACHE_DIR (default storage/tts_cache) and limited to
+    TTS_CACHE_MAX_MB megabytes (default 50).
+    """
+    global _cache
+    if os.getenv("TTS_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache(
+                os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR),
+                int(float(os.getenv("TTS_CACHE_MAX_MB", "50")) * 1024 * 1024),
+            )
+        return _cache
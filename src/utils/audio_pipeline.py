@@ -0,0 +1,244 @@
+"""
+In-memory audio: decode synthesized speech to NumPy PCM, change its tempo
+in-process and play it through one persistent output stream.
+
+Replaces the temp-file, ffmpeg and player-subprocess path of TextToSpeech
+when NumPy and sounddevice are installed (TTS_AUDIO_PIPELINE).
+"""
+
+import importlib.util
+import io
+import os
+import threading
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+SOUNDDEVICE_AVAILABLE = importlib.util.find_spec("sounddevice") is not None
+
+# Frames written to the output stream at a time; stop requests are checked between blocks
+BLOCK_FRAMES = 1024
+
+
+@dataclass
+class AudioClip:
+    """Mono float32 PCM samples in [-1, 1]."""
+
+    samples: "object"  # numpy.ndarray
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return len(self.samples) / self.sample_rate
+
+
+def is_memory_pipeline_enabled() -> bool:
+    """
+    Check whether speech should use the in-memory pipeline.
+
+    TTS_AUDIO_PIPELINE is "memory", "file" or "auto" (default: memory when
+    NumPy and sounddevice are installed).
+    """
+    mode = os.getenv("TTS_AUDIO_PIPELINE", "auto").lower()
+    if mode == "file":
+        return False
+    return NUMPY_AVAILABLE and SOUNDDEVICE_AVAILABLE
+
+
+def decode_wav(data: bytes) -> AudioClip:
+    """Decode 8/16/32-bit PCM WAV bytes to a mono clip."""
+    import numpy as np
+
+    with wave.open(io.BytesIO(data), "rb") as audio:
+        channels = audio.getnchannels()
+        width = audio.getsampwidth()
+        rate = audio.getframerate()
+        frames = audio.readframes(audio.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return AudioClip(samples.astype(np.float32), rate)
+
+
+def decode_compressed(data: bytes) -> AudioClip:
+    """
+    Decode MP3 (or OGG) bytes to a mono clip with pygame's decoder.
+
+    Raises:
+        RuntimeError: If pygame is not installed or its mixer cannot start
+    """
+    import numpy as np
+
+    from src.utils.tts_utils import _init_pygame_mixer
+
+    if not _init_pygame_mixer():
+        raise RuntimeError("pygame mixer is required to decode compressed audio")
+    import pygame
+
+    sound = pygame.mixer.Sound(file=io.BytesIO(data))
+    frequency, size, _ = pygame.mixer.get_init()
+    array = pygame.sndarray.array(sound)
+    scale = float(2 ** (abs(size) - 1))
+    samples = array.astype(np.float32) / scale
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return AudioClip(samples.astype(np.float32), frequency)
+
+
+def decode_audio(data: bytes, extension: str) -> AudioClip:
+    """Decode audio bytes of the given file extension (".wav", ".mp3", ...)."""
+    if extension.lower() == ".wav":
+        return decode_wav(data)
+    return decode_compressed(data)
+
+
+def encode_wav(clip: AudioClip) -> bytes:
+    """Encode a clip as 16-bit mono WAV bytes (used for the audio cache)."""
+    import numpy as np
+
+    pcm = (np.clip(clip.samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(clip.sample_rate)
+        audio.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def time_stretch(
+    clip: AudioClip,
+    speed: float,
+    frame_ms: float = 40.0,
+    search_ms: float = 10.0,
+) -> AudioClip:
+    """
+    Change tempo without changing pitch (WSOLA).
+
+    Frames are read from the input every speed * hop samples and overlap-added
+    every hop samples. Each frame is shifted within +/- search_ms to the
+    position that best continues the previous one, which avoids the phasing
+    artifacts of plain overlap-add.
+
+    Args:
+        clip: Input audio
+        speed: Tempo factor (1.4 plays 40% faster)
+        frame_ms: Analysis frame length
+        search_ms: Maximum shift of a frame when aligning it
+
+    Returns:
+        The time-stretched clip
+    """
+    import numpy as np
+
+    samples = clip.samples
+    frame = int(clip.sample_rate * frame_ms / 1000)
+    if speed == 1.0 or len(samples) < 2 * frame:
+        return clip
+
+    hop_out = frame // 2
+    hop_in = max(1, int(round(hop_out * speed)))
+    tolerance = int(clip.sample_rate * search_ms / 1000)
+
+    padded = np.concatenate(
+        [np.zeros(tolerance, np.float32), samples, np.zeros(frame + 2 * tolerance, np.float32)]
+    )
+    window = np.hanning(frame).astype(np.float32)
+    frames = (len(samples) - frame) // hop_in + 1
+
+    output = np.zeros(frames * hop_out + frame, np.float32)
+    weights = np.zeros_like(output)
+    previous = tolerance
+
+    for index in range(frames):
+        nominal = index * hop_in + tolerance
+        if index == 0:
+            position = nominal
+        else:
+            # Natural continuation of the previous frame in the input
+            target = padded[previous + hop_out : previous + hop_out + frame]
+            region = padded[nominal - tolerance : nominal + tolerance + frame]
+            correlation = np.correlate(region, target, mode="valid")
+            position = nominal - tolerance + int(np.argmax(correlation))
+
+        start = index * hop_out
+        output[start : start + frame] += padded[position : position + frame] * window
+        weights[start : start + frame] += window
+        previous = position
+
+    output /= np.maximum(weights, 1e-3)
+    return AudioClip(output, clip.sample_rate)
+
+
+def resample(clip: AudioClip, sample_rate: int) -> AudioClip:
+    """Linear-interpolation resampling (enough for speech playback)."""
+    import numpy as np
+
+    if clip.sample_rate == sample_rate or not len(clip.samples):
+        return clip
+    count = int(len(clip.samples) * sample_rate / clip.sample_rate)
+    positions = np.linspace(0, len(clip.samples) - 1, count)
+    samples = np.interp(positions, np.arange(len(clip.samples)), clip.samples)
+    return AudioClip(samples.astype(np.float32), sample_rate)
+
+
+class AudioOutput:
+    """One output stream kept open for the whole session."""
+
+    def __init__(self):
+        import sounddevice as sd
+
+        device = sd.query_devices(kind="output")
+        self.sample_rate = int(device["default_samplerate"])
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate, channels=1, dtype="float32"
+        )
+        self._stream.start()
+        self._lock = threading.Lock()
+
+    def play(self, clip: AudioClip, stop_event: threading.Event = None):
+        """
+        Write a clip to the stream, blocking until it has been queued for output.
+
+        Returns early once stop_event is set.
+        """
+        clip = resample(clip, self.sample_rate)
+        with self._lock:
+            for start in range(0, len(clip.samples), BLOCK_FRAMES):
+                if stop_event is not None and stop_event.is_set():
+                    break
+                block = clip.samples[start : start + BLOCK_FRAMES]
+                self._stream.write(block.reshape(-1, 1))
+
+    def close(self):
+        """Stop and close the stream."""
+        self._stream.stop()
+        self._stream.close()
+
+
+_output: Optional[AudioOutput] = None
+_output_lock = threading.Lock()
+
+
+def get_audio_output() -> AudioOutput:
+    """Returns the shared output stream, opening it on first use."""
+    global _output
+    with _output_lock:
+        if _output is None:
+            _output = AudioOutput()
+        return _output
@@ -0,0 +1,75 @@
+"""
+Run slow initialization on a background thread and collect the result later.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+class BackgroundTask:
+    """Runs a function on a daemon thread and hands its result over on demand."""
+
+    def __init__(self, name: str, func: Callable[..., Any], *args, **kwargs):
+        """
+        Initialize the task (it does not run until start() or result()).
+
+        Args:
+            name: Thread name, used in error messages
+            func: Function to run
+            *args, **kwargs: Arguments passed to func
+        """
+        self.name = name
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._result = None
+        self._error: Optional[BaseException] = None
+
+    def _run(self):
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except BaseException as e:  # re-raised in the thread that calls result()
+            self._error = e
+        finally:
+            self._done.set()
+
+    def start(self) -> "BackgroundTask":
+        """Start the task on a daemon thread (no-op if already started)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def done(self) -> bool:
+        """Check whether the task has finished (successfully or not)."""
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the task without raising its error.
+
+        Returns:
+            True if the task finished within the timeout
+        """
+        self.start()
+        return self._done.wait(timeout)
+
+    def result(self, timeout: float = None) -> Any:
+        """
+        Wait for the task and return its result, starting it if needed.
+
+        Raises:
+            TimeoutError: If the task does not finish within timeout seconds
+            Exception: Whatever the task itself raised
+        """
+        if not self.wait(timeout):
+            raise TimeoutError(f"{self.name} did not finish within {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._result
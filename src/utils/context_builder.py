@@ -0,0 +1,184 @@
+"""
+Builds compact, token-budgeted context blocks from retrieved chunks for RAG prompts.
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Overlaps shorter than this are treated as coincidence, not splitter overlap
+MIN_OVERLAP_CHARS = 40
+
+# Do not squeeze a truncated fragment into less room than this
+MIN_FRAGMENT_TOKENS = 32
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Returns the tiktoken encoding for LLM_MODEL, or None if unavailable."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(os.getenv("LLM_MODEL", "gpt-4o-mini"))
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken missing or its BPE files cannot be downloaded (offline)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count LLM tokens in text.
+
+    Uses tiktoken when available and falls back to ~4 characters per token.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _overlap_length(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    probe = right[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def remove_overlap(text: str, included: Sequence[str]) -> str:
+    """
+    Strip spans of `text` that are already present in the included chunks.
+
+    Handles the overlap left by the text splitter in either direction, and
+    drops the chunk entirely when it is contained in one already included.
+
+    Args:
+        text: Candidate chunk text
+        included: Texts already placed in the context
+
+    Returns:
+        The remaining text (empty when nothing new is left)
+    """
+    for other in included:
+        if text in other:
+            return ""
+
+        # `other` precedes `text` in the source document
+        overlap = _overlap_length(other, text)
+        if overlap:
+            text = text[overlap:]
+
+        # `text` precedes `other` in the source document
+        overlap = _overlap_length(text, other)
+        if overlap:
+            text = text[:-overlap]
+
+    return text.strip()
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, ending on a sentence boundary if possible."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        truncated = encoding.decode(encoding.encode(text)[:max_tokens])
+    else:
+        truncated = text[: max_tokens * 4]
+
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(truncated)]
+    if sentence_ends:
+        return truncated[: sentence_ends[-1]].strip()
+    return truncated.strip()
+
+
+def build_context(
+    scored_docs: List[Tuple[object, float]],
+    token_budget: int = None,
+    label: str = "rag",
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Pack retrieved chunks into a context string within a token budget.
+
+    Chunks are ordered by score (best first), reduced to their text (no
+    metadata), stripped of text duplicated by splitter overlap, and added
+    until the budget is used. The last chunk that does not fit whole is
+    truncated at a sentence boundary.
+
+    Args:
+        scored_docs: List of (document, score) pairs from a retriever
+        token_budget: Maximum context tokens (defaults to RAG_CONTEXT_TOKENS)
+        label: Name used when logging the token savings
+
+    Returns:
+        Tuple of (context string, stats with raw_tokens, context_tokens,
+        tokens_saved and chunks_used)
+    """
+    if token_budget is None:
+        token_budget = int(os.getenv("RAG_CONTEXT_TOKENS", "800"))
+
+    ordered = sorted(scored_docs, key=lambda item: item[1], reverse=True)
+
+    included: List[str] = []
+    used_tokens = 0
+
+    for doc, _ in ordered:
+        text = remove_overlap(doc.page_content.strip(), included)
+        if not text:
+            continue
+
+        remaining = token_budget - used_tokens
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            if remaining < MIN_FRAGMENT_TOKENS:
+                break
+            text = _truncate_to_tokens(text, remaining)
+            if not text:
+                break
+            tokens = count_tokens(text)
+
+        included.append(text)
+        used_tokens += tokens
+        if used_tokens >= token_budget:
+            break
+
+    context = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(included, 1))
+
+    # What the prompt used to contain: the repr of the Document list
+    raw_tokens = count_tokens(str([doc for doc, _ in scored_docs]))
+    context_tokens = count_tokens(context)
+    stats = {
+        "raw_tokens": raw_tokens,
+        "context_tokens": context_tokens,
+        "tokens_saved": max(0, raw_tokens - context_tokens),
+        "chunks_used": len(included),
+    }
+
+    logger.info(
+        "%s context: %d tokens (raw %d, saved %d) from %d/%d chunks",
+        label,
+        context_tokens,
+        raw_tokens,
+        stats["tokens_saved"],
+        len(included),
+        len(scored_docs),
+    )
+
+    return context, stats
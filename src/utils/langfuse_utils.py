@@ -8,28 +8,36 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Import LangFuse with fallback handling
-try:
-    from langfuse.langchain import CallbackHandler
-    import langfuse
-
-    LANGFUSE_AVAILABLE = True
-except ImportError as e:
-    print(f"DEBUG: Failed to import from langfuse.langchain: {e}")
-    # LangFuse not available or different version
+_langfuse_modules = None
+
+
+def _import_langfuse():
+    """
+    Import LangFuse on first use (it is not needed when LangFuse is not configured).
+
+    Returns:
+        Tuple of (langfuse module, CallbackHandler class), or (None, None) if
+        LangFuse is not installed
+    """
+    global _langfuse_modules
+    if _langfuse_modules is not None:
+        return _langfuse_modules
+
     try:
-        # Fallback to older import path
-        from langfuse.callback import CallbackHandler
+        from langfuse.langchain import CallbackHandler
         import langfuse
+    except ImportError:
+        # LangFuse not available or different version
+        try:
+            # Fallback to older import path
+            from langfuse.callback import CallbackHandler
+            import langfuse
+        except ImportError:
+            CallbackHandler = None
+            langfuse = None
 
-        LANGFUSE_AVAILABLE = True
-        print("DEBUG: LangFuse imported successfully from langfuse.callback")
-    except ImportError as e2:
-        print(f"DEBUG: Failed to import from langfuse.callback: {e2}")
-        LANGFUSE_AVAILABLE = False
-        CallbackHandler = None
-        langfuse = None
-        print("DEBUG: LangFuse not available - all imports failed")
+    _langfuse_modules = (langfuse, CallbackHandler)
+    return _langfuse_modules
 
 
 def get_langfuse_handler(
@@ -50,10 +58,6 @@ def get_langfuse_handler(
     Returns:
         LangFuse CallbackHandler instance, or None if not available/configured
     """
-    # Check if LangFuse is available
-    if not LANGFUSE_AVAILABLE or CallbackHandler is None:
-        return None
-
     # Check if LangFuse is configured
     public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
     secret_key = os.getenv("LANGFUSE_SECRET_KEY")
@@ -61,6 +65,11 @@ def get_langfuse_handler(
     if not public_key or not secret_key:
         return None
 
+    # Check if LangFuse is available
+    langfuse, CallbackHandler = _import_langfuse()
+    if CallbackHandler is None:
+        return None
+
     try:
         # Initialize LangFuse client first
         langfuse.Langfuse(
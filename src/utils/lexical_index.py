@@ -0,0 +1,161 @@
+"""
+Lexical (BM25) inverted index stored next to each FAISS index.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+
+# Short words that carry no retrieval signal. Domain acronyms such as "cd",
+# "ira" or "atm" are deliberately kept.
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "if", "in", "is", "it", "me", "my", "of",
+    "on", "or", "our", "so", "that", "the", "there", "this", "to", "was",
+    "we", "what", "when", "where", "which", "who", "will", "with", "you",
+    "your",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(token: str) -> str:
+    """Fold simple plurals so "CDs" matches "CD" and "fees" matches "fee"."""
+    if len(token) >= 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric terms without stopwords.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms in document order
+    """
+    return [
+        _normalize(token)
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class LexicalIndex:
+    """BM25 inverted index over a fixed set of documents."""
+
+    def __init__(
+        self,
+        postings: Dict[str, Dict[str, int]],
+        doc_lengths: Dict[str, int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Initialize the index from prebuilt postings.
+
+        Args:
+            postings: Mapping of term -> {doc_id: term frequency}
+            doc_lengths: Mapping of doc_id -> number of terms
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        total_docs = len(doc_lengths)
+        self.avg_doc_length = (
+            sum(doc_lengths.values()) / total_docs if total_docs else 0.0
+        )
+        self.idf = {
+            term: math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    @classmethod
+    def from_texts(
+        cls, texts: Sequence[str], doc_ids: Sequence[str]
+    ) -> "LexicalIndex":
+        """
+        Build an index from raw texts.
+
+        Args:
+            texts: Document texts
+            doc_ids: Identifier for each text (same order as texts)
+
+        Returns:
+            LexicalIndex instance
+        """
+        postings: Dict[str, Dict[str, int]] = {}
+        doc_lengths: Dict[str, int] = {}
+
+        for doc_id, text in zip(doc_ids, texts):
+            terms = tokenize(text)
+            doc_lengths[doc_id] = len(terms)
+            for term, count in Counter(terms).items():
+                postings.setdefault(term, {})[doc_id] = count
+
+        return cls(postings, doc_lengths)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query with BM25.
+
+        Args:
+            query: Query text
+            k: Maximum number of results
+
+        Returns:
+            List of (doc_id, score) pairs, best first
+        """
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for doc_id, freq in docs.items():
+                length_norm = 1 - self.b + self.b * (
+                    self.doc_lengths[doc_id] / (self.avg_doc_length or 1.0)
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    def save(self, index_dir: str):
+        """Write the index to index_dir as JSON."""
+        path = os.path.join(index_dir, LEXICAL_INDEX_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "doc_lengths": self.doc_lengths,
+                    "postings": self.postings,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, index_dir: str) -> "LexicalIndex":
+        """Read an index previously written with save()."""
+        path = os.path.join(index_dir, LEXICAL_INDEX_FILE)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        return cls(
+            data["postings"], data["doc_lengths"], k1=data["k1"], b=data["b"]
+        )
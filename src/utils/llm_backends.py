@@ -0,0 +1,505 @@
+"""
+Chat model backends, selected with LLM_BACKEND.
+
+- openai: ChatOpenAI (the default)
+- record: ChatOpenAI, saving every response to the cassette file
+- replay: answers from the cassette only; no network access
+- fake: scripted local stand-in with configurable latency
+
+Cassette entries are keyed by a hash of the model, generation settings and
+messages, so a replayed run gets exactly the responses of the recorded one.
+The fake backend recognizes the repo's prompts (orchestrator, multi-query,
+RAG agents, evaluator) and answers them with keyword heuristics, which makes
+graph, retrieval and database throughput measurable on an offline machine.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.utils.context_builder import count_tokens
+
+load_dotenv()
+
+BACKENDS = ("openai", "record", "replay", "fake")
+DEFAULT_CASSETTE = os.path.join("storage", "llm_cassette.jsonl")
+
+
+def get_llm_backend_name() -> str:
+    """
+    The configured backend (LLM_BACKEND, default "openai").
+
+    Raises:
+        ValueError: If LLM_BACKEND is not a known backend
+    """
+    name = os.getenv("LLM_BACKEND", "openai").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return name
+
+
+def _message_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+
+
+class LatencyModel:
+    """
+    Samples response latencies in milliseconds from a spec string.
+
+    Specs: "300" or "fixed:300", "uniform:200:800", "normal:400:100"
+    (mean, standard deviation) and "lognormal:400:0.5" (median, sigma).
+    """
+
+    def __init__(self, spec: str, seed: Optional[int] = None):
+        parts = spec.split(":")
+        if len(parts) == 1:
+            parts = ["fixed", parts[0]]
+        self.kind = parts[0].lower()
+        self.params = [float(p) for p in parts[1:]]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(self.kind) != len(self.params):
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """One latency in milliseconds (never negative)."""
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.params[0]
+            elif self.kind == "uniform":
+                value = self._random.uniform(*self.params)
+            elif self.kind == "normal":
+                value = self._random.gauss(*self.params)
+            else:
+                median, sigma = self.params
+                value = median * self._random.lognormvariate(0, sigma)
+        return max(0.0, value)
+
+
+# ---------------------------------------------------------------------------
+# Fake responses
+# ---------------------------------------------------------------------------
+
+_CATEGORY_AGENTS = {
+    "deposit": "bank",
+    "withdrawal": "bank",
+    "check_balance": "bank",
+    "account_details": "bank",
+    "transaction_history": "bank",
+    "investment": "investment",
+    "faq": "faq",
+    "policy": "policy",
+}
+
+# Checked in order; the first rule with a matching keyword wins
+_CATEGORY_RULES = [
+    ("investment", ("invest", "portfolio", "stock", "bond", "ira", "retirement", "mutual fund", "certificate of deposit")),
+    ("check_balance", ("balance", "how much money")),
+    ("account_details", ("account details", "account info")),
+    ("transaction_history", ("transaction",)),
+    ("policy", ("limit", "policy", "leave", "days off", "vacation", "work from home", "employee", "benefit", "regulation")),
+    ("faq", ("policies", "fee", "how do i", "how can i", "can i", "open", "enroll", "password", "hours")),
+    ("withdrawal", ("withdraw", "take out", "remove")),
+    ("deposit", ("deposit", "put money", "add money")),
+]
+
+_SPLIT_PATTERN = re.compile(r",\s*(?:and\s+)?|;|\?\s+|\s+and\s+(?:also\s+)?", re.IGNORECASE)
+
+
+def classify_text(query: str) -> Dict[str, Any]:
+    """Keyword classification in the orchestrator's JSON format."""
+    lowered = query.lower()
+    category = "faq"
+    for name, keywords in _CATEGORY_RULES:
+        if any(keyword in lowered for keyword in keywords):
+            category = name
+            break
+
+    numbers = re.findall(r"\d+\.?\d*", query)
+    amount = float(numbers[0]) if numbers else 0
+    followup = ""
+    if category in ("deposit", "withdrawal") and not amount:
+        followup = f"How much would you like to {'deposit' if category == 'deposit' else 'withdraw'}?"
+    return {"category": category, "amount": amount, "followup": followup}
+
+
+def split_query(query: str) -> Dict[str, Any]:
+    """Multi-query decomposition in the orchestrator's JSON format."""
+    parts = []
+    for part in _SPLIT_PATTERN.split(query):
+        part = part.strip(" ?.")
+        if not part:
+            continue
+        # Fragments like "stocks and bonds" belong to the previous part
+        if parts and len(part.split()) < 3:
+            parts[-1] = f"{parts[-1]} and {part}"
+        else:
+            parts.append(part)
+
+    if len(parts) < 2:
+        return {"is_multi_query": False, "sub_queries": [], "original_query": query}
+
+    sub_queries = []
+    for part in parts:
+        category = classify_text(part)["category"]
+        sub_queries.append(
+            {"query": part, "category": category, "agent": _CATEGORY_AGENTS[category]}
+        )
+    return {"is_multi_query": True, "sub_queries": sub_queries, "original_query": query}
+
+
+def _between(text: str, start_marker: str, end_marker: str = None) -> str:
+    start = text.lower().find(start_marker.lower())
+    if start < 0:
+        return ""
+    start += len(start_marker)
+    if end_marker:
+        end = text.lower().find(end_marker.lower(), start)
+        return text[start : end if end >= 0 else None].strip()
+    return text[start:].strip()
+
+
+def fake_response(prompt: str) -> str:
+    """Answer one of the repo's prompts with a plausible, deterministic response."""
+    lowered = prompt.lower()
+    if "determines if they need multiple agents" in lowered:
+        return json.dumps(split_query(_between(prompt, "User query:")))
+    if "classifies user queries" in lowered:
+        return json.dumps(classify_text(_between(prompt, "User query:")))
+    if "expert evaluator" in lowered:
+        return "Score: 8\nReasoning: Relevant and grounded in the retrieved context."
+
+    # RAG agents: answer with the opening sentences of the retrieved documents
+    documents = _between(prompt, "The retrieved documents are:")
+    sentences = re.split(r"(?<=[.!?])\s+", " ".join(documents.split()))
+    answer = " ".join(sentences[:3]).strip()
+    return answer or "I could not find that information in our documents."
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline stand-in for ChatOpenAI with scripted responses and latency."""
+
+    model_name: str = "fake"
+    latency: Any = None
+    # Delay between streamed chunks (one chunk per word)
+    token_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _respond(self, messages: List[BaseMessage]):
+        prompt = _message_text(messages)
+        content = fake_response(prompt)
+        usage = {
+            "input_tokens": count_tokens(prompt),
+            "output_tokens": count_tokens(content),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        delay = self.latency.sample() / 1000 if self.latency else 0.0
+        return content, usage, delay
+
+    def _message(self, content: str, usage: dict) -> AIMessage:
+        return AIMessage(
+            content=content,
+            usage_metadata=usage,
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, usage, delay = self._respond(messages)
+        time.sleep(delay + self.token_ms * len(content.split()) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._message(content, usage))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, usage, delay = self._respond(messages)
+        await asyncio.sleep(delay + self.token_ms * len(content.split()) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._message(content, usage))])
+
+    def _chunks(self, content: str, usage: dict) -> List[ChatGenerationChunk]:
+        words = re.findall(r"\S+\s*", content) or [content]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=w)) for w in words]
+        # Usage arrives with the last chunk, as with stream_usage=True
+        chunks[-1] = ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=words[-1],
+                usage_metadata=usage,
+                response_metadata={"model_name": self.model_name},
+            )
+        )
+        return chunks
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        content, usage, delay = self._respond(messages)
+        time.sleep(delay)
+        for chunk in self._chunks(content, usage):
+            if self.token_ms:
+                time.sleep(self.token_ms / 1000)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        for chunk in self._chunks(content, usage):
+            if self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+# ---------------------------------------------------------------------------
+# Record / replay
+# ---------------------------------------------------------------------------
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode for a prompt that was never recorded."""
+
+
+class Cassette:
+    """Recorded responses in a JSON lines file, loaded on first use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries[entry["key"]] = entry
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            self._load()
+            return self._entries.get(key)
+
+    def put(self, entry: dict):
+        with self._lock:
+            self._load()
+            self._entries[entry["key"]] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+
+def cassette_key(model: str, temperature: float, max_tokens: Optional[int], messages) -> str:
+    """Hash of everything that determines a response."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": [[message.type, message.content] for message in messages],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteChatModel(BaseChatModel):
+    """Records responses of a live model, or replays them without network access."""
+
+    model_name: str
+    temperature: float = 0.0
+    max_tokens: Optional[int] = None
+    cassette: Any
+    # Live model in record mode, None in replay mode
+    inner: Optional[BaseChatModel] = None
+    # Answers replay misses instead of raising CassetteMiss
+    fallback: Optional[BaseChatModel] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _key(self, messages) -> str:
+        return cassette_key(self.model_name, self.temperature, self.max_tokens, messages)
+
+    def _replayed(self, entry: dict) -> AIMessage:
+        return AIMessage(
+            content=entry["content"],
+            usage_metadata=entry.get("usage"),
+            response_metadata={"model_name": entry.get("model", self.model_name)},
+        )
+
+    def _save(self, key: str, message: BaseMessage):
+        usage = getattr(message, "usage_metadata", None)
+        self.cassette.put(
+            {
+                "key": key,
+                "model": message.response_metadata.get("model_name", self.model_name),
+                "content": message.content,
+                "usage": dict(usage) if usage else None,
+            }
+        )
+
+    def _miss(self, messages, key: str):
+        if self.fallback is not None:
+            return None
+        raise CassetteMiss(
+            f"No recorded response for prompt {key[:12]} "
+            f"(record it with LLM_BACKEND=record, or set LLM_REPLAY_MISS=fake)"
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages)
+        entry = self.cassette.get(key)
+        if entry is not None:
+            message = self._replayed(entry)
+        elif self.inner is not None:
+            message = self.inner.invoke(messages)
+            self._save(key, message)
+        else:
+            self._miss(messages, key)
+            return self.fallback._generate(messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        key = self._key(messages)
+        entry = self.cassette.get(key)
+        if entry is None and self.inner is not None:
+            response = None
+            for chunk in self.inner.stream(messages):
+                response = chunk if response is None else response + chunk
+                generation = ChatGenerationChunk(message=chunk)
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.content, chunk=generation)
+                yield generation
+            if response is not None:
+                self._save(key, response)
+            return
+        if entry is None:
+            self._miss(messages, key)
+            yield from self.fallback._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+
+        message = self._replayed(entry)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=message.content,
+                usage_metadata=message.usage_metadata,
+                response_metadata=message.response_metadata,
+            )
+        )
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+_cassette: Optional[Cassette] = None
+_latency: Optional[LatencyModel] = None
+_shared_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """The shared cassette (LLM_CASSETTE, default storage/llm_cassette.jsonl)."""
+    global _cassette
+    with _shared_lock:
+        if _cassette is None:
+            _cassette = Cassette(os.getenv("LLM_CASSETTE", DEFAULT_CASSETTE))
+        return _cassette
+
+
+def _fake_model(callbacks: list) -> FakeChatModel:
+    global _latency
+    with _shared_lock:
+        if _latency is None:
+            seed = os.getenv("LLM_FAKE_SEED")
+            _latency = LatencyModel(
+                os.getenv("LLM_FAKE_LATENCY_MS", "0"), int(seed) if seed else None
+            )
+    return FakeChatModel(
+        latency=_latency,
+        token_ms=float(os.getenv("LLM_FAKE_TOKEN_MS", "0")),
+        callbacks=callbacks,
+    )
+
+
+def get_chat_model(
+    temperature: float = 0.0,
+    max_tokens: Optional[int] = None,
+    callbacks: Optional[list] = None,
+) -> BaseChatModel:
+    """
+    Chat model for an agent, from the configured LLM_BACKEND.
+
+    Args:
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        callbacks: LangChain callbacks (Langfuse, token usage)
+
+    Returns:
+        A LangChain chat model; all backends support invoke() and stream()
+        and report token usage
+    """
+    backend = get_llm_backend_name()
+    callbacks = callbacks or []
+    model = os.getenv("LLM_MODEL", "gpt-4o-mini")
+
+    if backend == "fake":
+        return _fake_model(callbacks)
+
+    if backend == "replay":
+        fallback = None
+        if os.getenv("LLM_REPLAY_MISS", "error").lower() == "fake":
+            fallback = _fake_model([])
+        return CassetteChatModel(
+            model_name=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cassette=get_cassette(),
+            fallback=fallback,
+            callbacks=callbacks,
+        )
+
+    from langchain_openai import ChatOpenAI
+
+    live = ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream_usage=True,
+        callbacks=callbacks if backend == "openai" else None,
+    )
+    if backend == "openai":
+        return live
+    return CassetteChatModel(
+        model_name=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        cassette=get_cassette(),
+        inner=live,
+        callbacks=callbacks,
+    )
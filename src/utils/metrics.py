@@ -0,0 +1,320 @@
+"""
+In-process latency metrics: histograms per span name and per-request traces.
+
+Code under measurement wraps itself in timed_span("retrieval.faq") and so on.
+Every span feeds a histogram in the global registry; spans opened inside
+request_trace() are also collected into that request's waterfall.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Samples kept per histogram; older samples are dropped first
+MAX_SAMPLES = 10000
+
+
+class Histogram:
+    """Latency samples of one span name, in milliseconds."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, value_ms: float):
+        """Record one sample."""
+        self.samples.append(value_ms)
+        self.count += 1
+        self.total_ms += value_ms
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the retained samples (0.0 when empty)."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50, p95, p99 and max."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.samples) if self.samples else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of histograms keyed by span name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+
+    def observe(self, name: str, value_ms: float):
+        """Record a duration under name."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Summary of every histogram, sorted by name."""
+        with self._lock:
+            return {
+                name: self._histograms[name].summary()
+                for name in sorted(self._histograms)
+            }
+
+    def reset(self):
+        """Drop all recorded samples."""
+        with self._lock:
+            self._histograms.clear()
+
+    def export(self, path: str):
+        """Write the snapshot to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def format_table(self) -> str:
+        """Snapshot as a fixed-width text table."""
+        lines = [
+            f"{'Span':<36}{'Count':>8}{'Mean ms':>10}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'p99 ms':>10}"
+        ]
+        for name, stats in self.snapshot().items():
+            lines.append(
+                f"{name[:35]:<36}{stats['count']:>8}{stats['mean_ms']:>10.1f}"
+                f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+                f"{stats['p99_ms']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+registry = MetricsRegistry()
+
+
+@dataclass
+class Span:
+    """One timed section of a request, relative to the request start."""
+
+    name: str
+    start_ms: float
+    duration_ms: float
+    depth: int
+
+
+@dataclass
+class RequestTrace:
+    """Spans recorded while handling one request."""
+
+    label: str
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    started_at: float = field(default_factory=time.perf_counter)
+    duration_ms: float = 0.0
+    spans: List[Span] = field(default_factory=list)
+    # LLM token usage records (see src/utils/token_usage.py)
+    usage: List[dict] = field(default_factory=list)
+
+    def format_waterfall(self, width: int = 40) -> str:
+        """
+        Render the spans as a text waterfall, in start order.
+
+        Args:
+            width: Characters used for the full request duration
+        """
+        total = self.duration_ms or 1.0
+        lines = [f"Request {self.request_id}: {self.label[:60]!r} ({self.duration_ms:.0f} ms)"]
+        for span in sorted(self.spans, key=lambda s: s.start_ms):
+            offset = int(span.start_ms / total * width)
+            length = max(1, int(span.duration_ms / total * width))
+            bar = " " * offset + "█" * min(length, width - offset)
+            name = "  " * span.depth + span.name
+            lines.append(f"  {name[:34]:<34} |{bar:<{width}}| {span.duration_ms:>8.1f} ms")
+        return "\n".join(lines)
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+_span_depth: contextvars.ContextVar[int] = contextvars.ContextVar("span_depth", default=0)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being handled in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def timed_span(name: str):
+    """
+    Time a block, record it in the registry and in the current request trace.
+
+    Args:
+        name: Span name, dotted by kind (e.g. "node.faq", "llm.faq", "db.deposit")
+    """
+    trace = _current_trace.get()
+    depth = _span_depth.get()
+    token = _span_depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _span_depth.reset(token)
+        duration_ms = (end - start) * 1000
+        registry.observe(name, duration_ms)
+        if trace is not None:
+            trace.spans.append(
+                Span(name, (start - trace.started_at) * 1000, duration_ms, depth)
+            )
+
+
+def mark(name: str) -> Optional[float]:
+    """
+    Record the time from the start of the current request until now.
+
+    Used for milestones such as the time to the first word of an answer.
+
+    Returns:
+        Milliseconds since the request started, or None outside a request
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    elapsed_ms = (time.perf_counter() - trace.started_at) * 1000
+    registry.observe(name, elapsed_ms)
+    trace.spans.append(Span(name, 0.0, elapsed_ms, 0))
+    return elapsed_ms
+
+
+def timed(name: str):
+    """Decorator form of timed_span (for functions and coroutine functions)."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed_span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def request_trace(label: str, profiler: "SlowRequestProfiler" = None):
+    """
+    Collect the spans of one request; the total is recorded as "request".
+
+    Args:
+        label: Request description shown in the waterfall (e.g. the user query)
+        profiler: Optional profiler capturing the slowest requests
+
+    Yields:
+        The RequestTrace, complete once the block exits
+    """
+    trace = RequestTrace(label)
+    token = _current_trace.set(trace)
+    session = profiler.start() if profiler else None
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = (time.perf_counter() - trace.started_at) * 1000
+        _current_trace.reset(token)
+        registry.observe("request", trace.duration_ms)
+        if profiler:
+            profiler.stop(session, trace)
+
+
+class SlowRequestProfiler:
+    """
+    Profiles every request and keeps the reports of the slowest ones.
+
+    Uses cProfile, or pyinstrument when installed and requested. Both profile
+    the thread that handles the request.
+    """
+
+    def __init__(self, keep: int = 3, backend: str = "cprofile", output_dir: str = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            keep: Number of slowest requests whose profiles are kept
+            backend: "cprofile" or "pyinstrument"
+            output_dir: Directory for the reports (defaults to storage/profiles)
+        """
+        self.keep = keep
+        self.backend = backend
+        self.output_dir = output_dir or os.path.join("storage", "profiles")
+        self.slowest: List[tuple] = []  # (duration_ms, path), slowest first
+        self._lock = threading.Lock()
+
+        if backend == "pyinstrument":
+            # Fails early with a clear error instead of on the first request
+            import pyinstrument  # noqa: F401
+
+    def start(self):
+        """Start profiling a request."""
+        if self.backend == "pyinstrument":
+            from pyinstrument import Profiler
+
+            session = Profiler()
+            session.start()
+        else:
+            import cProfile
+
+            session = cProfile.Profile()
+            session.enable()
+        return session
+
+    def stop(self, session, trace: RequestTrace):
+        """Stop profiling and keep the report if the request is among the slowest."""
+        if self.backend == "pyinstrument":
+            session.stop()
+        else:
+            session.disable()
+
+        with self._lock:
+            if len(self.slowest) >= self.keep and trace.duration_ms <= self.slowest[-1][0]:
+                return
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            if self.backend == "pyinstrument":
+                path = os.path.join(self.output_dir, f"request_{trace.request_id}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(session.output_html())
+            else:
+                path = os.path.join(self.output_dir, f"request_{trace.request_id}.prof")
+                session.dump_stats(path)
+
+            self.slowest.append((trace.duration_ms, path))
+            self.slowest.sort(reverse=True)
+            for _, dropped in self.slowest[self.keep :]:
+                if os.path.exists(dropped):
+                    os.remove(dropped)
+            del self.slowest[self.keep :]
@@ -2,144 +2,272 @@
 Factory function to create RAG-based agents with similar structure.
 """
 
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 from src.agents.agent_state import AgentState
 from src.enums.agents_enum import AgentsEnum
-from src.utils.vector_lib import get_local_index
+from src.utils.retrieval import get_retriever
+from src.utils.context_builder import build_context
+from src.utils.reranker import is_rerank_enabled, rerank
+from src.utils.answer_lookup import find_direct_answer
+from src.utils.warmup import wait_until_ready
+from src.utils.metrics import timed_span
+from src.utils.token_usage import enforce_token_budget, usage_callback
+from src.utils.streaming import astream_chat, emit_token, stream_chat
 from src.utils.prompt_loader import load_prompt
 from src.utils.langfuse_utils import get_langfuse_callbacks
-from src.evaluator.evaluator import evaluate_rag_quality
+from src.utils.llm_backends import get_chat_model
+from src.evaluator.evaluator import aevaluate_rag_quality, evaluate_rag_quality
 
 load_dotenv()
 
 
-def create_rag_agent(vector_store_name: str, prompt_file: str):
+def _agent_result(state: AgentState, content: str) -> dict:
     """
-    Factory function to create a RAG-based agent.
+    Build the agent's state update for a response.
+    """
+    # Check if this is part of a multi-query
+    result = state.get("result", {})
+    if result.get("is_multi_query"):
+        # In multi-query, return only the response and route back to orchestrator
+        return {
+            "messages": [AIMessage(content=content)],
+            "next": AgentsEnum.ORCHESTRATOR.value,
+            "result": result,
+        }
 
-    Args:
-        vector_store_name: Name of the vector store to use (e.g., "faq", "investment", "policy")
-        prompt_file: Name of the prompt file to load (e.g., "faq.txt", "investment.txt", "policy.txt")
+    # Single query, end here
+    return {
+        "messages": [AIMessage(content=content)],
+        "next": "END",
+    }
 
-    Returns:
-        Agent function that can be used in the workflow
+
+def _score_trace(callbacks: list, evaluation: dict):
+    """Send an evaluation score to LangFuse through the agent's callback handlers."""
+    try:
+        if callbacks:
+            for callback in callbacks:
+                # Access the callback's client directly
+                if hasattr(callback, "client") and callback.client:
+                    try:
+                        # Use the callback's client to score current trace
+                        callback.client.score_current_trace(
+                            name="rag_quality",
+                            value=evaluation["score"],
+                            comment=evaluation["reasoning"],
+                        )
+                        callback.client.flush()
+                        break
+                    except Exception:
+                        # Alternative method
+                        try:
+                            callback.client.create_score(
+                                name="rag_quality",
+                                value=evaluation["score"],
+                                comment=evaluation["reasoning"],
+                            )
+                            callback.client.flush()
+                            break
+                        except Exception:
+                            pass
+
+                # Fallback: try to get langfuse instance from callback
+                elif hasattr(callback, "langfuse") and callback.langfuse:
+                    try:
+                        callback.langfuse.score_current_trace(
+                            name="rag_quality",
+                            value=evaluation["score"],
+                            comment=evaluation["reasoning"],
+                        )
+                        callback.langfuse.flush()
+                        break
+                    except Exception:
+                        pass
+
+    except Exception:
+        # If LangFuse scoring fails, continue without it
+        pass
+
+
+class _RagAgent:
     """
+    Steps of a RAG agent, shared by its synchronous and asynchronous versions.
 
-    def agent(state: AgentState):
-        """
-        Generic RAG agent that retrieves documents and generates responses.
-        """
-        messages = state["messages"]
+    The async version runs the blocking steps (index lookups, embedding,
+    reranking, LangFuse calls) on worker threads and awaits the LLM, so one
+    event loop can serve many conversations.
+    """
+
+    def __init__(self, vector_store_name: str, prompt_file: str, direct_answers: bool):
+        self.vector_store_name = vector_store_name
+        self.prompt_file = prompt_file
+        self.direct_answers = direct_answers
 
-        # Get the last HumanMessage (could be a sub-query in multi-query scenarios)
-        user_query = None
+    def _user_query(self, state: AgentState) -> str:
+        """The last HumanMessage (could be a sub-query in multi-query scenarios)."""
+        messages = state["messages"]
         for msg in reversed(messages):
             if hasattr(msg, "content") and not isinstance(msg, AIMessage):
-                user_query = msg.content
-                break
+                return msg.content
+        return messages[0].content if messages else ""
+
+    def _wait_until_ready(self):
+        # Use the models and indexes being loaded at launch rather than loading them twice
+        wait_until_ready("retrieval")
+        if is_rerank_enabled():
+            wait_until_ready("reranker")
 
-        if not user_query:
-            user_query = messages[0].content if messages else ""
+    def _direct_answer(self, user_query: str):
+        """Canonical questions are answered straight from the lookup index."""
+        if not self.direct_answers:
+            return None
+        with timed_span(f"lookup.{self.vector_store_name}"):
+            return find_direct_answer(self.vector_store_name, user_query)
 
-        # Retrieve relevant documents from vector store
-        vector_store = get_local_index(vector_store_name)
-        retriever = vector_store.as_retriever(search_kwargs={"k": 3})
-        retrieved_docs = retriever.invoke(user_query)
+    def _retrieve_context(self, user_query: str, started_at: float) -> str:
+        """Retrieve (and optionally rerank) chunks and pack them into the prompt context."""
+        retriever = get_retriever(self.vector_store_name)
+        if is_rerank_enabled():
+            # Over-fetch candidates and let the cross-encoder pick the best few
+            with timed_span(f"retrieval.{self.vector_store_name}"):
+                candidates = retriever.retrieve(
+                    user_query, k=int(os.getenv("RERANK_CANDIDATES", "20"))
+                )
+            with timed_span(f"rerank.{self.vector_store_name}"):
+                retrieved_docs = rerank(user_query, candidates, started_at=started_at)
+        else:
+            with timed_span(f"retrieval.{self.vector_store_name}"):
+                retrieved_docs = retriever.retrieve(user_query)
 
+        # Pack the retrieved chunks into a compact, token-budgeted context
+        context, _ = build_context(retrieved_docs, label=self.vector_store_name)
+        return context
+
+    def _llm_request(self, user_query: str, context: str):
+        """Chat model, messages and callbacks for the answer."""
         # Load and format prompt
-        prompt_template = load_prompt(prompt_file)
-        prompt = prompt_template.format(
-            user_query=user_query, retrieved_docs=retrieved_docs
-        )
+        prompt_template = load_prompt(self.prompt_file)
+        prompt = prompt_template.format(user_query=user_query, retrieved_docs=context)
 
-        # Generate response using LLM with LangFuse monitoring
+        # Generate response using LLM with LangFuse monitoring; tokens are
+        # published to the graph's custom stream as they arrive
         callbacks = get_langfuse_callbacks(
-            trace_name=f"{vector_store_name}_agent",
-            metadata={"agent_type": "rag", "vector_store": vector_store_name},
+            trace_name=f"{self.vector_store_name}_agent",
+            metadata={"agent_type": "rag", "vector_store": self.vector_store_name},
         )
-        response = ChatOpenAI(
-            model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        enforce_token_budget(prompt, max_tokens=500)
+        llm = get_chat_model(
             temperature=0.7,
             max_tokens=500,
-            callbacks=callbacks,
-        ).invoke([HumanMessage(content=prompt)])
+            callbacks=callbacks + [usage_callback(self.vector_store_name, self.prompt_file)],
+        )
+        return llm, [HumanMessage(content=prompt)], callbacks
+
+    def run(self, state: AgentState):
+        """
+        Generic RAG agent that retrieves documents and generates responses.
+        """
+        self._wait_until_ready()
+
+        started_at = time.perf_counter()
+        user_query = self._user_query(state)
+        # Sub-answers of a multi-query are combined by the aggregator, so only
+        # a single query's answer is streamed to the user
+        is_multi_query = state.get("result", {}).get("is_multi_query", False)
+
+        direct_answer = self._direct_answer(user_query)
+        if direct_answer is not None:
+            if not is_multi_query:
+                emit_token(self.vector_store_name, direct_answer)
+            return _agent_result(state, direct_answer)
+
+        context = self._retrieve_context(user_query, started_at)
+        llm, messages, callbacks = self._llm_request(user_query, context)
+        with timed_span(f"llm.{self.vector_store_name}"):
+            response = stream_chat(
+                llm, messages, agent=self.vector_store_name, emit=not is_multi_query
+            )
 
         # Evaluate RAG response quality and send score to LangFuse
         try:
-            # Prepare context from retrieved documents
-            context = "\n".join([doc.page_content for doc in retrieved_docs])
+            with timed_span(f"evaluation.{self.vector_store_name}"):
+                evaluation = evaluate_rag_quality(
+                    query=user_query, response=response.content, context=context
+                )
+            _score_trace(callbacks, evaluation)
+        except Exception:
+            # If evaluation fails, continue without it
+            pass
 
-            # Evaluate the response
-            evaluation = evaluate_rag_quality(
-                query=user_query, response=response.content, context=context
-            )
+        return _agent_result(state, response.content)
+
+    async def arun(self, state: AgentState):
+        """
+        Async version of run(), for graphs executed with ainvoke/astream.
+        """
+        if not wait_until_ready("retrieval", timeout=0) or (
+            is_rerank_enabled() and not wait_until_ready("reranker", timeout=0)
+        ):
+            await asyncio.to_thread(self._wait_until_ready)
 
-            # Send score to LangFuse using callback handler's client
-            try:
-                if callbacks:
-                    for callback in callbacks:
-                        # Access the callback's client directly
-                        if hasattr(callback, "client") and callback.client:
-                            try:
-                                # Use the callback's client to score current trace
-                                callback.client.score_current_trace(
-                                    name="rag_quality",
-                                    value=evaluation["score"],
-                                    comment=evaluation["reasoning"],
-                                )
-                                callback.client.flush()
-                                break
-                            except Exception:
-                                # Alternative method
-                                try:
-                                    callback.client.create_score(
-                                        name="rag_quality",
-                                        value=evaluation["score"],
-                                        comment=evaluation["reasoning"],
-                                    )
-                                    callback.client.flush()
-                                    break
-                                except Exception:
-                                    pass
-
-                        # Fallback: try to get langfuse instance from callback
-                        elif hasattr(callback, "langfuse") and callback.langfuse:
-                            try:
-                                callback.langfuse.score_current_trace(
-                                    name="rag_quality",
-                                    value=evaluation["score"],
-                                    comment=evaluation["reasoning"],
-                                )
-                                callback.langfuse.flush()
-                                break
-                            except Exception:
-                                pass
-
-            except Exception:
-                # If LangFuse scoring fails, continue without it
-                pass
+        started_at = time.perf_counter()
+        user_query = self._user_query(state)
+        is_multi_query = state.get("result", {}).get("is_multi_query", False)
 
+        direct_answer = await asyncio.to_thread(self._direct_answer, user_query)
+        if direct_answer is not None:
+            if not is_multi_query:
+                emit_token(self.vector_store_name, direct_answer)
+            return _agent_result(state, direct_answer)
+
+        context = await asyncio.to_thread(self._retrieve_context, user_query, started_at)
+        llm, messages, callbacks = self._llm_request(user_query, context)
+        with timed_span(f"llm.{self.vector_store_name}"):
+            response = await astream_chat(
+                llm, messages, agent=self.vector_store_name, emit=not is_multi_query
+            )
+
+        try:
+            with timed_span(f"evaluation.{self.vector_store_name}"):
+                evaluation = await aevaluate_rag_quality(
+                    query=user_query, response=response.content, context=context
+                )
+            await asyncio.to_thread(_score_trace, callbacks, evaluation)
         except Exception:
-            # If evaluation fails, continue without it
             pass
 
-        # Check if this is part of a multi-query
-        result = state.get("result", {})
-        if result.get("is_multi_query"):
-            # In multi-query, return only the response and route back to orchestrator
-            return {
-                "messages": [AIMessage(content=response.content)],
-                "next": AgentsEnum.ORCHESTRATOR.value,
-                "result": result,
-            }
-
-        # Single query, end here
-        return {
-            "messages": [AIMessage(content=response.content)],
-            "next": "END",
-        }
+        return _agent_result(state, response.content)
+
 
-    return agent
+def create_rag_agent(
+    vector_store_name: str, prompt_file: str, direct_answers: bool = False
+):
+    """
+    Factory function to create a RAG-based agent.
+
+    Args:
+        vector_store_name: Name of the vector store to use (e.g., "faq", "investment", "policy")
+        prompt_file: Name of the prompt file to load (e.g., "faq.txt", "investment.txt", "policy.txt")
+        direct_answers: Answer canonical questions from the index's answer lookup,
+                        skipping retrieval and generation
+
+    Returns:
+        Agent function that can be used in the workflow
+    """
+    return _RagAgent(vector_store_name, prompt_file, direct_answers).run
+
+
+def create_async_rag_agent(
+    vector_store_name: str, prompt_file: str, direct_answers: bool = False
+):
+    """
+    Async counterpart of create_rag_agent (same arguments).
+
+    Returns:
+        Coroutine function that can be used in a workflow run with ainvoke/astream
+    """
+    return _RagAgent(vector_store_name, prompt_file, direct_answers).arun
@@ -0,0 +1,104 @@
+"""
+Cross-encoder reranking of retrieved chunks, bounded by a per-request time budget.
+"""
+
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def is_rerank_enabled() -> bool:
+    """Check whether the rerank stage is switched on (RERANK_ENABLED)."""
+    return os.getenv("RERANK_ENABLED", "false").lower() == "true"
+
+
+@lru_cache(maxsize=1)
+def get_cross_encoder():
+    """
+    Returns the shared CPU cross-encoder (loaded once per process).
+    """
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(
+        os.getenv("RERANK_MODEL", DEFAULT_RERANK_MODEL), device="cpu", max_length=512
+    )
+
+
+def rerank(
+    query: str,
+    scored_docs: List[Tuple[object, float]],
+    top_k: int = None,
+    budget_ms: float = None,
+    batch_size: int = None,
+    started_at: float = None,
+) -> List[Tuple[object, float]]:
+    """
+    Rerank retrieved chunks with a cross-encoder and keep the best few.
+
+    Candidate pairs are scored in batches. The budget is checked before each
+    batch; once it is used up the original retrieval order is kept, so a slow
+    machine never makes a request slower than budget_ms allows.
+
+    Args:
+        query: User query
+        scored_docs: Candidates from the retriever as (document, score) pairs
+        top_k: Number of chunks to keep (defaults to RERANK_TOP_K, then 3)
+        budget_ms: Time budget in ms (defaults to RERANK_BUDGET_MS, then 300)
+        batch_size: Pairs per forward pass (defaults to RERANK_BATCH_SIZE, then 8)
+        started_at: perf_counter() value the budget is measured from
+                    (defaults to now, i.e. the budget covers reranking only)
+
+    Returns:
+        List of (document, score) pairs, best first
+    """
+    top_k = top_k or int(os.getenv("RERANK_TOP_K", "3"))
+    budget_ms = budget_ms or float(os.getenv("RERANK_BUDGET_MS", "300"))
+    batch_size = batch_size or int(os.getenv("RERANK_BATCH_SIZE", "8"))
+    started_at = started_at or time.perf_counter()
+    deadline = started_at + budget_ms / 1000
+
+    if len(scored_docs) <= 1:
+        return scored_docs[:top_k]
+
+    model = get_cross_encoder()
+    rerank_start = time.perf_counter()
+    scores: List[float] = []
+
+    for offset in range(0, len(scored_docs), batch_size):
+        if time.perf_counter() >= deadline:
+            logger.info(
+                "Rerank skipped: budget of %.0f ms exhausted after %d/%d candidates",
+                budget_ms,
+                len(scores),
+                len(scored_docs),
+            )
+            return scored_docs[:top_k]
+
+        batch = scored_docs[offset : offset + batch_size]
+        pairs = [(query, doc.page_content) for doc, _ in batch]
+        scores.extend(
+            float(score) for score in model.predict(pairs, batch_size=len(pairs))
+        )
+
+    reranked = sorted(
+        zip((doc for doc, _ in scored_docs), scores),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    logger.info(
+        "Reranked %d candidates in %.1f ms",
+        len(scored_docs),
+        (time.perf_counter() - rerank_start) * 1000,
+    )
+    return reranked[:top_k]
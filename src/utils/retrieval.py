@@ -0,0 +1,127 @@
+"""
+Retrievers used by the RAG agents: dense (FAISS only) and hybrid (FAISS + BM25).
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from src.utils.vector_lib import (
+    get_document_key,
+    get_index_documents,
+    get_lexical_index,
+    get_local_index,
+)
+
+load_dotenv()
+
+# Constant from the reciprocal rank fusion paper; dampens the weight of top ranks
+RRF_K = 60
+
+
+class DenseRetriever:
+    """Vector similarity retriever over a FAISS index."""
+
+    def __init__(self, vector_store_name: str, k: int = 3, index_dir: str = None):
+        self.vector_store_name = vector_store_name
+        self.k = k
+        self.index_dir = index_dir
+
+    def retrieve(self, query: str, k: int = None) -> List[Tuple[object, float]]:
+        """
+        Retrieve documents with a similarity score (higher is better).
+
+        Args:
+            query: User query
+            k: Number of documents to return (defaults to self.k)
+
+        Returns:
+            List of (document, score) pairs, best first
+        """
+        vector_store = get_local_index(self.vector_store_name, self.index_dir)
+        results = vector_store.similarity_search_with_score(query, k=k or self.k)
+        # FAISS returns L2 distances; map them to a similarity in (0, 1]
+        return [(doc, 1.0 / (1.0 + float(distance))) for doc, distance in results]
+
+    def invoke(self, query: str) -> list:
+        """Retrieve documents only (LangChain retriever compatible)."""
+        return [doc for doc, _ in self.retrieve(query)]
+
+
+class HybridRetriever(DenseRetriever):
+    """Fuses dense and BM25 rankings with reciprocal rank fusion."""
+
+    def __init__(
+        self,
+        vector_store_name: str,
+        k: int = 3,
+        fetch_k: int = 20,
+        index_dir: str = None,
+    ):
+        super().__init__(vector_store_name, k, index_dir)
+        self.fetch_k = fetch_k
+
+    def retrieve(self, query: str, k: int = None) -> List[Tuple[object, float]]:
+        """
+        Retrieve documents ranked by their fused reciprocal rank score.
+
+        Args:
+            query: User query
+            k: Number of documents to return (defaults to self.k)
+
+        Returns:
+            List of (document, score) pairs, best first
+        """
+        fetch_k = max(self.fetch_k, k or self.k)
+        dense_results = super().retrieve(query, k=fetch_k)
+        lexical_results = get_lexical_index(
+            self.vector_store_name, self.index_dir
+        ).search(query, k=fetch_k)
+
+        documents: Dict[str, object] = {}
+        scores: Dict[str, float] = {}
+
+        for rank, (doc, _) in enumerate(dense_results):
+            key = get_document_key(doc)
+            documents[key] = doc
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        if lexical_results:
+            stored = get_index_documents(self.vector_store_name, self.index_dir)
+            for rank, (key, _) in enumerate(lexical_results):
+                if key not in stored:
+                    continue
+                documents.setdefault(key, stored[key])
+                scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(documents[key], score) for key, score in ranked[: k or self.k]]
+
+
+def get_retriever(
+    vector_store_name: str, mode: str = None, k: int = None, index_dir: str = None
+):
+    """
+    Returns the retriever configured for a vector store.
+
+    Args:
+        vector_store_name: Name of the vector store (e.g., "faq")
+        mode: "hybrid" or "dense" (defaults to RETRIEVAL_MODE, then "hybrid")
+        k: Number of documents to return (defaults to RETRIEVAL_K, then 3)
+        index_dir: Explicit index directory (defaults to the store's directory)
+
+    Returns:
+        DenseRetriever or HybridRetriever instance
+    """
+    mode = (mode or os.getenv("RETRIEVAL_MODE", "hybrid")).lower()
+    k = k or int(os.getenv("RETRIEVAL_K", "3"))
+
+    if mode == "dense":
+        return DenseRetriever(vector_store_name, k=k, index_dir=index_dir)
+    return HybridRetriever(
+        vector_store_name,
+        k=k,
+        fetch_k=int(os.getenv("RETRIEVAL_FETCH_K", "20")),
+        index_dir=index_dir,
+    )
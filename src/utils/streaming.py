@@ -0,0 +1,115 @@
+"""
+Streaming of LLM tokens from the agents to the console and speech.
+
+Agents publish tokens with emit_token(); they reach the caller through
+LangGraph's custom stream mode. The caller groups them into sentences with
+SentenceBuffer so speech can start before the answer is complete.
+"""
+
+import re
+from typing import List, Optional
+
+# A sentence ends at . ! or ? followed by whitespace (so "$1.50" is not split)
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+# Abbreviations whose period does not end a sentence
+_ABBREVIATIONS = {"e.g", "i.e", "mr", "mrs", "ms", "dr", "vs", "approx"}
+
+# Shorter fragments are held back and spoken together with the next sentence
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceBuffer:
+    """Accumulates streamed text and releases it one complete sentence at a time."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text.
+
+        Returns:
+            Sentences completed by this text (possibly none)
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            words = self._buffer[start : match.start()].split()
+            if words and words[-1].lower() in _ABBREVIATIONS:
+                continue
+            sentence = self._buffer[start : match.end()].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+def _get_writer():
+    """The LangGraph custom stream writer, or None outside a graph run."""
+    try:
+        from langgraph.config import get_stream_writer
+
+        return get_stream_writer()
+    except (ImportError, RuntimeError):
+        # Agent called directly (e.g. from a test) rather than through the graph
+        return None
+
+
+def emit_token(agent: str, text: str):
+    """
+    Publish a piece of an agent's answer to the custom stream.
+
+    A no-op unless the graph is being run with stream_mode "custom".
+    """
+    writer = _get_writer()
+    if writer is not None and text:
+        writer({"type": "token", "agent": agent, "text": text})
+
+
+def stream_chat(llm, messages: list, agent: str, emit: bool = True):
+    """
+    Run a chat model with streaming, publishing tokens as they arrive.
+
+    Args:
+        llm: LangChain chat model
+        messages: Messages to send
+        agent: Agent name attached to the published tokens
+        emit: Publish tokens (False collects the answer silently)
+
+    Returns:
+        The complete response message (with usage metadata when reported)
+    """
+    response = None
+    for chunk in llm.stream(messages):
+        if emit:
+            emit_token(agent, chunk.content)
+        response = chunk if response is None else response + chunk
+    return response
+
+
+async def astream_chat(llm, messages: list, agent: str, emit: bool = True):
+    """Async version of stream_chat, for agents run on an event loop."""
+    response = None
+    async for chunk in llm.astream(messages):
+        if emit:
+            emit_token(agent, chunk.content)
+        response = chunk if response is None else response + chunk
+    return response
+
+
+def split_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS) -> List[str]:
+    """Split complete text into sentences, with the same rules as SentenceBuffer."""
+    buffer = SentenceBuffer(min_chars)
+    sentences = buffer.feed(text)
+    remainder = buffer.flush()
+    return sentences + [remainder] if remainder else sentences
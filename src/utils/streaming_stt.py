@@ -0,0 +1,245 @@
+"""
+Streaming transcription of a voice command while it is being recorded.
+
+Every STT_STREAM_STEP_MS of new audio, a worker thread transcribes the audio
+window recorded so far. Consecutive hypotheses are stabilized with
+LocalAgreement: words on which two passes in a row agree are committed and
+never change. When recording ends, only the audio after the last committed
+word has to be transcribed (or nothing, if the last pass already covered all
+the speech), so the final text is ready shortly after end-of-speech.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Callable, List, Optional
+
+from dotenv import load_dotenv
+
+from src.utils.metrics import registry
+from src.utils.stt_backends import STTBackend, Word
+
+load_dotenv()
+
+SAMPLE_RATE = 16000
+# Words starting this long before the last committed word ends are repeats
+COMMIT_TOLERANCE_S = 0.1
+# Longest run of words compared when removing repeats of committed text
+MAX_REPEAT_WORDS = 5
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^a-z0-9']", "", word.lower())
+
+
+def _join(words: List[Word]) -> str:
+    return " ".join(word.text for word in words).strip()
+
+
+class LocalAgreement:
+    """
+    Stabilizes successive transcription hypotheses (LocalAgreement-2).
+
+    A word is committed once two consecutive hypotheses agree on it and on
+    every word before it.
+    """
+
+    def __init__(self):
+        self.committed: List[Word] = []
+        # Uncommitted tail of the previous hypothesis
+        self.tentative: List[Word] = []
+
+    @property
+    def committed_end(self) -> float:
+        """End time of the last committed word (0 if none)."""
+        return self.committed[-1].end if self.committed else 0.0
+
+    def new_words(self, hypothesis: List[Word]) -> List[Word]:
+        """Drop the part of a hypothesis that repeats committed words."""
+        words = [w for w in hypothesis if w.start > self.committed_end - COMMIT_TOLERANCE_S]
+        # Words straddling the boundary may still repeat the committed tail
+        for size in range(min(MAX_REPEAT_WORDS, len(words), len(self.committed)), 0, -1):
+            tail = [_normalize(w.text) for w in self.committed[-size:]]
+            if [_normalize(w.text) for w in words[:size]] == tail:
+                return words[size:]
+        return words
+
+    def insert(self, hypothesis: List[Word]) -> List[Word]:
+        """
+        Add a new hypothesis (absolute timestamps).
+
+        Returns:
+            Words committed by this hypothesis
+        """
+        words = self.new_words(hypothesis)
+        agreed = 0
+        while (
+            agreed < len(words)
+            and agreed < len(self.tentative)
+            and _normalize(words[agreed].text) == _normalize(self.tentative[agreed].text)
+        ):
+            agreed += 1
+        newly_committed = words[:agreed]
+        self.committed.extend(newly_committed)
+        self.tentative = words[agreed:]
+        return newly_committed
+
+    def text(self) -> str:
+        """Committed text followed by the latest uncommitted words."""
+        return _join(self.committed + self.tentative)
+
+
+class StreamingTranscriber:
+    """
+    Transcribes audio on a background thread while it is being recorded.
+
+    Call push() with each recorded chunk and finish() when recording ends.
+    """
+
+    def __init__(
+        self,
+        stt: STTBackend,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        step_ms: int = None,
+        max_window_s: float = None,
+    ):
+        """
+        Initialize and start the worker thread.
+
+        Args:
+            stt: Loaded speech recognition backend
+            on_partial: Called from the worker as on_partial(committed_text, full_text)
+                        whenever the hypothesis changes
+            step_ms: New audio between passes (defaults to STT_STREAM_STEP_MS, then 1000)
+            max_window_s: Longest window transcribed in one pass; older audio is
+                          dropped up to the last committed word (defaults to
+                          STT_STREAM_MAX_WINDOW_S, then 15)
+        """
+        import numpy as np
+
+        self.stt = stt
+        self.on_partial = on_partial
+        self.step_samples = int(
+            SAMPLE_RATE * (step_ms or int(os.getenv("STT_STREAM_STEP_MS", "1000"))) / 1000
+        )
+        self.max_window = int(
+            SAMPLE_RATE
+            * (max_window_s or float(os.getenv("STT_STREAM_MAX_WINDOW_S", "15")))
+        )
+        self.agreement = LocalAgreement()
+        self.passes = 0
+
+        self._audio = np.zeros(0, np.float32)
+        # Sample index where the transcribed window starts
+        self._window_start = 0
+        # Number of samples covered by the latest pass
+        self._transcribed_until = 0
+        self._last_text = ""
+        self._lock = threading.Lock()
+        self._new_audio = threading.Condition(self._lock)
+        self._finishing = False
+        self._busy = False
+        self._thread = threading.Thread(
+            target=self._worker, name="stt_streaming", daemon=True
+        )
+        self._thread.start()
+
+    def push(self, samples):
+        """Append recorded float32 samples (copied)."""
+        import numpy as np
+
+        with self._new_audio:
+            self._audio = np.concatenate([self._audio, np.asarray(samples, np.float32)])
+            if len(self._audio) - self._transcribed_until >= self.step_samples:
+                self._new_audio.notify()
+
+    def _transcribe_window(self, start: int, end: int, prompt: str) -> List[Word]:
+        with self._lock:
+            audio = self._audio[start:end]
+        offset = start / SAMPLE_RATE
+        return [
+            Word(w.text, w.start + offset, w.end + offset)
+            for w in self.stt.transcribe_words(audio, prompt=prompt or None)
+        ]
+
+    def _worker(self):
+        while True:
+            with self._new_audio:
+                while (
+                    not self._finishing
+                    and len(self._audio) - self._transcribed_until < self.step_samples
+                ):
+                    self._new_audio.wait()
+                if self._finishing:
+                    return
+                self._busy = True
+                start, end = self._window_start, len(self._audio)
+
+            try:
+                hypothesis = self._transcribe_window(start, end, _join(self.agreement.committed))
+                self.passes += 1
+                with self._lock:
+                    self.agreement.insert(hypothesis)
+                    self._transcribed_until = end
+                    # Keep the window bounded by dropping audio that is already committed
+                    if end - self._window_start > self.max_window and self.agreement.committed:
+                        self._window_start = int(self.agreement.committed_end * SAMPLE_RATE)
+                    committed, text = _join(self.agreement.committed), self.agreement.text()
+                if self.on_partial and text and text != self._last_text:
+                    self._last_text = text
+                    self.on_partial(committed, text)
+            except Exception as e:
+                # finish() transcribes whatever this pass did not cover
+                print(f"❌ Streaming transcription error: {e}")
+                return
+            finally:
+                with self._new_audio:
+                    self._busy = False
+                    self._new_audio.notify_all()
+
+    def finish(self, speech_end: float = None) -> str:
+        """
+        Stop streaming and return the final transcript.
+
+        Args:
+            speech_end: Seconds into the pushed audio where speech ended (from the
+                        VAD); if the last pass already covered it, its
+                        hypothesis is final and nothing more is transcribed
+
+        Returns:
+            The transcript (empty if nothing was recognized)
+        """
+        start_time = time.perf_counter()
+        with self._new_audio:
+            self._finishing = True
+            self._new_audio.notify_all()
+            # Let a pass that is already running complete; its result is reused
+            while self._busy:
+                self._new_audio.wait()
+            total = len(self._audio)
+            covered = self._transcribed_until
+            committed = list(self.agreement.committed)
+            tentative = list(self.agreement.tentative)
+
+        if total == 0:
+            return ""
+        if speech_end is None:
+            speech_end = total / SAMPLE_RATE
+        if covered and covered / SAMPLE_RATE >= speech_end:
+            text = _join(committed + tentative)
+        else:
+            # Only the audio after the last committed word is transcribed again
+            start = int(self.agreement.committed_end * SAMPLE_RATE)
+            tail = self._transcribe_window(start, total, _join(committed))
+            text = _join(committed + self.agreement.new_words(tail))
+            self.passes += 1
+
+        registry.observe("stt.stream_finish", (time.perf_counter() - start_time) * 1000)
+        return text
+
+    def cancel(self):
+        """Stop the worker without producing a transcript."""
+        with self._new_audio:
+            self._finishing = True
+            self._new_audio.notify_all()
@@ -0,0 +1,202 @@
+"""
+Speech recognition engines used by VoiceInputHandler, selected with STT_BACKEND.
+
+- whisper: OpenAI Whisper on PyTorch (FP32 on CPU)
+- faster-whisper: Whisper on CTranslate2 with int8 weights, several times
+  faster on CPU at similar accuracy
+
+STT_MODEL picks the model size ("tiny", "base", "small", ...).
+"""
+
+import importlib.util
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Type
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL = "base"
+
+
+@dataclass
+class Word:
+    """A recognized word with its position in the audio, in seconds."""
+
+    text: str
+    start: float
+    end: float
+
+
+def _device() -> str:
+    return "cuda" if os.getenv("USE_CUDA") == "true" else "cpu"
+
+
+class STTBackend:
+    """Interface of a speech recognition engine."""
+
+    name = ""
+
+    def __init__(self, model_name: str = None):
+        """
+        Args:
+            model_name: Model size (defaults to STT_MODEL, then "base")
+        """
+        self.model_name = model_name or os.getenv("STT_MODEL", DEFAULT_MODEL)
+        self.model = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether the engine is installed."""
+        raise NotImplementedError
+
+    def load(self):
+        """Load the model (slow; call once, possibly from a background thread)."""
+        raise NotImplementedError
+
+    def transcribe(self, audio) -> str:
+        """
+        Transcribe speech.
+
+        Args:
+            audio: float32 samples at 16 kHz
+
+        Returns:
+            Recognized text (empty if nothing was understood)
+        """
+        raise NotImplementedError
+
+    def transcribe_words(self, audio, prompt: str = None) -> List[Word]:
+        """
+        Transcribe speech with word timestamps (used by streaming transcription).
+
+        Args:
+            audio: float32 samples at 16 kHz
+            prompt: Text spoken just before the audio, given to the decoder as context
+
+        Returns:
+            Recognized words in order
+        """
+        raise NotImplementedError
+
+
+class WhisperBackend(STTBackend):
+    """OpenAI's reference implementation."""
+
+    name = "whisper"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("whisper") is not None
+
+    def load(self):
+        import whisper
+
+        self.model = whisper.load_model(self.model_name, device=_device())
+
+    def transcribe(self, audio) -> str:
+        # FP16 only helps (and only works) on the GPU
+        result = self.model.transcribe(audio, fp16=_device() == "cuda")
+        return result["text"].strip()
+
+    def transcribe_words(self, audio, prompt: str = None) -> List[Word]:
+        result = self.model.transcribe(
+            audio,
+            fp16=_device() == "cuda",
+            word_timestamps=True,
+            initial_prompt=prompt,
+            condition_on_previous_text=False,
+        )
+        return [
+            Word(word["word"].strip(), word["start"], word["end"])
+            for segment in result["segments"]
+            for word in segment.get("words", [])
+        ]
+
+
+class FasterWhisperBackend(STTBackend):
+    """CTranslate2 port of Whisper with quantized weights."""
+
+    name = "faster-whisper"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        device = _device()
+        compute_type = os.getenv(
+            "STT_COMPUTE_TYPE", "int8" if device == "cpu" else "float16"
+        )
+        self.model = WhisperModel(
+            self.model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=int(os.getenv("STT_CPU_THREADS", "0")),
+        )
+
+    def transcribe(self, audio) -> str:
+        # Greedy decoding, like openai-whisper's transcribe() default
+        segments, _ = self.model.transcribe(audio, beam_size=1, language="en")
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def transcribe_words(self, audio, prompt: str = None) -> List[Word]:
+        segments, _ = self.model.transcribe(
+            audio,
+            beam_size=1,
+            language="en",
+            word_timestamps=True,
+            initial_prompt=prompt,
+            condition_on_previous_text=False,
+        )
+        return [
+            Word(word.word.strip(), word.start, word.end)
+            for segment in segments
+            for word in segment.words or []
+        ]
+
+
+BACKENDS: Dict[str, Type[STTBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+# Tried in this order when the configured backend is unavailable
+FALLBACK_ORDER = ("faster-whisper", "whisper")
+
+
+def available_backends() -> list:
+    """Names of the backends installed on this machine."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_stt_backend(name: str = None, model_name: str = None) -> Optional[STTBackend]:
+    """
+    Create the named backend (not yet loaded), falling back to another installed one.
+
+    Args:
+        name: Backend name (defaults to STT_BACKEND, then "whisper"; see BACKENDS)
+        model_name: Model size (defaults to STT_MODEL)
+
+    Returns:
+        Backend instance, or None if no engine is installed
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    name = (name or os.getenv("STT_BACKEND", "whisper")).lower()
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown STT backend '{name}'. Available: {', '.join(sorted(BACKENDS))}"
+        )
+    if BACKENDS[name].is_available():
+        return BACKENDS[name](model_name)
+
+    for fallback in FALLBACK_ORDER:
+        if BACKENDS[fallback].is_available():
+            print(f"Warning: STT backend '{name}' is not installed; using '{fallback}'.")
+            return BACKENDS[fallback](model_name)
+    return None
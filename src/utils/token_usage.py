@@ -0,0 +1,308 @@
+"""
+Token and cost accounting for LLM calls.
+
+Every call is recorded with the agent and prompt file that made it. Totals are
+kept per agent and per prompt for the whole process, and per request on the
+current RequestTrace (see src/utils/metrics.py), where a token budget can be
+enforced.
+"""
+
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from src.utils.metrics import current_trace
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M (prompt, completion) tokens; override with LLM_PRICE_PROMPT_PER_1M
+# and LLM_PRICE_COMPLETION_PER_1M for other models or updated prices
+PRICES_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised when a request would go over REQUEST_TOKEN_BUDGET in reject mode."""
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimated cost of a call in USD (0.0 for models without a known price).
+    """
+    prompt_price = os.getenv("LLM_PRICE_PROMPT_PER_1M")
+    completion_price = os.getenv("LLM_PRICE_COMPLETION_PER_1M")
+    if prompt_price and completion_price:
+        prices = (float(prompt_price), float(completion_price))
+    else:
+        # Dated snapshots ("gpt-4o-mini-2024-07-18") use the base model's price
+        matches = [name for name in PRICES_PER_1M if (model or "").startswith(name)]
+        if not matches:
+            return 0.0
+        prices = PRICES_PER_1M[max(matches, key=len)]
+
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+
+def _add(totals: Dict[str, float], record: dict):
+    totals["calls"] += 1
+    totals["prompt_tokens"] += record["prompt_tokens"]
+    totals["completion_tokens"] += record["completion_tokens"]
+    totals["cost_usd"] += record["cost_usd"]
+
+
+def summarize(records: list) -> Dict[str, float]:
+    """Total calls, tokens and cost of a list of usage records."""
+    totals = _empty_totals()
+    for record in records:
+        _add(totals, record)
+    return totals
+
+
+class UsageLedger:
+    """Thread-safe process-wide token totals per agent and per prompt file."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_agent: Dict[str, Dict[str, float]] = {}
+        self._by_prompt: Dict[str, Dict[str, float]] = {}
+        self._total = _empty_totals()
+
+    def add(self, record: dict):
+        """Add one usage record."""
+        with self._lock:
+            _add(self._by_agent.setdefault(record["agent"], _empty_totals()), record)
+            _add(self._by_prompt.setdefault(record["prompt"], _empty_totals()), record)
+            _add(self._total, record)
+
+    def snapshot(self) -> dict:
+        """Totals per agent, per prompt and overall."""
+        with self._lock:
+            return {
+                "by_agent": {name: dict(t) for name, t in sorted(self._by_agent.items())},
+                "by_prompt": {
+                    name: dict(t) for name, t in sorted(self._by_prompt.items())
+                },
+                "total": dict(self._total),
+            }
+
+    def reset(self):
+        """Drop all recorded usage."""
+        with self._lock:
+            self._by_agent.clear()
+            self._by_prompt.clear()
+            self._total = _empty_totals()
+
+    def format_table(self) -> str:
+        """Snapshot as a fixed-width text table, most expensive prompts first."""
+        snapshot = self.snapshot()
+        lines = []
+        for title, group in (("Agent", "by_agent"), ("Prompt", "by_prompt")):
+            lines.append(
+                f"{title:<28}{'Calls':>7}{'Prompt tok':>12}{'Compl. tok':>12}"
+                f"{'Avg prompt':>12}{'Cost $':>10}"
+            )
+            rows = sorted(
+                snapshot[group].items(),
+                key=lambda item: item[1]["prompt_tokens"] + item[1]["completion_tokens"],
+                reverse=True,
+            )
+            for name, t in rows:
+                lines.append(
+                    f"{name[:27]:<28}{t['calls']:>7}{t['prompt_tokens']:>12}"
+                    f"{t['completion_tokens']:>12}"
+                    f"{t['prompt_tokens'] / t['calls']:>12.0f}{t['cost_usd']:>10.4f}"
+                )
+            lines.append("")
+        total = snapshot["total"]
+        lines.append(
+            f"Total: {total['calls']} calls, {total['prompt_tokens']} prompt + "
+            f"{total['completion_tokens']} completion tokens, ${total['cost_usd']:.4f}"
+        )
+        return "\n".join(lines)
+
+
+ledger = UsageLedger()
+
+
+def get_token_budget() -> Optional[int]:
+    """Per-request token budget from REQUEST_TOKEN_BUDGET (None when unset or 0)."""
+    budget = int(os.getenv("REQUEST_TOKEN_BUDGET", "0"))
+    return budget or None
+
+
+def _request_tokens(trace) -> int:
+    totals = summarize(trace.usage)
+    return totals["prompt_tokens"] + totals["completion_tokens"]
+
+
+def record_usage(
+    agent: str,
+    prompt: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+) -> dict:
+    """
+    Record the token use of one LLM call.
+
+    Args:
+        agent: Agent that made the call (e.g. "orchestrator", "faq", "evaluator")
+        prompt: Prompt file the call was built from (e.g. "faq.txt")
+        model: Model name reported by the API
+        prompt_tokens: Prompt (input) tokens
+        completion_tokens: Completion (output) tokens
+
+    Returns:
+        The usage record
+    """
+    record = {
+        "agent": agent,
+        "prompt": prompt,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+    }
+    ledger.add(record)
+
+    trace = current_trace()
+    if trace is not None:
+        before = _request_tokens(trace)
+        trace.usage.append(record)
+        budget = get_token_budget()
+        after = before + prompt_tokens + completion_tokens
+        if budget and before <= budget < after:
+            logger.warning(
+                "Request %s went over its token budget: %d of %d tokens (after %s/%s)",
+                trace.request_id,
+                after,
+                budget,
+                agent,
+                prompt,
+            )
+
+    logger.info(
+        "%s (%s): %d prompt + %d completion tokens",
+        agent,
+        prompt,
+        prompt_tokens,
+        completion_tokens,
+    )
+    return record
+
+
+def enforce_token_budget(prompt_text: str, max_tokens: int = 0):
+    """
+    Reject an LLM call that would take the current request over its budget.
+
+    Only acts when REQUEST_TOKEN_BUDGET is set and REQUEST_TOKEN_BUDGET_ACTION
+    is "reject" (the default "log" only warns once the budget is passed).
+
+    Args:
+        prompt_text: Prompt about to be sent
+        max_tokens: Completion token limit of the call
+
+    Raises:
+        TokenBudgetExceeded: If the request would go over its budget
+    """
+    budget = get_token_budget()
+    trace = current_trace()
+    if not budget or trace is None:
+        return
+    if os.getenv("REQUEST_TOKEN_BUDGET_ACTION", "log").lower() != "reject":
+        return
+
+    from src.utils.context_builder import count_tokens
+
+    projected = _request_tokens(trace) + count_tokens(prompt_text) + max_tokens
+    if projected > budget:
+        raise TokenBudgetExceeded(
+            f"Request would use up to {projected} tokens, over its budget of {budget}"
+        )
+
+
+def format_request_usage(trace) -> str:
+    """One-line token summary of a request (empty when it made no LLM calls)."""
+    if not trace.usage:
+        return ""
+    totals = summarize(trace.usage)
+    calls = ", ".join(
+        f"{r['agent']}/{r['prompt']} {r['prompt_tokens']}+{r['completion_tokens']}"
+        for r in trace.usage
+    )
+    return (
+        f"  tokens: {totals['prompt_tokens']} prompt + {totals['completion_tokens']} "
+        f"completion, ${totals['cost_usd']:.6f} ({calls})"
+    )
+
+
+@lru_cache(maxsize=1)
+def _callback_class():
+    """LangChain callback handler class, defined on first use (imports langchain_core)."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TokenUsageCallback(BaseCallbackHandler):
+        """Records the token usage of every chat model response."""
+
+        def __init__(self, agent: str, prompt: str):
+            self.agent = agent
+            self.prompt = prompt
+
+        def on_llm_end(self, response, **kwargs):
+            llm_output = response.llm_output or {}
+            model = llm_output.get("model_name", "")
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None)
+                    if usage:
+                        record_usage(
+                            self.agent,
+                            self.prompt,
+                            model or message.response_metadata.get("model_name", ""),
+                            usage.get("input_tokens", 0),
+                            usage.get("output_tokens", 0),
+                        )
+                        return
+
+            # Older responses only report usage in llm_output
+            token_usage = llm_output.get("token_usage")
+            if token_usage:
+                record_usage(
+                    self.agent,
+                    self.prompt,
+                    model,
+                    token_usage.get("prompt_tokens", 0),
+                    token_usage.get("completion_tokens", 0),
+                )
+
+    return TokenUsageCallback
+
+
+def usage_callback(agent: str, prompt: str):
+    """
+    LangChain callback that records token usage for an agent's prompt.
+
+    Args:
+        agent: Agent name
+        prompt: Prompt file name
+
+    Returns:
+        Callback handler to add to a chat model's callbacks
+    """
+    return _callback_class()(agent, prompt)
@@ -0,0 +1,197 @@
+"""
+Speech synthesis engines used by TextToSpeech, selected with TTS_BACKEND.
+
+- gtts: Google TTS (needs internet; tempo is changed afterwards with ffmpeg)
+- pyttsx3: local engine (espeak-ng on Linux, SAPI5 on Windows, NSSpeech on macOS)
+- espeak: espeak-ng / espeak command line, fully offline
+"""
+
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Dict, Optional, Type
+
+# Speaking rate of the local engines at speed 1.0, in words per minute
+BASE_WORDS_PER_MINUTE = 175
+
+
+class TTSBackend:
+    """Interface of a synthesis engine."""
+
+    name = ""
+    # Extension of the files the engine writes
+    extension = ".wav"
+    # The engine applies the tempo itself (no ffmpeg pass needed)
+    handles_tempo = False
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether the engine can run on this machine."""
+        raise NotImplementedError
+
+    def synthesize(self, text: str, path: str, lang: str = "en", speed: float = 1.0):
+        """
+        Render text to an audio file.
+
+        Args:
+            text: Cleaned text to speak
+            path: Output file (with this backend's extension)
+            lang: Language code
+            speed: Tempo; ignored by backends that do not handle tempo
+        """
+        raise NotImplementedError
+
+    def synthesize_bytes(self, text: str, lang: str = "en", speed: float = 1.0) -> bytes:
+        """
+        Render text to encoded audio in memory.
+
+        The default goes through a temporary file; backends that can write to
+        a buffer or stdout override it.
+        """
+        with tempfile.NamedTemporaryFile(delete=False, suffix=self.extension) as tmp:
+            path = tmp.name
+        try:
+            self.synthesize(text, path, lang, speed)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS; one HTTPS round trip per utterance."""
+
+    name = "gtts"
+    extension = ".mp3"
+    handles_tempo = False
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("gtts") is not None
+
+    def synthesize(self, text: str, path: str, lang: str = "en", speed: float = 1.0):
+        from gtts import gTTS
+
+        gTTS(text=text, lang=lang, slow=False).save(path)
+
+    def synthesize_bytes(self, text: str, lang: str = "en", speed: float = 1.0) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Offline synthesis through pyttsx3's platform driver."""
+
+    name = "pyttsx3"
+    extension = ".wav"
+    handles_tempo = True
+
+    def __init__(self):
+        self._engine = None
+        # pyttsx3 engines are not thread-safe
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("pyttsx3") is not None
+
+    def synthesize(self, text: str, path: str, lang: str = "en", speed: float = 1.0):
+        with self._lock:
+            if self._engine is None:
+                import pyttsx3
+
+                self._engine = pyttsx3.init()
+            self._engine.setProperty("rate", int(BASE_WORDS_PER_MINUTE * speed))
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+
+
+class EspeakBackend(TTSBackend):
+    """Offline synthesis with the espeak-ng (or espeak) command line tool."""
+
+    name = "espeak"
+    extension = ".wav"
+    handles_tempo = True
+
+    @staticmethod
+    def _executable() -> Optional[str]:
+        return shutil.which("espeak-ng") or shutil.which("espeak")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return cls._executable() is not None
+
+    def _command(self, lang: str, speed: float) -> list:
+        return [
+            self._executable(),
+            "-v",
+            lang,
+            "-s",
+            str(int(BASE_WORDS_PER_MINUTE * speed)),
+        ]
+
+    def synthesize(self, text: str, path: str, lang: str = "en", speed: float = 1.0):
+        subprocess.run(
+            self._command(lang, speed) + ["-w", path, text],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def synthesize_bytes(self, text: str, lang: str = "en", speed: float = 1.0) -> bytes:
+        completed = subprocess.run(
+            self._command(lang, speed) + ["--stdout", text],
+            check=True,
+            capture_output=True,
+        )
+        return completed.stdout
+
+
+BACKENDS: Dict[str, Type[TTSBackend]] = {
+    GTTSBackend.name: GTTSBackend,
+    Pyttsx3Backend.name: Pyttsx3Backend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+# Tried in this order when the configured backend is unavailable
+FALLBACK_ORDER = ("espeak", "pyttsx3", "gtts")
+
+
+def available_backends() -> list:
+    """Names of the backends that can run on this machine."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_tts_backend(name: str) -> Optional[TTSBackend]:
+    """
+    Create the named backend, falling back to another available one.
+
+    Args:
+        name: Backend name (see BACKENDS)
+
+    Returns:
+        Backend instance, or None if no engine is installed
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown TTS backend '{name}'. Available: {', '.join(sorted(BACKENDS))}"
+        )
+    if BACKENDS[name].is_available():
+        return BACKENDS[name]()
+
+    for fallback in FALLBACK_ORDER:
+        if BACKENDS[fallback].is_available():
+            print(f"Warning: TTS backend '{name}' is not installed; using '{fallback}'.")
+            return BACKENDS[fallback]()
+    return None
@@ -1,64 +1,112 @@
 """
-Text-to-Speech using Google TTS (better quality, requires internet).
-Uses pygame for audio playback, with fallback to system audio players.
+Text-to-Speech using Google TTS (better quality, requires internet) or an
+offline engine selected with TTS_BACKEND.
+With NumPy and sounddevice installed, audio is decoded, time-stretched and
+played in memory (src/utils/audio_pipeline.py); otherwise pygame plays audio
+files, with fallback to system audio players.
 """
 
+import importlib.util
 import os
 import platform
+import queue
+import shutil
 import subprocess
 import tempfile
-from typing import Optional
+import threading
+from typing import Optional, Union
 import warnings
 
 from dotenv import load_dotenv
 
+from src.utils.audio_cache import cache_key, get_audio_cache
+from src.utils.audio_pipeline import (
+    AudioClip,
+    decode_audio,
+    encode_wav,
+    get_audio_output,
+    is_memory_pipeline_enabled,
+    time_stretch,
+)
+from src.utils.metrics import timed_span
+from src.utils.streaming import split_sentences
+from src.utils.tts_backends import available_backends, get_tts_backend
+
 load_dotenv()
 
-# Import gTTS
-try:
-    from gtts import gTTS
+# pygame is imported on first use so it does not slow down startup
+PYGAME_AVAILABLE = importlib.util.find_spec("pygame") is not None
 
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-    print("Warning: gTTS not installed. Install with: pip install gtts")
+if not available_backends():
+    print(
+        "Warning: No TTS engine installed. Install gTTS (pip install gtts), "
+        "pyttsx3 (pip install pyttsx3) or espeak-ng."
+    )
 
-# Import pygame as primary audio player
-try:
-    # Suppress pygame warnings and messages
-    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
-    warnings.filterwarnings("ignore", category=UserWarning, module="pygame")
+_mixer_lock = threading.Lock()
+_mixer_ready = False
 
-    import pygame
 
-    # Suppress pygame initialization messages
-    pygame.mixer.pre_init()
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+def _init_pygame_mixer() -> bool:
+    """Import pygame and initialize its mixer once. Returns False on failure."""
+    global _mixer_ready
+    with _mixer_lock:
+        if _mixer_ready:
+            return True
+        try:
+            # Suppress pygame warnings and messages
+            os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+            warnings.filterwarnings("ignore", category=UserWarning, module="pygame")
 
+            import pygame
+
+            pygame.mixer.pre_init()
+            pygame.mixer.init()
+            _mixer_ready = True
+        except Exception:
+            _mixer_ready = False
+        return _mixer_ready
+
+
+def _remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
-class TextToSpeech:
-    """Text-to-Speech handler using Google TTS."""
 
-    def __init__(self):
-        self.enabled = GTTS_AVAILABLE
+class TextToSpeech:
+    """Text-to-Speech handler with a configurable synthesis backend."""
+
+    def __init__(self, backend: str = None):
+        """
+        Initialize the handler.
+
+        Args:
+            backend: Synthesis engine name (defaults to TTS_BACKEND, then "gtts";
+                     see src/utils/tts_backends.py)
+        """
+        self.backend = get_tts_backend(backend or os.getenv("TTS_BACKEND", "gtts"))
+        self.enabled = self.backend is not None
         self.use_pygame = PYGAME_AVAILABLE
 
+        self.lang = "en"
         self.speed = float(os.getenv("TTS_SPEED", "1.4"))
-        self.ffmpeg_available = self._check_ffmpeg()
+        self._ffmpeg_available = None
+        self._stop_requested = threading.Event()
+        # Compressed audio (gTTS MP3) is decoded in memory by pygame
+        self.in_memory = (
+            self.enabled
+            and is_memory_pipeline_enabled()
+            and (self.backend.extension == ".wav" or PYGAME_AVAILABLE)
+        )
 
-    def _check_ffmpeg(self):
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            return True
-        except:
-            return False
+    @property
+    def ffmpeg_available(self) -> bool:
+        """Whether ffmpeg is on PATH (looked up on first use, without spawning it)."""
+        if self._ffmpeg_available is None:
+            self._ffmpeg_available = shutil.which("ffmpeg") is not None
+        return self._ffmpeg_available
 
     def _build_atempo_filters(self, speed: float) -> str:
         filters = []
@@ -75,82 +123,221 @@ class TextToSpeech:
         filters.append(f"atempo={remaining}")
         return ",".join(filters)
 
-    def speak(self, text: str):
-        if not self.enabled:
-            return
+    @property
+    def effective_speed(self) -> float:
+        """Tempo the audio is rendered at (1.0 when it cannot be changed)."""
+        if self.in_memory or self.backend.handles_tempo or self.ffmpeg_available:
+            return self.speed
+        return 1.0
+
+    def render(self, clean_text: str) -> str:
+        """
+        Synthesize cleaned text to a new temporary file at TTS_SPEED (no cache).
+
+        Returns:
+            Path of the audio file (the caller deletes it)
+        """
+        # Create temporary output file
+        with tempfile.NamedTemporaryFile(
+            delete=False, suffix=self.backend.extension
+        ) as tmp_file:
+            tmp_path = tmp_file.name
+
+        # Generate the audio; local engines apply the tempo while synthesizing
+        self.backend.synthesize(clean_text, tmp_path, self.lang, self.speed)
+
+        if (
+            not self.backend.handles_tempo
+            and self.speed != 1.0
+            and self.ffmpeg_available
+        ):
+            root, extension = os.path.splitext(tmp_path)
+            fast_path = f"{root}_fast{extension}"
+            filter_chain = self._build_atempo_filters(self.speed)
 
-        try:
-            clean_text = self._clean_text(text)
-            if not clean_text:
-                return
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-i",
+                    tmp_path,
+                    "-filter:a",
+                    filter_chain,
+                    "-y",
+                    fast_path,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
 
-            # Create temporary output file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-                tmp_path = tmp_file.name
-
-            # Generate the audio
-            tts = gTTS(text=clean_text, lang="en", slow=False)
-            tts.save(tmp_path)
-
-            if self.speed != 1.0 and self.ffmpeg_available:
-                fast_path = tmp_path.replace(".mp3", "_fast.mp3")
-                filter_chain = self._build_atempo_filters(self.speed)
-
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-i",
-                        tmp_path,
-                        "-filter:a",
-                        filter_chain,
-                        "-y",
-                        fast_path,
-                    ],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
+            os.replace(fast_path, tmp_path)
+
+        return tmp_path
+
+    def render_clip(self, clean_text: str) -> AudioClip:
+        """
+        Synthesize cleaned text to PCM in memory at TTS_SPEED (no cache).
+
+        The tempo is changed in-process instead of with ffmpeg.
+        """
+        speed = self.speed if self.backend.handles_tempo else 1.0
+        data = self.backend.synthesize_bytes(clean_text, self.lang, speed)
+        clip = decode_audio(data, self.backend.extension)
+        if not self.backend.handles_tempo:
+            clip = time_stretch(clip, self.speed)
+        return clip
+
+    def _load_clip(self, path: str) -> AudioClip:
+        with open(path, "rb") as f:
+            data = f.read()
+        return decode_audio(data, os.path.splitext(path)[1])
+
+    def synthesize(self, clean_text: str) -> Optional[Union[str, AudioClip]]:
+        """
+        Render cleaned text to audio, sped up to TTS_SPEED.
+
+        Phrases rendered before are served from the audio cache.
+
+        Returns:
+            An AudioClip in memory mode, otherwise the path of an audio file
+            (hand either to release() when done), or None on failure
+        """
+        if not self.enabled or not clean_text:
+            return None
+
+        cache = get_audio_cache()
+        if cache is not None:
+            key = cache_key(
+                clean_text, self.lang, self.effective_speed, self.backend.name
+            )
+            cached_path = cache.get(key)
+            if cached_path is not None:
+                if not self.in_memory:
+                    return cached_path
+                try:
+                    return self._load_clip(cached_path)
+                except Exception as e:
+                    print(f"Error decoding cached audio: {e}")
+                    return None
+
+        if self.in_memory:
+            try:
+                clip = self.render_clip(clean_text)
+                if cache is not None:
+                    cache.put_bytes(key, encode_wav(clip), ".wav")
+                return clip
+            except Exception as e:
+                print(f"In-memory speech failed ({e}); falling back to audio files.")
+                self.in_memory = False
 
-                os.replace(fast_path, tmp_path)
+        try:
+            tmp_path = self.render(clean_text)
+            if cache is not None:
+                key = cache_key(
+                    clean_text, self.lang, self.effective_speed, self.backend.name
+                )
+                return cache.put(key, tmp_path)
+            return tmp_path
 
+        except Exception as e:
+            print(f"Error with {self.backend.name} TTS: {e}")
+            return None
+
+    def play(self, audio: Union[str, AudioClip], stop_event: threading.Event = None):
+        """
+        Play audio, returning early once the stop event is set.
+
+        Args:
+            audio: AudioClip or audio file returned by synthesize()
+            stop_event: Event that interrupts playback (defaults to the one set
+                        by stop())
+        """
+        stop_event = stop_event or self._stop_requested
+        if isinstance(audio, AudioClip):
             try:
-                if self.use_pygame:
-                    pygame.mixer.music.load(tmp_path)
-                    pygame.mixer.music.play()
-                    while pygame.mixer.music.get_busy():
-                        pygame.time.Clock().tick(10)
-                else:
-                    system = platform.system()
-                    if system == "Darwin":
-                        subprocess.run(["afplay", tmp_path], check=True)
-                    elif system == "Linux":
-                        for player in ["aplay", "paplay", "mpg123", "mpv"]:
-                            try:
-                                subprocess.run(
-                                    [player, tmp_path],
-                                    check=True,
-                                    stdout=subprocess.DEVNULL,
-                                    stderr=subprocess.DEVNULL,
-                                )
-                                break
-                            except:
-                                continue
-                        else:
-                            print("No audio player found.")
-                    elif system == "Windows":
-                        subprocess.run(
-                            ["start", "/B", tmp_path], shell=True, check=True
-                        )
-
+                get_audio_output().play(audio, stop_event)
             except Exception as e:
                 print(f"Error playing audio: {e}")
+                # No usable output device; render files for the players instead
+                self.in_memory = False
+            return
 
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+        path = audio
+        try:
+            if self.use_pygame and _init_pygame_mixer():
+                import pygame
+
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.play()
+                clock = pygame.time.Clock()
+                while pygame.mixer.music.get_busy():
+                    if stop_event.is_set():
+                        pygame.mixer.music.stop()
+                        break
+                    clock.tick(20)
+                pygame.mixer.music.unload()
+            else:
+                system = platform.system()
+                if system == "Darwin":
+                    self._run_player(["afplay", path], stop_event)
+                elif system == "Linux":
+                    for player in ["aplay", "paplay", "mpg123", "mpv"]:
+                        if shutil.which(player) is None:
+                            continue
+                        if self._run_player([player, path], stop_event):
+                            break
+                    else:
+                        print("No audio player found.")
+                elif system == "Windows":
+                    subprocess.run(["start", "/B", path], shell=True, check=True)
 
         except Exception as e:
-            print(f"Error with Google TTS: {e}")
+            print(f"Error playing audio: {e}")
+
+    def _run_player(self, command: list, stop_event: threading.Event) -> bool:
+        """Run an external player until it exits or the stop event is set."""
+        process = subprocess.Popen(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        while process.poll() is None:
+            if stop_event.wait(0.05):
+                process.terminate()
+                return True
+        return process.returncode == 0
+
+    def release(self, audio: Union[str, AudioClip]):
+        """Delete an audio file returned by synthesize() unless the cache owns it."""
+        if isinstance(audio, AudioClip):
+            return
+        path = audio
+        cache = get_audio_cache()
+        if cache is None or not cache.contains_path(path):
+            _remove_file(path)
+
+    def prerender(self, text: str) -> int:
+        """
+        Synthesize text into the audio cache, sentence by sentence as speech is queued.
+
+        Returns:
+            Number of sentences now cached
+        """
+        rendered = 0
+        for sentence in split_sentences(self._clean_text(text)):
+            audio = self.synthesize(sentence)
+            if audio is not None:
+                self.release(audio)
+                rendered += 1
+        return rendered
+
+    def speak(self, text: str):
+        """Synthesize and play text, blocking until playback ends."""
+        audio = self.synthesize(self._clean_text(text))
+        if audio is None:
+            return
+        self._stop_requested.clear()
+        try:
+            self.play(audio)
+        finally:
+            self.release(audio)
 
     def _clean_text(self, text: str) -> str:
         if "{" in text and "}" in text:
@@ -176,10 +363,129 @@ class TextToSpeech:
         return " ".join(text.split()).strip()
 
     def stop(self):
-        pass
+        """Stop the audio that is playing now."""
+        self._stop_requested.set()
+
+
+class SpeechPipeline:
+    """
+    Speaks text in the background, one sentence at a time.
+
+    A synthesis worker renders sentence N+1 while a playback worker plays
+    sentence N. interrupt() drops everything queued and stops the current
+    sentence, so new user input can cut speech short (barge-in).
+    """
+
+    def __init__(self, tts: TextToSpeech):
+        self.tts = tts
+        self._sentences = queue.Queue()
+        self._audio = queue.Queue()
+        # Bumped by interrupt(); queued items from an older generation are dropped
+        self._generation = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+
+        threading.Thread(
+            target=self._synthesis_worker, name="tts_synthesis", daemon=True
+        ).start()
+        threading.Thread(
+            target=self._playback_worker, name="tts_playback", daemon=True
+        ).start()
+
+    def say(self, text: str):
+        """Queue text to be spoken after anything already queued (non-blocking)."""
+        clean_text = self.tts._clean_text(text)
+        if not clean_text:
+            return
+
+        sentences = split_sentences(clean_text)
+        with self._lock:
+            generation = self._generation
+            self._pending += len(sentences)
+            self._idle.clear()
+        for sentence in sentences:
+            self._sentences.put((generation, sentence))
+
+    def interrupt(self):
+        """Drop all queued speech and stop the sentence being played."""
+        with self._lock:
+            self._generation += 1
+            self._stop.set()
+
+    def is_speaking(self) -> bool:
+        """Check whether speech is queued or playing."""
+        return not self._idle.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until everything queued has been spoken (or dropped).
+
+        Returns:
+            True if the pipeline became idle within the timeout
+        """
+        return self._idle.wait(timeout)
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _finish_item(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending > 0:
+                return
+            self._idle.set()
+
+        voice_handler = _get_voice_handler()
+        if voice_handler:
+            voice_handler.unmute_listening()
+
+    def _synthesis_worker(self):
+        while True:
+            generation, sentence = self._sentences.get()
+            audio = None
+            if self._is_current(generation):
+                with timed_span("tts.synthesize"):
+                    audio = self.tts.synthesize(sentence)
+            self._audio.put((generation, audio))
+
+    def _playback_worker(self):
+        while True:
+            generation, audio = self._audio.get()
+            with self._lock:
+                # Cleared under the lock so a concurrent interrupt() is never lost
+                play = audio is not None and generation == self._generation
+                if play:
+                    self._stop.clear()
+            if play:
+                # Mute voice input while speaking to prevent feedback loops;
+                # unmuted once the pipeline is idle
+                voice_handler = _get_voice_handler()
+                if voice_handler:
+                    voice_handler.mute_listening()
+                with timed_span("tts.play"):
+                    self.tts.play(audio, self._stop)
+            if audio is not None:
+                self.tts.release(audio)
+            self._finish_item()
+
+
+def _get_voice_handler():
+    """The voice input handler, or None if voice input is unavailable."""
+    try:
+        from src.utils.voice_input_handler import get_voice_handler
+
+        return get_voice_handler()
+    except ImportError:
+        return None
 
 
 _tts_instance: Optional[TextToSpeech] = None
+_pipeline: Optional[SpeechPipeline] = None
+_pipeline_lock = threading.Lock()
 
 
 def get_tts() -> TextToSpeech:
@@ -189,22 +495,44 @@ def get_tts() -> TextToSpeech:
     return _tts_instance
 
 
+def get_speech_pipeline() -> SpeechPipeline:
+    """Returns the shared speech pipeline, starting its workers on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = SpeechPipeline(get_tts())
+        return _pipeline
+
+
+def is_tts_enabled() -> bool:
+    """Check whether speech output is switched on (TTS_ENABLED)."""
+    return os.getenv("TTS_ENABLED", "true").lower() == "true"
+
+
 def speak_text(text: str):
-    if os.getenv("TTS_ENABLED", "true").lower() == "true":
-        # Mute voice input during TTS to prevent feedback loops
-        try:
-            from src.utils.voice_input_handler import get_voice_handler
+    """
+    Speak text in the background; returns immediately.
 
-            voice_handler = get_voice_handler()
-            voice_handler.mute_listening()
-        except ImportError:
-            pass  # Voice handler not available
+    Sentences are synthesized and played in order after any speech that is
+    already queued. Use interrupt_speech() to cut it short.
+    """
+    if is_tts_enabled():
+        get_speech_pipeline().say(text)
 
-        # Speak the text
-        get_tts().speak(text)
 
-        # Unmute voice input after TTS is complete
-        try:
-            voice_handler.unmute_listening()
-        except (NameError, UnboundLocalError):
-            pass  # Voice handler not initialized
+def interrupt_speech():
+    """Stop speaking now and drop queued speech (barge-in)."""
+    if _pipeline is not None:
+        _pipeline.interrupt()
+
+
+def wait_for_speech(timeout: float = None) -> bool:
+    """
+    Block until queued speech has finished.
+
+    Returns:
+        True if speech finished within the timeout
+    """
+    if _pipeline is None:
+        return True
+    return _pipeline.wait(timeout)
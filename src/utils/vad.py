@@ -0,0 +1,195 @@
+"""
+Energy-based voice activity detection for microphone capture.
+
+Audio is split into short frames and each frame's RMS level is compared with
+an adaptive estimate of the background noise. Recording stops once speech has
+been followed by enough silence, and leading/trailing silence is trimmed
+before transcription.
+"""
+
+import os
+from typing import Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Frame length used for RMS measurements
+FRAME_MS = 30
+# Speech is this many times louder than the noise floor...
+DEFAULT_THRESHOLD_RATIO = 3.0
+# ...and at least this loud (RMS on a [-1, 1] scale), so digital silence is not speech
+MIN_SPEECH_RMS = 0.01
+# Consecutive voiced audio needed before speech counts as started (ignores clicks)
+SPEECH_START_MS = 90
+# Silence after speech that ends the utterance
+DEFAULT_END_SILENCE_MS = 700
+# Silence kept around the speech when trimming, so word edges are not cut
+TRIM_PADDING_MS = 150
+
+
+def pcm16_to_float(data: bytes):
+    """Convert 16-bit little-endian PCM bytes to float32 samples in [-1, 1]."""
+    import numpy as np
+
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768
+
+
+def frame_rms(samples, sample_rate: int, frame_ms: int = FRAME_MS):
+    """
+    RMS level of consecutive frames (a trailing partial frame is dropped).
+
+    Returns:
+        Array with one RMS value per frame
+    """
+    import numpy as np
+
+    size = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(samples) // size
+    if count == 0:
+        return np.zeros(0, np.float32)
+    frames = np.asarray(samples[: count * size], np.float32).reshape(count, size)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+class EnergyVAD:
+    """
+    Streaming detector fed with microphone chunks as they are read.
+
+    The noise floor follows quiet frames with an exponential moving average
+    (and drops immediately to a quieter level), so the threshold adapts to the
+    room instead of using a fixed amplitude.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = FRAME_MS,
+        threshold_ratio: float = None,
+        end_silence_ms: int = None,
+        min_rms: float = MIN_SPEECH_RMS,
+        noise_adaptation: float = 0.05,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            frame_ms: Frame length for RMS measurements
+            threshold_ratio: Speech/noise level ratio (defaults to VAD_THRESHOLD_RATIO, then 3.0)
+            end_silence_ms: Silence that ends speech (defaults to VAD_END_SILENCE_MS, then 700)
+            min_rms: Minimum RMS of a voiced frame
+            noise_adaptation: Weight of each quiet frame in the noise floor average
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.frame_ms = frame_ms
+        self.threshold_ratio = threshold_ratio or float(
+            os.getenv("VAD_THRESHOLD_RATIO", str(DEFAULT_THRESHOLD_RATIO))
+        )
+        self.end_silence_ms = end_silence_ms or int(
+            os.getenv("VAD_END_SILENCE_MS", str(DEFAULT_END_SILENCE_MS))
+        )
+        self.min_rms = min_rms
+        self.noise_adaptation = noise_adaptation
+        self.reset()
+
+    def reset(self):
+        """Forget all state (call before a new recording)."""
+        self.noise_floor = None
+        self.speech_started = False
+        self.speech_ended = False
+        self.frames_seen = 0
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._remainder = None
+
+    @property
+    def threshold(self) -> float:
+        """Current RMS level above which a frame is voiced."""
+        if self.noise_floor is None:
+            return self.min_rms
+        return max(self.min_rms, self.noise_floor * self.threshold_ratio)
+
+    def feed(self, samples) -> bool:
+        """
+        Process a chunk of float32 samples.
+
+        Returns:
+            True once the utterance has ended (speech followed by silence)
+        """
+        import numpy as np
+
+        if self._remainder is not None and len(self._remainder):
+            samples = np.concatenate([self._remainder, samples])
+        levels = frame_rms(samples, self.sample_rate, self.frame_ms)
+        self._remainder = samples[len(levels) * self.frame_size :]
+
+        start_frames = max(1, SPEECH_START_MS // self.frame_ms)
+        end_frames = max(1, self.end_silence_ms // self.frame_ms)
+
+        for level in levels:
+            self.frames_seen += 1
+            level = float(level)
+            voiced = level > self.threshold
+
+            if not voiced:
+                self._update_noise_floor(level)
+                self._voiced_run = 0
+                self._silent_run += 1
+                if self.speech_started and self._silent_run >= end_frames:
+                    self.speech_ended = True
+            else:
+                self._silent_run = 0
+                self._voiced_run += 1
+                if self._voiced_run >= start_frames:
+                    self.speech_started = True
+
+        return self.speech_ended
+
+    def _update_noise_floor(self, level: float):
+        if self.noise_floor is None or level < self.noise_floor:
+            self.noise_floor = level
+        else:
+            self.noise_floor += self.noise_adaptation * (level - self.noise_floor)
+
+
+def speech_bounds(
+    samples,
+    sample_rate: int,
+    threshold_ratio: float = DEFAULT_THRESHOLD_RATIO,
+    min_rms: float = MIN_SPEECH_RMS,
+    padding_ms: int = TRIM_PADDING_MS,
+) -> Tuple[int, int]:
+    """
+    Locate speech in a complete recording.
+
+    The noise floor is the 10th percentile of the frame levels, which is
+    robust to how much of the recording is speech.
+
+    Returns:
+        (start, end) sample indices, padded by padding_ms; (0, 0) if no speech
+    """
+    import numpy as np
+
+    levels = frame_rms(samples, sample_rate)
+    if not len(levels):
+        return 0, 0
+
+    noise_floor = float(np.percentile(levels, 10))
+    threshold = max(min_rms, noise_floor * threshold_ratio)
+    voiced = np.flatnonzero(levels > threshold)
+    if not len(voiced):
+        return 0, 0
+
+    frame_size = max(1, int(sample_rate * FRAME_MS / 1000))
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, int(voiced[0]) * frame_size - padding)
+    end = min(len(samples), (int(voiced[-1]) + 1) * frame_size + padding)
+    return start, end
+
+
+def trim_silence(samples, sample_rate: int, **kwargs):
+    """Cut leading and trailing silence (see speech_bounds for the arguments)."""
+    start, end = speech_bounds(samples, sample_rate, **kwargs)
+    return samples[start:end]
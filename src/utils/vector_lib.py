@@ -2,19 +2,158 @@
 Vector library for the application.
 """
 
+import json
+import logging
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
+from src.utils.lexical_index import LEXICAL_INDEX_FILE, LexicalIndex
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Written by src.build.index next to the FAISS index
+BUILD_INFO_FILE = "build_info.json"
+
+# Knowledge files the named indexes are built from
+SOURCE_DATA_DIR = "src/data"
+
+
+def get_index_dir(name: str) -> str:
+    """
+    Returns the storage directory of the index for the given name.
+    """
+
+    return f"storage/vectors/{name.lower()}_index"
+
+
+def get_source_document(name: str) -> str:
+    """
+    Returns the path of the knowledge file the named index is built from.
+    """
+
+    return os.path.join(SOURCE_DATA_DIR, f"{name.lower()}.txt")
+
+
+@lru_cache(maxsize=None)
+def check_index_current(name: str) -> bool:
+    """
+    Warn (once per process) if the named index was built with another chunker
+    than the one now configured for its document (see
+    src.build.chunkers.DEFAULT_CHUNKERS).
+
+    The index is only reported, never rebuilt here: index files are part of
+    the repository and may be read-only or shared with other processes.
+    Indexes built before per-document chunkers existed have no build info
+    file; they were split with the recursive chunker.
+
+    Returns:
+        True if the index matches the configured chunker
+    """
+    from src.build.chunkers import default_chunker_name
+
+    source = get_source_document(name)
+    if not os.path.exists(source):
+        return True
+
+    built_with = "recursive"
+    build_info = os.path.join(get_index_dir(name), BUILD_INFO_FILE)
+    if os.path.exists(build_info):
+        with open(build_info, "r", encoding="utf-8") as f:
+            built_with = json.load(f).get("chunker", built_with)
+
+    configured = default_chunker_name(source)
+    if built_with == configured:
+        return True
+
+    logger.warning(
+        "The %s index was built with the %s chunker but %s is configured; "
+        "rebuild it with: python -m src.build.index %s",
+        name,
+        built_with,
+        configured,
+        source,
+    )
+    return False
+
 
-def get_local_index(name: str):
+@lru_cache(maxsize=1)
+def get_embeddings():
     """
-    Returns the local index for the given name.
+    Returns the shared embedding model (loaded once per process).
     """
+    # Imported here: sentence-transformers pulls in torch, which is slow to import
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        model_kwargs={"device": "cuda" if os.getenv("USE_CUDA") == "true" else "cpu"},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_local_index(name: str, index_dir: str = None):
+    """
+    Returns the local index for the given name (or an explicit index directory).
+
+    A named index that is out of date with its configured chunker is loaded
+    as is, with a warning.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    if index_dir is None:
+        check_index_current(name)
+
+    return FAISS.load_local(
+        index_dir or get_index_dir(name),
+        get_embeddings(),
+        allow_dangerous_deserialization=True,
+    )
+
+
+def get_document_key(doc) -> str:
+    """
+    Returns a stable identifier for a stored chunk.
+    """
+
+    return getattr(doc, "id", None) or doc.metadata.get("id") or doc.page_content
+
+
+@lru_cache(maxsize=None)
+def get_index_documents(name: str, index_dir: str = None) -> dict:
+    """
+    Returns every chunk stored in the named index, keyed by document key.
+    """
+
+    vector_store = get_local_index(name, index_dir)
+    documents = {}
+    for docstore_id in vector_store.index_to_docstore_id.values():
+        doc = vector_store.docstore.search(docstore_id)
+        if hasattr(doc, "page_content"):
+            documents[get_document_key(doc)] = doc
+    return documents
+
+
+@lru_cache(maxsize=None)
+def get_lexical_index(name: str, index_dir: str = None) -> LexicalIndex:
+    """
+    Returns the lexical index for the given name.
+
+    Indexes built before lexical indexing existed have no lexical file on disk;
+    in that case it is rebuilt in memory from the FAISS docstore.
+    """
+
+    if index_dir is None:
+        check_index_current(name)
+
+    directory = index_dir or get_index_dir(name)
+    if os.path.exists(os.path.join(directory, LEXICAL_INDEX_FILE)):
+        return LexicalIndex.load(directory)
 
-    index_dir = f"storage/vectors/{name.lower()}_index"
-    embeddings = HuggingFaceEmbeddings(model_name=os.getenv("EMBEDDING_MODEL"))
-    return FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+    documents = get_index_documents(name, index_dir)
+    return LexicalIndex.from_texts(
+        [doc.page_content for doc in documents.values()], list(documents.keys())
+    )
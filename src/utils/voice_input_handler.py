@@ -1,16 +1,20 @@
 """
-Voice input handler for speech-to-text functionality using OpenAI Whisper.
+Voice input handler for speech-to-text functionality using Whisper
+(openai-whisper or faster-whisper, see src/utils/stt_backends.py).
 Includes audio management to prevent feedback loops with TTS.
 """
 
+import importlib.util
 import os
-import tempfile
-import wave
-from typing import Optional
+import threading
+import time
+from typing import Callable, Optional
 import warnings
 
 from dotenv import load_dotenv
 
+from src.utils.stt_backends import available_backends, get_stt_backend
+
 # Suppress Whisper warnings
 warnings.filterwarnings(
     "ignore", message="FP16 is not supported on CPU; using FP32 instead"
@@ -18,58 +22,88 @@ warnings.filterwarnings(
 
 load_dotenv()
 
-# Import OpenAI Whisper
-try:
-    import whisper
-
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
+# Speech recognition engines and PyAudio are imported on first use so they
+# do not slow down startup; only check that they are installed here
+STT_AVAILABLE = bool(available_backends())
+if not STT_AVAILABLE:
     print(
-        "Warning: OpenAI Whisper not installed. Install with: pip install openai-whisper"
+        "Warning: No speech recognition engine installed. Install with: "
+        "pip install faster-whisper (or openai-whisper)"
     )
 
-# Import pyaudio for microphone access
-try:
-    import pyaudio
-
-    PYAUDIO_AVAILABLE = True
-except ImportError:
-    PYAUDIO_AVAILABLE = False
+PYAUDIO_AVAILABLE = importlib.util.find_spec("pyaudio") is not None
+if not PYAUDIO_AVAILABLE:
     print("Warning: PyAudio not installed. Install with: pip install pyaudio")
 
+# Audio before the detected start of speech that is streamed along with it
+STREAM_PREROLL_S = 0.5
+
+
+def is_streaming_enabled() -> bool:
+    """Check whether commands are transcribed while they are recorded (STT_STREAMING)."""
+    return os.getenv("STT_STREAMING", "false").lower() == "true"
+
 
 class VoiceInputHandler:
-    """Handles speech-to-text input with audio management using OpenAI Whisper."""
+    """Handles speech-to-text input with audio management using Whisper."""
 
     def __init__(self):
-        """Initialize voice input handler."""
-        self.enabled = WHISPER_AVAILABLE and PYAUDIO_AVAILABLE
+        """
+        Initialize voice input handler.
+
+        The speech recognition model and the microphone are not loaded here;
+        load() runs on the first voice command (or earlier, from a background
+        thread).
+        """
+        self.enabled = STT_AVAILABLE and PYAUDIO_AVAILABLE
         self.is_listening = False
         self.is_muted = False  # For preventing feedback loops
-        self.whisper_model = None
-
-        if not self.enabled:
-            return
+        # Loaded STTBackend (STT_BACKEND / STT_MODEL)
+        self.stt = None
+        self.audio = None
+        self._load_lock = threading.Lock()
+        # Capture buffer, allocated on the first recording
+        self._ring = None
+        self._speech_end_time = None
+        # End of speech in the streamed audio, in seconds
+        self._stream_speech_end = None
+
+    def load(self) -> bool:
+        """
+        Load the speech recognition model and initialize the microphone (once).
 
-        # Initialize Whisper model
-        try:
-            print("🎤 Loading Whisper model...")
-            # Use base model for good balance of speed and accuracy
-            self.whisper_model = whisper.load_model("base")
-            print("✅ Whisper model loaded")
-        except Exception as e:
-            print(f"Warning: Could not load Whisper model: {e}")
-            self.enabled = False
-            return
+        Safe to call from several threads; later calls return immediately.
 
-        # Initialize PyAudio for microphone access
-        try:
-            self.audio = pyaudio.PyAudio()
-            print("✅ Microphone initialized")
-        except Exception as e:
-            print(f"Warning: Could not initialize microphone: {e}")
-            self.enabled = False
+        Returns:
+            True if voice input is ready
+        """
+        with self._load_lock:
+            if not self.enabled:
+                return False
+            if self.stt is not None and self.audio is not None:
+                return True
+
+            # Initialize the speech recognition model
+            try:
+                stt = get_stt_backend()
+                stt.load()
+                self.stt = stt
+            except Exception as e:
+                print(f"Warning: Could not load speech recognition model: {e}")
+                self.enabled = False
+                return False
+
+            # Initialize PyAudio for microphone access
+            try:
+                import pyaudio
+
+                self.audio = pyaudio.PyAudio()
+            except Exception as e:
+                print(f"Warning: Could not initialize microphone: {e}")
+                self.enabled = False
+                return False
+
+            return True
 
     def mute_listening(self):
         """Mute voice input to prevent feedback loops during TTS."""
@@ -80,14 +114,19 @@ class VoiceInputHandler:
         self.is_muted = False
 
     def listen_for_command(
-        self, timeout: int = 5, phrase_time_limit: int = 10
+        self,
+        timeout: int = 5,
+        phrase_time_limit: int = 10,
+        on_partial: Callable[[str, str], None] = None,
     ) -> Optional[str]:
         """
-        Listen for a single voice command using Whisper.
+        Listen for a single voice command.
 
         Args:
             timeout: Maximum time to wait for speech to start
             phrase_time_limit: Maximum time for the entire phrase
+            on_partial: With STT_STREAMING, called as on_partial(stable_text, full_text)
+                        from a background thread while the user is still speaking
 
         Returns:
             Recognized text or None if no speech detected
@@ -95,27 +134,69 @@ class VoiceInputHandler:
         if not self.enabled or self.is_muted:
             return None
 
+        if self.stt is None:
+            print("🎤 Loading speech recognition model...")
+        if not self.load():
+            return None
+
+        transcriber = None
+        if is_streaming_enabled():
+            from src.utils.streaming_stt import StreamingTranscriber
+
+            transcriber = StreamingTranscriber(self.stt, on_partial)
+
         try:
             print("🎤 Listening... (speak now)")
 
             # Record audio from microphone
-            audio_data = self._record_audio(timeout, phrase_time_limit)
+            audio_data = self._record_audio(timeout, phrase_time_limit, transcriber)
             if audio_data is None:
                 return None
 
-            return self._process_audio_with_whisper(audio_data)
+            return self._transcribe(audio_data, transcriber)
 
         except Exception as e:
             print(f"❌ Voice input error: {e}")
             return None
 
-    def _record_audio(self, timeout: int, phrase_time_limit: int) -> Optional[bytes]:
-        """Record audio from microphone."""
+        finally:
+            if transcriber is not None:
+                transcriber.cancel()
+
+    def _record_audio(self, timeout: int, phrase_time_limit: int, transcriber=None):
+        """
+        Record one utterance from the microphone.
+
+        Stops once the voice activity detector hears speech followed by
+        silence (VAD_END_SILENCE_MS), when no speech starts within timeout
+        seconds, or at phrase_time_limit. Leading and trailing silence is trimmed.
+
+        Args:
+            timeout: Maximum time to wait for speech to start
+            phrase_time_limit: Maximum recording time
+            transcriber: StreamingTranscriber that receives the audio from the
+                         start of speech on, or None
+
+        Returns:
+            float32 samples at 16 kHz, or None if no speech was heard
+        """
+        import pyaudio
+
+        from src.utils.audio_buffer import AudioRingBuffer
+        from src.utils.vad import EnergyVAD, speech_bounds
+
         CHUNK = 1024
         FORMAT = pyaudio.paInt16
         CHANNELS = 1
         RATE = 16000  # Whisper works best with 16kHz
 
+        max_chunks = int(phrase_time_limit * RATE / CHUNK)
+        self._stream_speech_end = None
+        # Allocated once and reused by later recordings
+        if self._ring is None or self._ring.capacity < max_chunks * CHUNK:
+            self._ring = AudioRingBuffer(max_chunks * CHUNK)
+        self._ring.clear()
+
         stream = self.audio.open(
             format=FORMAT,
             channels=CHANNELS,
@@ -124,70 +205,84 @@ class VoiceInputHandler:
             frames_per_buffer=CHUNK,
         )
 
-        frames = []
-        silent_chunks = 0
-        max_silent_chunks = int(timeout * RATE / CHUNK)
+        vad = EnergyVAD(RATE)
+        max_wait_chunks = int(timeout * RATE / CHUNK)
+        # Ring buffer index of the first sample given to the transcriber
+        stream_offset = None
 
         try:
-            # Record until silence or timeout
-            for _ in range(int(phrase_time_limit * RATE / CHUNK)):
-                data = stream.read(CHUNK)
-                frames.append(data)
-
-                # Simple silence detection (can be improved)
-                if max(data) < 500:  # Threshold for silence
-                    silent_chunks += 1
-                    if silent_chunks > max_silent_chunks:
-                        break
-                else:
-                    silent_chunks = 0
+            for index in range(max_chunks):
+                data = stream.read(CHUNK, exception_on_overflow=False)
+                chunk = self._ring.write_pcm16(data)
+                ended = vad.feed(chunk)
+
+                if transcriber is not None and vad.speech_started:
+                    if stream_offset is None:
+                        stream_offset = max(0, len(self._ring) - int(STREAM_PREROLL_S * RATE))
+                        transcriber.push(self._ring.samples()[stream_offset:])
+                    else:
+                        transcriber.push(chunk)
+
+                if ended:
+                    break
+                if not vad.speech_started and index >= max_wait_chunks:
+                    break
 
         finally:
+            # End of speech as far as the caller can tell
+            self._speech_end_time = time.perf_counter()
             stream.stop_stream()
             stream.close()
 
-        if len(frames) < 10:  # Too short
+        if not vad.speech_started:
             print("⏰ No speech detected within timeout")
             return None
 
-        return b"".join(frames)
+        samples = self._ring.samples()
+        start, end = speech_bounds(samples, RATE)
+        if end <= start:
+            print("⏰ No speech detected within timeout")
+            return None
+        if stream_offset is not None:
+            self._stream_speech_end = (end - stream_offset) / RATE
+        return samples[start:end]
 
-    def _process_audio_with_whisper(self, audio_data: bytes) -> Optional[str]:
+    def _transcribe(self, audio, transcriber=None) -> Optional[str]:
         """
-        Process audio data with Whisper.
+        Transcribe a recording with the configured speech recognition backend.
 
         Args:
-            audio_data: Raw audio bytes
+            audio: float32 samples at 16 kHz
+            transcriber: StreamingTranscriber that has followed the recording;
+                         only the part it has not transcribed yet is decoded
 
         Returns:
             Recognized text or None if recognition failed
         """
+        from src.utils.metrics import registry, timed_span
+
         try:
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                # Write WAV header and data
-                with wave.open(tmp_file.name, "wb") as wav_file:
-                    wav_file.setnchannels(1)
-                    wav_file.setsampwidth(2)  # 16-bit
-                    wav_file.setframerate(16000)
-                    wav_file.writeframes(audio_data)
-
-                # Use Whisper to transcribe
-                result = self.whisper_model.transcribe(tmp_file.name)
-                text = result["text"].strip()
-
-                # Clean up temporary file
-                os.unlink(tmp_file.name)
-
-                if text:
-                    print(f"🎯 Recognized: {text}")
-                    return text
+            if self._speech_end_time is not None:
+                registry.observe(
+                    "stt.speech_end_to_transcribe",
+                    (time.perf_counter() - self._speech_end_time) * 1000,
+                )
+            # The array is passed directly, skipping an ffmpeg decode
+            with timed_span("stt.transcribe"):
+                if transcriber is not None:
+                    text = transcriber.finish(self._stream_speech_end)
                 else:
-                    print("❓ Could not understand the audio")
-                    return None
+                    text = self.stt.transcribe(audio)
+
+            if text:
+                print(f"🎯 Recognized: {text}")
+                return text
+            else:
+                print("❓ Could not understand the audio")
+                return None
 
         except Exception as e:
-            print(f"❌ Whisper transcription error: {e}")
+            print(f"❌ Transcription error: {e}")
             return None
 
     def is_voice_enabled(self) -> bool:
@@ -196,15 +291,17 @@ class VoiceInputHandler:
 
     def get_status(self) -> str:
         """Get current status of voice input system."""
-        if not WHISPER_AVAILABLE:
-            return "❌ OpenAI Whisper not installed"
+        if not STT_AVAILABLE:
+            return "❌ No speech recognition engine installed"
         if not PYAUDIO_AVAILABLE:
             return "❌ PyAudio not installed"
         if not self.enabled:
             return "❌ Voice input disabled (initialization error)"
         if self.is_muted:
             return "🔇 Voice input muted (TTS active)"
-        return "✅ Voice input ready"
+        if self.stt is None:
+            return "✅ Voice input available (model loads on first use)"
+        return f"✅ Voice input ready ({self.stt.name} {self.stt.model_name})"
 
 
 # Singleton instance
@@ -219,15 +316,18 @@ def get_voice_handler() -> VoiceInputHandler:
     return _voice_handler_instance
 
 
-def listen_for_voice_input(timeout: int = 5) -> Optional[str]:
+def listen_for_voice_input(
+    timeout: int = 5, on_partial: Callable[[str, str], None] = None
+) -> Optional[str]:
     """
     Convenience function to listen for voice input.
 
     Args:
         timeout: Maximum time to wait for speech
+        on_partial: Partial transcript callback (see listen_for_command)
 
     Returns:
         Recognized text or None
     """
     handler = get_voice_handler()
-    return handler.listen_for_command(timeout=timeout)
+    return handler.listen_for_command(timeout=timeout, on_partial=on_partial)
@@ -0,0 +1,142 @@
+"""
+Background warm-up of models, indexes and connections at launch.
+
+Each component loads on its own daemon thread so that the first query does
+not pay for it. Agents call wait_until_ready() before using a component that
+may still be loading, instead of loading a second copy themselves.
+"""
+
+import logging
+import os
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from src.utils.background import BackgroundTask
+from src.utils.reranker import is_rerank_enabled
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Knowledge bases with an index under storage/vectors
+RAG_STORES = ("faq", "investment", "policy")
+
+_tasks: Dict[str, BackgroundTask] = {}
+_durations: Dict[str, float] = {}
+
+
+def _timed(name: str, func):
+    """Wrap func so its duration is recorded under name."""
+
+    def run():
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            _durations[name] = time.perf_counter() - start
+            logger.info("Warm-up of %s took %.2f s", name, _durations[name])
+
+    return run
+
+
+def _warm_retrieval():
+    """Load the embedding model and every store's dense, lexical and answer index."""
+    from src.utils.answer_lookup import get_answer_lookup
+    from src.utils.vector_lib import get_embeddings, get_lexical_index, get_local_index
+
+    # The first encode initializes the tokenizer and torch kernels
+    get_embeddings().embed_query("warm up")
+    for name in RAG_STORES:
+        get_local_index(name)
+        get_lexical_index(name)
+        get_answer_lookup(name)
+
+
+def _warm_reranker():
+    """Load the cross-encoder and run one prediction."""
+    from src.utils.reranker import get_cross_encoder
+
+    get_cross_encoder().predict([("warm up", "warm up")])
+
+
+def _warm_llm():
+    """Open the pooled TLS connection to the LLM endpoint without spending tokens."""
+    from langchain_openai import ChatOpenAI
+
+    # ChatOpenAI instances with the same base URL share one httpx client, so
+    # this connection is reused by the agents' first request
+    ChatOpenAI(model=os.getenv("LLM_MODEL", "gpt-4o-mini")).root_client.models.list()
+
+
+def start_warmup(voice_handler=None) -> Dict[str, BackgroundTask]:
+    """
+    Start loading every component in parallel (once per process).
+
+    Args:
+        voice_handler: VoiceInputHandler whose Whisper model should be loaded,
+                       or None to skip voice input
+
+    Returns:
+        Dictionary of component name to its BackgroundTask
+    """
+    if _tasks:
+        return _tasks
+
+    components = {"retrieval": _warm_retrieval}
+    if is_rerank_enabled():
+        components["reranker"] = _warm_reranker
+    # Offline backends (replay, fake) have no connection to open
+    live_llm = os.getenv("LLM_BACKEND", "openai").lower() in ("openai", "record")
+    if live_llm and os.getenv("OPENAI_API_KEY"):
+        components["llm"] = _warm_llm
+    if voice_handler is not None and voice_handler.is_voice_enabled():
+        components["whisper"] = voice_handler.load
+
+    for name, func in components.items():
+        _tasks[name] = BackgroundTask(f"warmup_{name}", _timed(name, func)).start()
+
+    return _tasks
+
+
+def wait_until_ready(component: str, timeout: float = None) -> bool:
+    """
+    Block until a component has finished warming up.
+
+    Returns immediately when warm-up was not started (e.g. --no-warmup) or does
+    not cover the component. A failed warm-up counts as ready: the caller then
+    loads the component itself and sees the real error.
+
+    Args:
+        component: Component name ("retrieval", "reranker", "llm" or "whisper")
+        timeout: Maximum seconds to wait (None waits indefinitely)
+
+    Returns:
+        True if the component is ready (or not being warmed up)
+    """
+    task = _tasks.get(component)
+    if task is None:
+        return True
+    return task.wait(timeout)
+
+
+def warmup_status() -> Dict[str, str]:
+    """
+    Readiness of each component being warmed up.
+
+    Returns:
+        Dictionary of component name to "loading", "ready (<seconds>)" or
+        "failed: <error>"
+    """
+    status = {}
+    for name, task in _tasks.items():
+        if not task.done():
+            status[name] = "loading"
+            continue
+        try:
+            task.result()
+            status[name] = f"ready ({_durations.get(name, 0.0):.1f}s)"
+        except Exception as e:
+            status[name] = f"failed: {e}"
+    return status